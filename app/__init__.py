@@ -3,12 +3,20 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_restx import Api
 from flask_cors import CORS
+from app.utils.cache import Cache
+from app.utils.metrics import Metrics
+from app.utils.profiling import Profiler
+from app.utils.serialization import output_json
 
 # Initialize extensions
 db = SQLAlchemy()
 migrate = Migrate()
 restx_api = Api()  # Renamed to avoid conflict with app.api module
+restx_api.representations['application/json'] = output_json
 cors = CORS()
+cache = Cache()
+metrics = Metrics()
+profiler = Profiler()
 
 def create_app(config_name='default'):
     """Application factory pattern."""
@@ -20,8 +28,11 @@ def create_app(config_name='default'):
     
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
+    migrate.init_app(app, db, render_as_batch=True)  # batch mode for SQLite ALTERs
     cors.init_app(app)
+    cache.init_app(app)
+    metrics.init_app(app)
+    profiler.init_app(app)
     
     # Register web routes blueprint FIRST (before API)
     from app.routes import main
@@ -36,20 +47,43 @@ def create_app(config_name='default'):
                 )
     
     # Register namespaces after API is initialized
-    from app.api import books, members, loans, returns
+    from app.api import books, copies, holds, members, member_loans, loans, returns, stats
     
     restx_api.add_namespace(books.books_ns, path='/api/v1/books')
+    restx_api.add_namespace(copies.copies_ns, path='/api/v1/books')
+    restx_api.add_namespace(holds.holds_ns, path='/api/v1/books')
     restx_api.add_namespace(members.members_ns, path='/api/v1/members')
+    restx_api.add_namespace(member_loans.member_loans_ns, path='/api/v1/members')
     restx_api.add_namespace(loans.loans_ns, path='/api/v1/loans')
     restx_api.add_namespace(returns.returns_ns, path='/api/v1/returns')
+    restx_api.add_namespace(stats.stats_ns, path='/api/v1/stats')
+    
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
     
     # Health check endpoint
     @app.route('/health')
     def health_check():
         return {'status': 'healthy', 'message': 'Library API is running'}, 200
     
-    # Create database tables
+    # Set up the database connection
     with app.app_context():
-        db.create_all()
+        from app.utils.sql import apply_sqlite_pragmas
+        apply_sqlite_pragmas(db.engine, app.config['SQLITE_PRAGMAS'])
+        if app.config['METRICS_ENABLED']:
+            metrics.instrument(db.engine)
+        if app.config['SLOW_QUERY_THRESHOLD_MS']:
+            from app.utils.profiling import log_slow_queries
+            log_slow_queries(db.engine, app.config['SLOW_QUERY_THRESHOLD_MS'], app.config['SLOW_QUERY_EXPLAIN'])
+        # Tests start from an empty in-memory database; every other
+        # database is created and upgraded by Alembic (`flask db upgrade`),
+        # whose migrations would fail on tables created here first
+        if app.testing:
+            db.create_all()
+        
+        # Set up the full-text search index (falls back to LIKE without FTS5)
+        from app.services.search_service import SearchService
+        app.config['BOOK_SEARCH_FTS'] = SearchService.ensure_index()
     
     return app
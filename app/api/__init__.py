@@ -3,5 +3,6 @@ from .books import books_ns
 from .members import members_ns
 from .loans import loans_ns
 from .returns import returns_ns
+from .stats import stats_ns
 
-__all__ = ['books_ns', 'members_ns', 'loans_ns', 'returns_ns']
+__all__ = ['books_ns', 'members_ns', 'loans_ns', 'returns_ns', 'stats_ns']
@@ -1,9 +1,18 @@
-from flask import request
+from flask import request, current_app, Response, stream_with_context
 from flask_restx import Namespace, Resource, fields
 from app.services.book_service import BookService
+from app.services.search_service import SearchService
+from app.models.book import Book
+from app.utils.serialization import column_serializer
 from app.schemas.book_schemas import (
-    book_schema, books_schema, book_create_schema, book_update_schema
+    book_create_schema, book_bulk_create_schema, book_update_schema,
+    book_list_query_schema, book_search_query_schema
 )
+from app.utils.streaming import (
+    StreamFormatError, iter_json_array, iter_ndjson, iter_csv, to_ndjson
+)
+from app.api.export import add_export_arguments, export_response
+from app.api.conditional import conditional, evaluate, make_etag, not_modified
 from marshmallow import ValidationError
 
 # Create namespace for API documentation  
@@ -15,7 +24,9 @@ book_model = books_ns.model('Book', {
     'title': fields.String(required=True, description='Book title'),
     'author': fields.String(required=True, description='Book author'),
     'isbn': fields.String(description='Book ISBN'),
-    'available': fields.Boolean(readonly=True, description='Book availability'),
+    'available': fields.Boolean(readonly=True, description='Whether a copy is on the shelf'),
+    'available_count': fields.Integer(readonly=True, description='Number of copies on the shelf'),
+    'copy_count': fields.Integer(readonly=True, description='Number of copies in the collection'),
     'created_at': fields.DateTime(readonly=True, description='Creation timestamp'),
     'updated_at': fields.DateTime(readonly=True, description='Last update timestamp')
 })
@@ -23,7 +34,8 @@ book_model = books_ns.model('Book', {
 book_create_model = books_ns.model('BookCreate', {
     'title': fields.String(required=True, description='Book title'),
     'author': fields.String(required=True, description='Book author'),
-    'isbn': fields.String(description='Book ISBN')
+    'isbn': fields.String(description='Book ISBN'),
+    'copies': fields.Integer(description='Number of copies to put on the shelf (default 1)')
 })
 
 book_update_model = books_ns.model('BookUpdate', {
@@ -32,30 +44,81 @@ book_update_model = books_ns.model('BookUpdate', {
     'isbn': fields.String(description='Book ISBN')
 })
 
+book_list_model = books_ns.model('BookList', {
+    'books': fields.List(fields.Nested(book_model), description='Books on this page'),
+    'limit': fields.Integer(description='Maximum number of books per page'),
+    'next_cursor': fields.Integer(description='Cursor for the next page, null on the last page')
+})
+
+book_list_parser = books_ns.parser()
+book_list_parser.add_argument('limit', type=int, location='args', help='Maximum number of books to return')
+book_list_parser.add_argument('cursor', type=int, location='args', help='Return books with an ID greater than this cursor')
+book_list_parser.add_argument('available', type=str, location='args', help='Filter by availability (true/false)')
+book_list_parser.add_argument('author', type=str, location='args', help='Filter by exact author name')
+book_list_parser.add_argument('title', type=str, location='args', help='Filter by title prefix')
+book_list_parser.add_argument('fields', type=str, location='args', help='Comma-separated book fields to return (default: all)')
+
+book_search_model = books_ns.model('BookSearch', {
+    'books': fields.List(fields.Nested(book_model), description='Matching books, best match first'),
+    'limit': fields.Integer(description='Maximum number of books per page'),
+    'offset': fields.Integer(description='Offset of this page'),
+    'next_offset': fields.Integer(description='Offset of the next page, null on the last page')
+})
+
+book_search_parser = books_ns.parser()
+book_search_parser.add_argument('q', type=str, location='args', required=True, help='Search terms, matched as prefixes')
+book_search_parser.add_argument('limit', type=int, location='args', help='Maximum number of books to return')
+book_search_parser.add_argument('offset', type=int, location='args', help='Number of results to skip')
+book_search_parser.add_argument('available', type=str, location='args', help='Filter by availability (true/false)')
+
+def book_list_validators():
+    """Get the ETag of a page of the book listing."""
+    try:
+        params = book_list_query_schema.load(request.args)
+    except ValidationError:
+        return None
+    
+    count, last_updated = BookService.get_books_version(
+        available=params.get('available'),
+        author=params.get('author'),
+        title_prefix=params.get('title')
+    )
+    # Deletes do not advance max(updated_at), so lists carry no Last-Modified
+    return make_etag('books', sorted(request.args.items(multi=True)), count, str(last_updated)), None
+
 @books_ns.route('')
 class BookListAPI(Resource):
     @books_ns.doc('list_books')
-    @books_ns.marshal_list_with(book_model)
+    @books_ns.expect(book_list_parser)
+    @books_ns.response(200, 'Success', book_list_model)
+    @conditional(book_list_validators)
     def get(self):
-        """List all books"""
-        books = BookService.get_all_books()
-        # Convert SQLAlchemy objects to dictionaries
-        books_data = []
-        for book in books:
-            books_data.append({
-                'id': book.id,
-                'title': book.title,
-                'author': book.author,
-                'isbn': book.isbn,
-                'available': book.available,
-                'created_at': book.created_at.isoformat() if book.created_at else None,
-                'updated_at': book.updated_at.isoformat() if book.updated_at else None
-            })
-        return books_data
+        """List books, one keyset-paginated page at a time"""
+        try:
+            params = book_list_query_schema.load(request.args)
+        except ValidationError as e:
+            books_ns.abort(400, 'Validation error', errors=e.messages)
+        
+        limit = min(params.get('limit', current_app.config['DEFAULT_PAGE_SIZE']),
+                    current_app.config['MAX_PAGE_SIZE'])
+        books, next_cursor = BookService.get_books_page(
+            limit,
+            cursor=params.get('cursor'),
+            available=params.get('available'),
+            author=params.get('author'),
+            title_prefix=params.get('title'),
+            fields=params.get('fields')
+        )
+        serialize = column_serializer(Book, params.get('fields'), rows=True)
+        return {
+            'books': [serialize(row) for row in books],
+            'limit': limit,
+            'next_cursor': next_cursor
+        }
     
     @books_ns.doc('create_book')
     @books_ns.expect(book_create_model)
-    @books_ns.marshal_with(book_model, code=201)
+    @books_ns.response(201, 'Created', book_model)
     def post(self):
         """Add a new book"""
         try:
@@ -68,48 +131,154 @@ class BookListAPI(Resource):
             if error:
                 return {'message': error}, 400
             
-            # Convert to dictionary
-            result = {
-                'id': book.id,
-                'title': book.title,
-                'author': book.author,
-                'isbn': book.isbn,
-                'available': book.available,
-                'created_at': book.created_at.isoformat() if book.created_at else None,
-                'updated_at': book.updated_at.isoformat() if book.updated_at else None
-            }
-            return result, 201
+            return book.to_dict(), 201
             
         except ValidationError as e:
             return {'message': 'Validation error', 'errors': e.messages}, 400
         except Exception as e:
             return {'message': str(e)}, 500
 
+BULK_IMPORT_READERS = {
+    'application/json': iter_json_array,
+    'application/x-ndjson': iter_ndjson,
+    'application/jsonl': iter_ndjson,
+    'text/csv': iter_csv
+}
+
+def import_books(rows, chunk_size):
+    """Validate and insert raw book rows chunk by chunk.
+    
+    Yields one result per input row followed by a summary, so memory use
+    is bounded by the chunk size rather than the size of the import.
+    """
+    counts = {'created': 0, 'failed': 0}
+    
+    def flush(chunk):
+        # Rows that could not be parsed are reported without validation
+        items = [item for _, item in chunk if not isinstance(item, StreamFormatError)]
+        try:
+            books_data = book_bulk_create_schema.load(items)
+            validation_errors = {}
+        except ValidationError as e:
+            validation_errors = e.messages
+            books_data = book_bulk_create_schema.load(
+                [item for index, item in enumerate(items) if index not in validation_errors]
+            )
+        
+        insert_errors = iter(BookService.create_books(books_data))
+        indexes = iter(range(len(items)))
+        for row, item in chunk:
+            if isinstance(item, StreamFormatError):
+                result = {'row': row, 'status': 'error', 'message': str(item)}
+                counts['failed'] += 1
+                yield result
+                continue
+            
+            index = next(indexes)
+            if index in validation_errors:
+                result = {'row': row, 'status': 'error', 'message': 'Validation error',
+                          'errors': validation_errors[index]}
+            else:
+                error = next(insert_errors)
+                if error:
+                    result = {'row': row, 'status': 'error', 'message': error}
+                else:
+                    result = {'row': row, 'status': 'created'}
+            counts['created' if result['status'] == 'created' else 'failed'] += 1
+            yield result
+    
+    chunk = []
+    row = 0
+    try:
+        for row, item in enumerate(rows, 1):
+            chunk.append((row, item))
+            if len(chunk) >= chunk_size:
+                yield from flush(chunk)
+                chunk = []
+    except StreamFormatError as e:
+        # The body is unreadable past this point
+        chunk.append((row + 1, e))
+    if chunk:
+        yield from flush(chunk)
+    
+    yield {'summary': counts}
+
+@books_ns.route('/bulk')
+class BookBulkAPI(Resource):
+    @books_ns.doc('bulk_create_books', params={
+        'chunk_size': 'Number of rows inserted per transaction'
+    })
+    def post(self):
+        """Import books from a JSON array, NDJSON or CSV request body
+        
+        Streams back one NDJSON result line per input row and a final summary line.
+        """
+        reader = BULK_IMPORT_READERS.get(request.mimetype)
+        if reader is None:
+            return {'message': 'Unsupported content type, use one of: ' +
+                               ', '.join(BULK_IMPORT_READERS)}, 415
+        
+        chunk_size = request.args.get('chunk_size', type=int) or \
+            current_app.config['BULK_IMPORT_CHUNK_SIZE']
+        chunk_size = max(1, min(chunk_size, current_app.config['BULK_IMPORT_CHUNK_SIZE'] * 10))
+        
+        results = import_books(reader(request.stream), chunk_size)
+        return Response(stream_with_context(to_ndjson(results)),
+                        mimetype='application/x-ndjson')
+
+@books_ns.route('/search')
+class BookSearchAPI(Resource):
+    @books_ns.doc('search_books')
+    @books_ns.expect(book_search_parser)
+    @books_ns.response(200, 'Success', book_search_model)
+    def get(self):
+        """Full-text search over book title, author and ISBN"""
+        try:
+            params = book_search_query_schema.load(request.args)
+        except ValidationError as e:
+            books_ns.abort(400, 'Validation error', errors=e.messages)
+        
+        limit = min(params.get('limit', current_app.config['DEFAULT_PAGE_SIZE']),
+                    current_app.config['MAX_PAGE_SIZE'])
+        offset = params.get('offset', 0)
+        books, next_offset = SearchService.search_books(
+            params['q'], limit, offset=offset, available=params.get('available')
+        )
+        return {
+            'books': [book.to_dict() for book in books],
+            'limit': limit,
+            'offset': offset,
+            'next_offset': next_offset
+        }
+
+@books_ns.route('/export')
+class BookExportAPI(Resource):
+    @books_ns.doc('export_books')
+    @books_ns.expect(add_export_arguments(books_ns.parser()))
+    def get(self):
+        """Stream all books as NDJSON or CSV"""
+        return export_response('books')
+
 @books_ns.route('/<int:book_id>')
 @books_ns.param('book_id', 'Book identifier')
 class BookAPI(Resource):
     @books_ns.doc('get_book')
-    @books_ns.marshal_with(book_model)
+    @books_ns.response(200, 'Success', book_model)
+    @books_ns.response(304, 'Not modified')
     def get(self, book_id):
         """Get book details by ID"""
-        book = BookService.get_book_by_id(book_id)
+        book = BookService.get_book_data(book_id)
         if not book:
             return {'message': 'Book not found'}, 404
         
-        result = {
-            'id': book.id,
-            'title': book.title,
-            'author': book.author,
-            'isbn': book.isbn,
-            'available': book.available,
-            'created_at': book.created_at.isoformat() if book.created_at else None,
-            'updated_at': book.updated_at.isoformat() if book.updated_at else None
-        }
-        return result
+        headers, fresh = evaluate(make_etag('book', book['id'], book['updated_at']), book['updated_at'])
+        if fresh:
+            return not_modified(headers)
+        return book, 200, headers
     
     @books_ns.doc('update_book')
     @books_ns.expect(book_update_model)
-    @books_ns.marshal_with(book_model)
+    @books_ns.response(200, 'Success', book_model)
     def put(self, book_id):
         """Update a book"""
         try:
@@ -124,16 +293,7 @@ class BookAPI(Resource):
                     return {'message': error}, 404
                 return {'message': error}, 400
             
-            result = {
-                'id': book.id,
-                'title': book.title,
-                'author': book.author,
-                'isbn': book.isbn,
-                'available': book.available,
-                'created_at': book.created_at.isoformat() if book.created_at else None,
-                'updated_at': book.updated_at.isoformat() if book.updated_at else None
-            }
-            return result
+            return book.to_dict()
             
         except ValidationError as e:
             return {'message': 'Validation error', 'errors': e.messages}, 400
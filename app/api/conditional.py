@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+from functools import wraps
+from flask import request, Response
+from flask_restx.utils import unpack
+from werkzeug.http import generate_etag, quote_etag, http_date
+
+def make_etag(*parts):
+    """Build a strong ETag from the values that determine a representation."""
+    return generate_etag(repr(parts).encode('utf-8'))
+
+def _to_utc(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    # Timestamps are stored as naive UTC
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+def check_preconditions(etag, last_modified, if_none_match, if_modified_since):
+    """Check parsed If-None-Match and If-Modified-Since headers against validators.
+
+    if_none_match is an ETags set (empty when the header is absent) and
+    if_modified_since an aware datetime or None, as werkzeug parses them.
+    Returns the validator headers for the response and whether the
+    client's copy is current. If-Modified-Since is only honoured when no
+    If-None-Match is sent.
+    """
+    headers = {'ETag': quote_etag(etag), 'Cache-Control': 'no-cache'}
+    if last_modified is not None:
+        last_modified = _to_utc(last_modified)
+        headers['Last-Modified'] = http_date(last_modified)
+
+    if if_none_match:
+        fresh = if_none_match.contains_weak(etag)
+    elif last_modified is not None and if_modified_since is not None:
+        fresh = last_modified <= if_modified_since
+    else:
+        fresh = False
+    return headers, fresh
+
+def evaluate(etag, last_modified=None):
+    """Check the request's preconditions against a resource's validators."""
+    return check_preconditions(etag, last_modified, request.if_none_match, request.if_modified_since)
+
+def not_modified(headers):
+    """Build an empty 304 response carrying the validators."""
+    return Response(status=304, headers=headers)
+
+def conditional(get_validators):
+    """Support conditional GETs on a resource method.
+
+    get_validators is called with the view arguments and returns an ETag
+    and a last-modified time (or None), or None to skip the check. If the
+    client's copy is current a bare 304 is returned without calling the
+    view, so nothing is loaded or serialized; otherwise the validators
+    are added to the view's response.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            validators = get_validators(**kwargs)
+            if validators is None:
+                return f(*args, **kwargs)
+
+            headers, fresh = evaluate(*validators)
+            if fresh:
+                return not_modified(headers)
+
+            data, code, view_headers = unpack(f(*args, **kwargs))
+            if code == 200:
+                view_headers = {**dict(view_headers or {}), **headers}
+            return data, code, view_headers
+        return wrapper
+    return decorator
@@ -0,0 +1,74 @@
+from flask import request
+from flask_restx import Namespace, Resource, fields
+from app.models.book import Book
+from app.models.copy import Copy
+from app.services.copy_service import CopyService
+from app.schemas.copy_schemas import copy_create_schema
+from marshmallow import ValidationError
+
+# Create namespace for API documentation
+copies_ns = Namespace('copies', description='Physical copies of books')
+
+# Define API models for documentation
+copy_model = copies_ns.model('Copy', {
+    'id': fields.Integer(readonly=True, description='Copy ID'),
+    'book_id': fields.Integer(description='Book ID'),
+    'barcode': fields.String(description='Barcode of the copy'),
+    'status': fields.String(description='Copy status (available, on_loan or held)'),
+    'created_at': fields.DateTime(description='Creation timestamp'),
+    'updated_at': fields.DateTime(description='Last update timestamp')
+})
+
+copy_create_model = copies_ns.model('CopyCreate', {
+    'count': fields.Integer(description='Number of copies to add (default 1)')
+})
+
+copy_list_model = copies_ns.model('CopyList', {
+    'copies': fields.List(fields.Nested(copy_model), description='Copies of the book in the collection')
+})
+
+# Status codes for copy errors
+COPY_ERROR_STATUS = {
+    "Book not found": 404,
+    "Copy not found": 404,
+    "Copy is not on the shelf": 409
+}
+
+@copies_ns.route('/<int:book_id>/copies')
+@copies_ns.param('book_id', 'Book identifier')
+class BookCopiesAPI(Resource):
+    @copies_ns.doc('list_copies')
+    @copies_ns.response(200, 'Success', copy_list_model)
+    def get(self, book_id):
+        """List the copies of a book in the collection"""
+        if not Book.query.get(book_id):
+            return {'message': 'Book not found'}, 404
+        return {'copies': [Copy.row_to_dict(row) for row in CopyService.get_copies(book_id)]}, 200
+    
+    @copies_ns.doc('add_copies')
+    @copies_ns.expect(copy_create_model)
+    @copies_ns.response(201, 'Created', copy_list_model)
+    def post(self, book_id):
+        """Add copies of a book, filling its hold queue first"""
+        try:
+            copy_data = copy_create_schema.load(request.json or {})
+        except ValidationError as e:
+            copies_ns.abort(400, 'Validation error', errors=e.messages)
+        
+        copies, error = CopyService.add_copies(book_id, copy_data['count'])
+        if error:
+            return {'message': error}, COPY_ERROR_STATUS.get(error, 400)
+        return {'copies': [copy.to_dict() for copy in copies]}, 201
+
+@copies_ns.route('/<int:book_id>/copies/<int:copy_id>')
+@copies_ns.param('book_id', 'Book identifier')
+@copies_ns.param('copy_id', 'Copy identifier')
+class BookCopyAPI(Resource):
+    @copies_ns.doc('withdraw_copy')
+    @copies_ns.response(200, 'Copy withdrawn')
+    def delete(self, book_id, copy_id):
+        """Withdraw a copy that is on the shelf from the collection"""
+        success, message = CopyService.withdraw_copy(book_id, copy_id)
+        if not success:
+            return {'message': message}, COPY_ERROR_STATUS.get(message, 400)
+        return {'message': message}, 200
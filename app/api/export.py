@@ -0,0 +1,48 @@
+from datetime import timezone
+from flask import request, Response, stream_with_context
+from app.services.export_service import ExportService
+from app.schemas.export_schemas import export_query_schema
+from app.utils.streaming import gzip_chunks
+from marshmallow import ValidationError
+
+EXPORT_MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+def add_export_arguments(parser):
+    """Add the shared export query arguments to a request parser."""
+    parser.add_argument('format', type=str, location='args', choices=list(EXPORT_MIMETYPES),
+                        help='Export format (ndjson or csv)')
+    parser.add_argument('since', type=str, location='args',
+                        help='Only export rows updated at or after this ISO 8601 timestamp')
+    return parser
+
+def export_response(resource):
+    """Build a streaming export response for a resource.
+
+    The body is gzip-compressed when the client accepts it.
+    """
+    try:
+        params = export_query_schema.load(request.args)
+    except ValidationError as e:
+        return {'message': 'Validation error', 'errors': e.messages}, 400
+
+    since = params.get('since')
+    if since is not None and since.tzinfo is not None:
+        # Timestamps are stored as naive UTC
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+    export_format = params['format']
+    chunks = ExportService.export(resource, export_format, since=since)
+    headers = {
+        'Content-Disposition': f'attachment; filename={resource}.{export_format}',
+        'Vary': 'Accept-Encoding'
+    }
+    if request.accept_encodings['gzip']:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+
+    return Response(stream_with_context(chunks),
+                    mimetype=EXPORT_MIMETYPES[export_format],
+                    headers=headers)
@@ -0,0 +1,102 @@
+from flask import request, current_app
+from flask_restx import Namespace, Resource, fields
+from app.models.book import Book
+from app.models.hold import Hold
+from app.services.hold_service import HoldService
+from app.schemas.hold_schemas import hold_create_schema, hold_list_query_schema
+from marshmallow import ValidationError
+
+# Create namespace for API documentation
+holds_ns = Namespace('holds', description='Hold queues for books on loan')
+
+# Define API models for documentation
+hold_model = holds_ns.model('Hold', {
+    'id': fields.Integer(readonly=True, description='Hold ID'),
+    'book_id': fields.Integer(description='Book ID'),
+    'member_id': fields.Integer(description='Member ID'),
+    'copy_id': fields.Integer(description='Copy set aside for the member, once ready'),
+    'status': fields.String(description='Hold status (waiting, ready, fulfilled, expired or cancelled)'),
+    'position': fields.Integer(description='Place in the queue, 1 being the next member to get the book'),
+    'created_at': fields.DateTime(description='Creation timestamp'),
+    'ready_at': fields.DateTime(description='When a copy was set aside for the member'),
+    'expires_at': fields.DateTime(description='Pickup deadline of a ready hold'),
+    'updated_at': fields.DateTime(description='Last update timestamp')
+})
+
+hold_create_model = holds_ns.model('HoldCreate', {
+    'member_id': fields.Integer(required=True, description='Member ID joining the queue')
+})
+
+hold_list_model = holds_ns.model('HoldList', {
+    'holds': fields.List(fields.Nested(hold_model), description='Open holds on this page, in queue order'),
+    'limit': fields.Integer(description='Maximum number of holds per page'),
+    'next_cursor': fields.Integer(description='Cursor for the next page, null on the last page')
+})
+
+hold_list_parser = holds_ns.parser()
+hold_list_parser.add_argument('limit', type=int, location='args', help='Maximum number of holds to return')
+hold_list_parser.add_argument('cursor', type=int, location='args', help='Return holds with an ID greater than this cursor')
+
+# Status codes for hold errors
+HOLD_ERROR_STATUS = {
+    "Book not found": 404,
+    "Member not found": 404,
+    "Hold not found": 404,
+    "Book is available for borrowing": 409,
+    "Member already has this book on loan": 409,
+    "Member already has a hold on this book": 409,
+    "Hold is no longer open": 409
+}
+
+@holds_ns.route('/<int:book_id>/holds')
+@holds_ns.param('book_id', 'Book identifier')
+class BookHoldsAPI(Resource):
+    @holds_ns.doc('list_holds')
+    @holds_ns.expect(hold_list_parser)
+    @holds_ns.response(200, 'Success', hold_list_model)
+    def get(self, book_id):
+        """List the open holds on a book in queue order, one keyset-paginated page at a time"""
+        try:
+            params = hold_list_query_schema.load(request.args)
+        except ValidationError as e:
+            holds_ns.abort(400, 'Validation error', errors=e.messages)
+        
+        if not Book.query.get(book_id):
+            return {'message': 'Book not found'}, 404
+        
+        limit = min(params.get('limit', current_app.config['DEFAULT_PAGE_SIZE']),
+                    current_app.config['MAX_PAGE_SIZE'])
+        holds, position, next_cursor = HoldService.get_queue_page(book_id, limit, cursor=params.get('cursor'))
+        return {
+            'holds': [{**Hold.row_to_dict(row), 'position': position + index} for index, row in enumerate(holds)],
+            'limit': limit,
+            'next_cursor': next_cursor
+        }, 200
+    
+    @holds_ns.doc('place_hold')
+    @holds_ns.expect(hold_create_model)
+    @holds_ns.response(201, 'Created', hold_model)
+    def post(self, book_id):
+        """Join the hold queue of a book that is on loan"""
+        try:
+            hold_data = hold_create_schema.load(request.json)
+        except ValidationError as e:
+            holds_ns.abort(400, 'Validation error', errors=e.messages)
+        
+        hold, error = HoldService.place_hold(book_id, hold_data['member_id'])
+        if error:
+            return {'message': error}, HOLD_ERROR_STATUS.get(error, 400)
+        return {**hold.to_dict(), 'position': HoldService.get_position(hold)}, 201
+
+@holds_ns.route('/<int:book_id>/holds/<int:hold_id>')
+@holds_ns.param('book_id', 'Book identifier')
+@holds_ns.param('hold_id', 'Hold identifier')
+class BookHoldAPI(Resource):
+    @holds_ns.doc('cancel_hold')
+    @holds_ns.response(200, 'Success', hold_model)
+    def delete(self, book_id, hold_id):
+        """Cancel a hold, passing a book set aside for it to the next in line"""
+        hold, error = HoldService.cancel_hold(book_id, hold_id)
+        if error:
+            return {'message': error}, HOLD_ERROR_STATUS.get(error, 400)
+        return hold.to_dict(), 200
@@ -1,43 +1,153 @@
-from flask import request
+from datetime import datetime
+from flask import request, current_app
 from flask_restx import Namespace, Resource, fields
 from app.services.loan_service import LoanService
 from app.schemas.loan_schemas import (
-    loan_schema, loan_create_schema, loan_response_schema
+    LOAN_STATUSES, LOAN_EXPANSIONS, loan_create_schema, loan_page_query_schema, loan_list_query_schema,
+    loan_batch_create_schema, loan_response_schema
 )
+from app.api.books import book_model
+from app.api.members import member_model
+from app.api.export import add_export_arguments, export_response
 from marshmallow import ValidationError
 
 # Create namespace for API documentation
 loans_ns = Namespace('loans', description='Loan management operations')
 
 # Define API models for documentation
+loan_model = loans_ns.model('Loan', {
+    'id': fields.Integer(readonly=True, description='Loan ID'),
+    'book_id': fields.Integer(description='Book ID'),
+    'copy_id': fields.Integer(description='Copy ID of the item lent'),
+    'member_id': fields.Integer(description='Member ID'),
+    'borrowed_at': fields.DateTime(description='Borrowed timestamp'),
+    'due_at': fields.DateTime(description='Due date'),
+    'returned_at': fields.DateTime(description='Returned timestamp'),
+    'status': fields.String(description='Loan status (active, overdue or returned)'),
+    'policy': fields.String(description='Loan policy'),
+    'fine_cents': fields.Integer(description='Fine accrued, in cents; settled on return'),
+    'updated_at': fields.DateTime(description='Last update timestamp'),
+    'book': fields.Nested(book_model, description='Borrowed book, with expand=book'),
+    'member': fields.Nested(member_model, description='Borrowing member, with expand=member')
+})
+
+loan_list_model = loans_ns.model('LoanList', {
+    'loans': fields.List(fields.Nested(loan_model), description='Loans on this page'),
+    'limit': fields.Integer(description='Maximum number of loans per page'),
+    'next_cursor': fields.Integer(description='Cursor for the next page, null on the last page')
+})
+
+loan_page_parser = loans_ns.parser()
+loan_page_parser.add_argument('limit', type=int, location='args', help='Maximum number of loans to return')
+loan_page_parser.add_argument('cursor', type=int, location='args', help='Return loans with an ID greater than this cursor')
+loan_page_parser.add_argument('member_id', type=int, location='args', help='Filter by member')
+loan_page_parser.add_argument('book_id', type=int, location='args', help='Filter by book')
+loan_page_parser.add_argument('expand', type=str, location='args',
+                              help=f"Comma-separated related objects to embed ({', '.join(LOAN_EXPANSIONS)})")
+loan_page_parser.add_argument('fields', type=str, location='args',
+                              help='Comma-separated loan fields to return (default: all)')
+
+loan_list_parser = loan_page_parser.copy()
+loan_list_parser.add_argument('status', type=str, location='args',
+                              help=f"Comma-separated statuses to include ({', '.join(LOAN_STATUSES)})")
+
 loan_create_model = loans_ns.model('LoanCreate', {
     'book_id': fields.Integer(required=True, description='Book ID to borrow'),
-    'member_id': fields.Integer(required=True, description='Member ID who is borrowing')
+    'member_id': fields.Integer(required=True, description='Member ID who is borrowing'),
+    'policy': fields.String(description='Loan policy setting the due date and fines (default: standard)')
 })
 
 loan_response_model = loans_ns.model('LoanResponse', {
     'loan_id': fields.Integer(description='Loan ID'),
     'book_id': fields.Integer(description='Book ID'),
+    'copy_id': fields.Integer(description='Copy ID of the item lent'),
     'member_id': fields.Integer(description='Member ID'),
     'borrowed_at': fields.DateTime(description='Borrowed timestamp'),
+    'due_at': fields.DateTime(description='Due date'),
     'status': fields.String(description='Loan status'),
+    'policy': fields.String(description='Loan policy'),
     'message': fields.String(description='Response message')
 })
 
+loan_batch_create_model = loans_ns.model('LoanBatchCreate', {
+    'member_id': fields.Integer(required=True, description='Member ID who is borrowing'),
+    'book_ids': fields.List(fields.Integer, required=True, description='Book IDs to borrow'),
+    'mode': fields.String(enum=['all_or_nothing', 'best_effort'], default='all_or_nothing',
+                          description='Apply all items or none, or apply every item that succeeds'),
+    'policy': fields.String(description='Loan policy for every book (default: standard)')
+})
+
+loan_batch_item_model = loans_ns.inherit('LoanBatchItem', loan_response_model, {
+    'status_code': fields.Integer(description='Status code of this item')
+})
+
+loan_batch_response_model = loans_ns.model('LoanBatchResponse', {
+    'results': fields.List(fields.Nested(loan_batch_item_model), description='Result per book, in request order')
+})
+
+# Status codes for borrow errors, shared by single and batch borrows
+BORROW_ERROR_STATUS = {
+    "Book not found": 404,
+    "Member not found": 404,
+    "Book is not available for borrowing": 409,
+    "Book is already borrowed": 409,
+    "Book is reserved for another member": 409,
+    LoanService.UNKNOWN_POLICY: 400,
+    LoanService.LIMIT_REACHED: 409,
+    LoanService.BATCH_ABORTED: 424
+}
+
+def borrow_result(loan):
+    """Build the response data for a successful borrow."""
+    return {
+        'loan_id': loan.id,
+        'book_id': loan.book_id,
+        'copy_id': loan.copy_id,
+        'member_id': loan.member_id,
+        'borrowed_at': loan.borrowed_at.isoformat(),
+        'due_at': loan.due_at.isoformat(),
+        'status': loan.status,
+        'policy': loan.policy,
+        'message': 'Book borrowed successfully'
+    }
+
+def loans_page(params, **filters):
+    """Build the response data for a page of loans from validated query parameters."""
+    limit = min(params.get('limit', current_app.config['DEFAULT_PAGE_SIZE']),
+                current_app.config['MAX_PAGE_SIZE'])
+    loans, next_cursor = LoanService.get_loans_page(
+        limit,
+        cursor=params.get('cursor'),
+        member_id=params.get('member_id'),
+        book_id=params.get('book_id'),
+        expand=params['expand'],
+        fields=params.get('fields'),
+        **filters
+    )
+    serialize = LoanService.loan_row_serializer(params.get('fields'), params['expand'])
+    return {
+        'loans': [serialize(row) for row in loans],
+        'limit': limit,
+        'next_cursor': next_cursor
+    }
+
 @loans_ns.route('')
 class LoanAPI(Resource):
-    @loans_ns.doc('get_loans')
+    @loans_ns.doc('list_loans')
+    @loans_ns.expect(loan_list_parser)
+    @loans_ns.response(200, 'Success', loan_list_model)
     def get(self):
-        """Get all loans"""
+        """List loans, one keyset-paginated page at a time"""
         try:
-            loans = LoanService.get_all_loans()
-            return loan_schema.dump(loans, many=True), 200
-        except Exception as e:
-            return {'message': str(e)}, 500
+            params = loan_list_query_schema.load(request.args)
+        except ValidationError as e:
+            loans_ns.abort(400, 'Validation error', errors=e.messages)
+        
+        return loans_page(params, status=params.get('status')), 200
     
     @loans_ns.doc('borrow_book')
     @loans_ns.expect(loan_create_model)
-    @loans_ns.marshal_with(loan_response_model, code=201)
+    @loans_ns.response(201, 'Created', loan_response_model)
     def post(self):
         """Borrow a book"""
         try:
@@ -48,24 +158,64 @@ class LoanAPI(Resource):
             loan, error = LoanService.borrow_book(loan_data)
             
             if error:
-                if error in ["Book not found", "Member not found"]:
-                    return {'message': error}, 404
-                if error in ["Book is not available for borrowing", "Book is already borrowed"]:
-                    return {'message': error}, 409
-                return {'message': error}, 400
+                return {'message': error}, BORROW_ERROR_STATUS.get(error, 400)
             
-            response_data = {
-                'loan_id': loan.id,
-                'book_id': loan.book_id,
-                'member_id': loan.member_id,
-                'borrowed_at': loan.borrowed_at.isoformat(),
-                'status': loan.status,
-                'message': 'Book borrowed successfully'
-            }
-            
-            return response_data, 201
+            return borrow_result(loan), 201
             
         except ValidationError as e:
             return {'message': 'Validation error', 'errors': e.messages}, 400
         except Exception as e:
             return {'message': str(e)}, 500
+
+@loans_ns.route('/batch')
+class LoanBatchAPI(Resource):
+    @loans_ns.doc('borrow_books')
+    @loans_ns.expect(loan_batch_create_model)
+    @loans_ns.response(201, 'Created', loan_batch_response_model)
+    @loans_ns.response(207, 'Some items failed', loan_batch_response_model)
+    def post(self):
+        """Borrow several books for one member in a single transaction"""
+        try:
+            batch_data = loan_batch_create_schema.load(request.json)
+        except ValidationError as e:
+            loans_ns.abort(400, 'Validation error', errors=e.messages)
+        
+        outcomes = LoanService.borrow_books(
+            batch_data['member_id'],
+            batch_data['book_ids'],
+            all_or_nothing=batch_data['mode'] == 'all_or_nothing',
+            policy=batch_data.get('policy')
+        )
+        
+        results = []
+        for book_id, (loan, error) in zip(batch_data['book_ids'], outcomes):
+            if error:
+                results.append({'book_id': book_id, 'member_id': batch_data['member_id'],
+                                'message': error, 'status_code': BORROW_ERROR_STATUS.get(error, 400)})
+            else:
+                results.append({**borrow_result(loan), 'status_code': 201})
+        
+        failed = any(result['status_code'] != 201 for result in results)
+        return {'results': results}, 207 if failed else 201
+
+@loans_ns.route('/overdue')
+class OverdueLoanAPI(Resource):
+    @loans_ns.doc('list_overdue_loans')
+    @loans_ns.expect(loan_page_parser)
+    @loans_ns.response(200, 'Success', loan_list_model)
+    def get(self):
+        """List loans past their due date and not yet returned, one keyset-paginated page at a time"""
+        try:
+            params = loan_page_query_schema.load(request.args)
+        except ValidationError as e:
+            loans_ns.abort(400, 'Validation error', errors=e.messages)
+        
+        return loans_page(params, overdue_at=datetime.utcnow()), 200
+
+@loans_ns.route('/export')
+class LoanExportAPI(Resource):
+    @loans_ns.doc('export_loans')
+    @loans_ns.expect(add_export_arguments(loans_ns.parser()))
+    def get(self):
+        """Stream all loans as NDJSON or CSV"""
+        return export_response('loans')
@@ -0,0 +1,72 @@
+from flask import request, current_app
+from flask_restx import Namespace, Resource, fields
+from app.services.loan_service import LoanService
+from app.services.member_service import MemberService
+from app.schemas.loan_schemas import member_loan_query_schema
+from app.api.loans import loan_list_model, loan_list_parser
+from marshmallow import ValidationError
+
+# Create namespace for API documentation
+member_loans_ns = Namespace('member_loans', description="Members' loan history and borrowing statistics")
+
+# Define API models for documentation
+member_stats_model = member_loans_ns.model('MemberStats', {
+    'member_id': fields.Integer(description='Member ID'),
+    'total_loans': fields.Integer(description='Loans ever made by the member'),
+    'open_loans': fields.Integer(description='Loans not yet returned, overdue or not'),
+    'overdue_loans': fields.Integer(description='Loans past their due date and not yet returned'),
+    'returned_loans': fields.Integer(description='Loans returned'),
+    'fines_cents': fields.Integer(description='Fines on all loans, in cents'),
+    'accruing_fines_cents': fields.Integer(description='Fines on loans not yet returned, in cents'),
+    'first_borrowed_at': fields.DateTime(description='When the member first borrowed a book'),
+    'last_borrowed_at': fields.DateTime(description='When the member last borrowed a book')
+})
+
+member_loan_list_parser = loan_list_parser.copy()
+member_loan_list_parser.remove_argument('member_id')
+
+@member_loans_ns.route('/<int:member_id>/loans')
+@member_loans_ns.param('member_id', 'Member identifier')
+class MemberLoansAPI(Resource):
+    @member_loans_ns.doc('list_member_loans')
+    @member_loans_ns.expect(member_loan_list_parser)
+    @member_loans_ns.response(200, 'Success', loan_list_model)
+    def get(self, member_id):
+        """List a member's loans, one keyset-paginated page at a time"""
+        try:
+            params = member_loan_query_schema.load(request.args)
+        except ValidationError as e:
+            member_loans_ns.abort(400, 'Validation error', errors=e.messages)
+        
+        limit = min(params.get('limit', current_app.config['DEFAULT_PAGE_SIZE']),
+                    current_app.config['MAX_PAGE_SIZE'])
+        page = MemberService.get_member_loans(
+            member_id,
+            limit,
+            cursor=params.get('cursor'),
+            status=params.get('status'),
+            expand=params['expand'],
+            fields=params.get('fields')
+        )
+        if page is None:
+            return {'message': 'Member not found'}, 404
+        
+        loans, next_cursor = page
+        serialize = LoanService.loan_row_serializer(params.get('fields'), params['expand'])
+        return {
+            'loans': [serialize(row) for row in loans],
+            'limit': limit,
+            'next_cursor': next_cursor
+        }, 200
+
+@member_loans_ns.route('/<int:member_id>/loans/stats')
+@member_loans_ns.param('member_id', 'Member identifier')
+class MemberLoanStatsAPI(Resource):
+    @member_loans_ns.doc('get_member_loan_stats')
+    @member_loans_ns.response(200, 'Success', member_stats_model)
+    def get(self, member_id):
+        """Get a member's borrowing statistics"""
+        stats = MemberService.get_member_stats(member_id)
+        if stats is None:
+            return {'message': 'Member not found'}, 404
+        return stats, 200
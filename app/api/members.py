@@ -1,9 +1,13 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
+from app.models.member import Member
 from app.services.member_service import MemberService
 from app.schemas.member_schemas import (
-    member_schema, members_schema, member_create_schema, member_update_schema
+    member_create_schema, member_update_schema, member_list_query_schema
 )
+from app.utils.serialization import column_serializer
+from app.api.export import add_export_arguments, export_response
+from app.api.conditional import conditional, evaluate, make_etag, not_modified
 from marshmallow import ValidationError
 
 # Create namespace for API documentation
@@ -15,6 +19,8 @@ member_model = members_ns.model('Member', {
     'name': fields.String(required=True, description='Member name'),
     'email': fields.String(required=True, description='Member email'),
     'phone': fields.String(description='Member phone'),
+    'tier': fields.String(description='Member tier, setting the borrowing limit'),
+    'active_loan_count': fields.Integer(readonly=True, description='Loans not yet returned'),
     'created_at': fields.DateTime(readonly=True, description='Creation timestamp'),
     'updated_at': fields.DateTime(readonly=True, description='Last update timestamp')
 })
@@ -22,27 +28,45 @@ member_model = members_ns.model('Member', {
 member_create_model = members_ns.model('MemberCreate', {
     'name': fields.String(required=True, description='Member name'),
     'email': fields.String(required=True, description='Member email'),
-    'phone': fields.String(description='Member phone')
+    'phone': fields.String(description='Member phone'),
+    'tier': fields.String(description='Member tier, setting the borrowing limit (default: standard)')
 })
 
 member_update_model = members_ns.model('MemberUpdate', {
     'name': fields.String(description='Member name'),
     'email': fields.String(description='Member email'),
-    'phone': fields.String(description='Member phone')
+    'phone': fields.String(description='Member phone'),
+    'tier': fields.String(description='Member tier, setting the borrowing limit')
 })
 
+def member_list_validators():
+    """Get the ETag of the member listing."""
+    count, last_updated = MemberService.get_members_version()
+    # Deletes do not advance max(updated_at), so lists carry no Last-Modified
+    return make_etag('members', sorted(request.args.items(multi=True)), count, str(last_updated)), None
+
+member_list_parser = members_ns.parser()
+member_list_parser.add_argument('fields', type=str, location='args', help='Comma-separated member fields to return (default: all)')
+
 @members_ns.route('')
 class MemberListAPI(Resource):
     @members_ns.doc('list_members')
-    @members_ns.marshal_list_with(member_model)
+    @members_ns.expect(member_list_parser)
+    @members_ns.response(200, 'Success', [member_model])
+    @conditional(member_list_validators)
     def get(self):
         """List all members"""
-        members = MemberService.get_all_members()
-        return members_schema.dump(members)
+        try:
+            params = member_list_query_schema.load(request.args)
+        except ValidationError as e:
+            members_ns.abort(400, 'Validation error', errors=e.messages)
+        
+        serialize = column_serializer(Member, params.get('fields'), rows=True)
+        return [serialize(row) for row in MemberService.get_all_member_rows(params.get('fields'))]
     
     @members_ns.doc('create_member')
     @members_ns.expect(member_create_model)
-    @members_ns.marshal_with(member_model, code=201)
+    @members_ns.response(201, 'Created', member_model)
     def post(self):
         """Register a new member"""
         try:
@@ -57,29 +81,41 @@ class MemberListAPI(Resource):
                     return {'message': error}, 409
                 return {'message': error}, 400
             
-            return member_schema.dump(member), 201
+            return member.to_dict(), 201
             
         except ValidationError as e:
             return {'message': 'Validation error', 'errors': e.messages}, 400
         except Exception as e:
             return {'message': str(e)}, 500
 
+@members_ns.route('/export')
+class MemberExportAPI(Resource):
+    @members_ns.doc('export_members')
+    @members_ns.expect(add_export_arguments(members_ns.parser()))
+    def get(self):
+        """Stream all members as NDJSON or CSV"""
+        return export_response('members')
+
 @members_ns.route('/<int:member_id>')
 @members_ns.param('member_id', 'Member identifier')
 class MemberAPI(Resource):
     @members_ns.doc('get_member')
-    @members_ns.marshal_with(member_model)
+    @members_ns.response(200, 'Success', member_model)
+    @members_ns.response(304, 'Not modified')
     def get(self, member_id):
         """Get member details by ID"""
-        member = MemberService.get_member_by_id(member_id)
+        member = MemberService.get_member_data(member_id)
         if not member:
             return {'message': 'Member not found'}, 404
         
-        return member_schema.dump(member)
+        headers, fresh = evaluate(make_etag('member', member['id'], member['updated_at']), member['updated_at'])
+        if fresh:
+            return not_modified(headers)
+        return member, 200, headers
     
     @members_ns.doc('update_member')
     @members_ns.expect(member_update_model)
-    @members_ns.marshal_with(member_model)
+    @members_ns.response(200, 'Success', member_model)
     def put(self, member_id):
         """Update a member"""
         try:
@@ -96,7 +132,7 @@ class MemberAPI(Resource):
                     return {'message': error}, 409
                 return {'message': error}, 400
             
-            return member_schema.dump(member)
+            return member.to_dict()
             
         except ValidationError as e:
             return {'message': 'Validation error', 'errors': e.messages}, 400
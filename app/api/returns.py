@@ -2,7 +2,7 @@ from flask import request
 from flask_restx import Namespace, Resource, fields
 from app.services.loan_service import LoanService
 from app.schemas.loan_schemas import (
-    loan_return_schema, loan_response_schema
+    loan_return_schema, loan_batch_return_schema, loan_response_schema
 )
 from marshmallow import ValidationError
 
@@ -17,18 +17,57 @@ return_model = returns_ns.model('BookReturn', {
 return_response_model = returns_ns.model('ReturnResponse', {
     'loan_id': fields.Integer(description='Loan ID'),
     'book_id': fields.Integer(description='Book ID'),
+    'copy_id': fields.Integer(description='Copy ID of the item returned'),
     'member_id': fields.Integer(description='Member ID'),
     'borrowed_at': fields.DateTime(description='Borrowed timestamp'),
+    'due_at': fields.DateTime(description='Due date'),
     'returned_at': fields.DateTime(description='Returned timestamp'),
     'status': fields.String(description='Loan status'),
+    'fine_cents': fields.Integer(description='Fine owed for returning late, in cents'),
     'message': fields.String(description='Response message')
 })
 
+return_batch_model = returns_ns.model('BookReturnBatch', {
+    'loan_ids': fields.List(fields.Integer, required=True, description='Loan IDs to return'),
+    'mode': fields.String(enum=['all_or_nothing', 'best_effort'], default='all_or_nothing',
+                          description='Apply all items or none, or apply every item that succeeds')
+})
+
+return_batch_item_model = returns_ns.inherit('ReturnBatchItem', return_response_model, {
+    'status_code': fields.Integer(description='Status code of this item')
+})
+
+return_batch_response_model = returns_ns.model('ReturnBatchResponse', {
+    'results': fields.List(fields.Nested(return_batch_item_model), description='Result per loan, in request order')
+})
+
+# Status codes for return errors, shared by single and batch returns
+RETURN_ERROR_STATUS = {
+    "Loan not found": 404,
+    "Book has already been returned": 409,
+    LoanService.BATCH_ABORTED: 424
+}
+
+def return_result(loan):
+    """Build the response data for a successful return."""
+    return {
+        'loan_id': loan.id,
+        'book_id': loan.book_id,
+        'copy_id': loan.copy_id,
+        'member_id': loan.member_id,
+        'borrowed_at': loan.borrowed_at.isoformat(),
+        'due_at': loan.due_at.isoformat(),
+        'returned_at': loan.returned_at.isoformat() if loan.returned_at else None,
+        'status': loan.status,
+        'fine_cents': loan.fine_cents,
+        'message': 'Book returned successfully'
+    }
+
 @returns_ns.route('')
 class ReturnAPI(Resource):
     @returns_ns.doc('return_book')
     @returns_ns.expect(return_model)
-    @returns_ns.marshal_with(return_response_model, code=200)
+    @returns_ns.response(200, 'Success', return_response_model)
     def post(self):
         """Return a borrowed book"""
         try:
@@ -40,25 +79,40 @@ class ReturnAPI(Resource):
             loan, error = LoanService.return_book(loan_id)
             
             if error:
-                if error == "Loan not found":
-                    return {'message': error}, 404
-                if error == "Book has already been returned":
-                    return {'message': error}, 409
-                return {'message': error}, 400
-            
-            response_data = {
-                'loan_id': loan.id,
-                'book_id': loan.book_id,
-                'member_id': loan.member_id,
-                'borrowed_at': loan.borrowed_at.isoformat(),
-                'returned_at': loan.returned_at.isoformat() if loan.returned_at else None,
-                'status': loan.status,
-                'message': 'Book returned successfully'
-            }
+                return {'message': error}, RETURN_ERROR_STATUS.get(error, 400)
             
-            return response_data, 200
+            return return_result(loan), 200
             
         except ValidationError as e:
             return {'message': 'Validation error', 'errors': e.messages}, 400
         except Exception as e:
             return {'message': str(e)}, 500
+
+@returns_ns.route('/batch')
+class ReturnBatchAPI(Resource):
+    @returns_ns.doc('return_books')
+    @returns_ns.expect(return_batch_model)
+    @returns_ns.response(200, 'Success', return_batch_response_model)
+    @returns_ns.response(207, 'Some items failed', return_batch_response_model)
+    def post(self):
+        """Return several borrowed books in a single transaction"""
+        try:
+            batch_data = loan_batch_return_schema.load(request.json)
+        except ValidationError as e:
+            returns_ns.abort(400, 'Validation error', errors=e.messages)
+        
+        outcomes = LoanService.return_books(
+            batch_data['loan_ids'],
+            all_or_nothing=batch_data['mode'] == 'all_or_nothing'
+        )
+        
+        results = []
+        for loan_id, (loan, error) in zip(batch_data['loan_ids'], outcomes):
+            if error:
+                results.append({'loan_id': loan_id, 'message': error,
+                                'status_code': RETURN_ERROR_STATUS.get(error, 400)})
+            else:
+                results.append({**return_result(loan), 'status_code': 200})
+        
+        failed = any(result['status_code'] != 200 for result in results)
+        return {'results': results}, 207 if failed else 200
@@ -0,0 +1,50 @@
+from flask import request
+from flask_restx import Namespace, Resource, fields
+from app import cache
+from app.services.stats_service import StatsService
+
+# Create namespace for API documentation
+stats_ns = Namespace('stats', description='Library statistics')
+
+# Define API models for documentation
+loans_per_day_model = stats_ns.model('LoansPerDay', {
+    'date': fields.String(description='Day (UTC, ISO 8601)'),
+    'borrowed': fields.Integer(description='Books borrowed that day'),
+    'returned': fields.Integer(description='Books returned that day')
+})
+
+stats_model = stats_ns.model('Stats', {
+    'total_books': fields.Integer(description='Number of books'),
+    'total_copies': fields.Integer(description='Number of copies in the collection'),
+    'available_copies': fields.Integer(description='Number of copies on the shelf'),
+    'unavailable_copies': fields.Integer(description='Number of copies on loan or set aside for holds'),
+    'total_members': fields.Integer(description='Number of members'),
+    'active_loans': fields.Integer(description='Number of loans not yet returned, including overdue ones'),
+    'overdue_loans': fields.Integer(description='Number of loans marked overdue by the last overdue sweep'),
+    'loans_per_day': fields.List(fields.Nested(loans_per_day_model), description='Loans per day, oldest first')
+})
+
+cache_stats_model = stats_ns.model('CacheStats', {
+    'backend': fields.String(description='Cache backend (lru, redis or null)'),
+    'hits': fields.Integer(description='Lookups served from the cache'),
+    'misses': fields.Integer(description='Lookups that went to the database'),
+    'evictions': fields.Integer(description='Entries evicted to make room'),
+    'size': fields.Integer(description='Number of cached entries, when known')
+})
+
+@stats_ns.route('')
+class StatsAPI(Resource):
+    @stats_ns.doc('get_stats', params={'days': 'Number of days of loan history (default 30, max 365)'})
+    @stats_ns.response(200, 'Success', stats_model)
+    def get(self):
+        """Get library statistics from the precomputed counters"""
+        days = request.args.get('days', 30, type=int)
+        return StatsService.get_stats(days=max(1, min(days, 365)))
+
+@stats_ns.route('/cache')
+class CacheStatsAPI(Resource):
+    @stats_ns.doc('get_cache_stats')
+    @stats_ns.response(200, 'Success', cache_stats_model)
+    def get(self):
+        """Get the hit, miss and eviction counters of the cache"""
+        return cache.stats()
@@ -0,0 +1,224 @@
+"""Async read-only API for high-concurrency clients such as kiosks.
+
+Serves the book, member and loan GET endpoints as an ASGI application on
+SQLAlchemy's asyncio extension, so one event loop handles many requests
+waiting on the database without a thread each. Responses are the same
+JSON as the Flask API's, with the same ETag and Last-Modified validators
+for conditional requests. Writes stay on the Flask application.
+
+Needs the aiosqlite package (asyncpg for PostgreSQL) and an ASGI server:
+    uvicorn asgi:app
+"""
+import re
+from urllib.parse import parse_qsl
+from marshmallow import ValidationError
+from werkzeug.http import parse_date, parse_etags
+from app import create_app
+from app.api.conditional import check_preconditions, make_etag
+from app.models.book import Book
+from app.models.member import Member
+from app.schemas.book_schemas import book_list_query_schema
+from app.schemas.member_schemas import member_list_query_schema
+from app.schemas.loan_schemas import loan_list_query_schema
+from app.services.async_read_service import AsyncReadService
+from app.services.loan_service import LoanService
+from app.utils.serialization import column_serializer, dumps
+from app.utils.sql import apply_sqlite_pragmas
+
+# Async drivers for the database URL schemes the application supports
+ASYNC_DRIVERS = {
+    'sqlite': ('sqlite+aiosqlite', 'aiosqlite'),
+    'postgresql': ('postgresql+asyncpg', 'asyncpg')
+}
+
+def async_database_uri(uri):
+    """Get the async driver URL for a database URL, checking the driver is installed."""
+    scheme, rest = uri.split('://', 1)
+    dialect = scheme.split('+', 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise RuntimeError(f"The async API does not support {dialect} databases")
+    async_scheme, package = ASYNC_DRIVERS[dialect]
+    try:
+        __import__(package)
+    except ImportError:
+        raise RuntimeError(f"The async API requires the {package} package")
+    return f'{async_scheme}://{rest}'
+
+class AsyncReadAPI:
+    """ASGI application routing the read endpoints to AsyncReadService."""
+
+    def __init__(self, config, engine):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        self.config = config
+        self.engine = engine
+        self.sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        self.routes = [
+            (re.compile(r'/api/v1/books/?'), self.list_books),
+            (re.compile(r'/api/v1/books/(\d+)'), self.get_book),
+            (re.compile(r'/api/v1/members/?'), self.list_members),
+            (re.compile(r'/api/v1/members/(\d+)'), self.get_member),
+            (re.compile(r'/api/v1/loans/?'), self.list_loans)
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] == 'websocket':
+            # Refuse the handshake
+            await receive()
+            return await send({'type': 'websocket.close', 'code': 1003})
+        if scope['type'] != 'http':
+            raise ValueError(f"The async API does not serve {scope['type']} connections")
+
+        headers = {}
+        if scope['method'] != 'GET':
+            status, data = 405, {'message': 'The async API only serves reads'}
+        else:
+            status, data = 404, {'message': 'Not found'}
+            for pattern, handler in self.routes:
+                match = pattern.fullmatch(scope['path'])
+                if match:
+                    args = dict(parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True))
+                    request_headers = dict(scope['headers'])
+                    async with self.sessionmaker() as session:
+                        status, data, headers = await handler(session, args, request_headers, *match.groups())
+                    break
+
+        body = b'' if status == 304 else (dumps(data) + '\n').encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+                       + [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def page_limit(self, params):
+        return min(params.get('limit', self.config['DEFAULT_PAGE_SIZE']), self.config['MAX_PAGE_SIZE'])
+
+    @staticmethod
+    def validation_error(e):
+        return 400, {'errors': e.messages, 'message': 'Validation error'}, {}
+
+    @staticmethod
+    def evaluate(request_headers, etag, last_modified=None):
+        """Check the request's preconditions, as the Flask API's evaluate does."""
+        def header(name):
+            return request_headers.get(name, b'').decode('latin-1') or None
+        return check_preconditions(etag, last_modified, parse_etags(header(b'if-none-match')),
+                                   parse_date(header(b'if-modified-since')))
+
+    def resource(self, data, name, request_headers):
+        """Respond with a book or member, or 304 if the client's copy is current."""
+        headers, fresh = self.evaluate(request_headers, make_etag(name, data['id'], data['updated_at']),
+                                       data['updated_at'])
+        if fresh:
+            return 304, None, headers
+        return 200, data, headers
+
+    def listing(self, name, args, version, request_headers):
+        """Get the validators of a listing, as the Flask API's list validators build them.
+
+        Lists carry no Last-Modified, since deletes do not advance max(updated_at).
+        """
+        count, last_updated = version
+        return self.evaluate(request_headers, make_etag(name, sorted(args.items()), count, str(last_updated)))
+
+    async def list_books(self, session, args, request_headers):
+        try:
+            params = book_list_query_schema.load(args)
+        except ValidationError as e:
+            return self.validation_error(e)
+
+        filters = {
+            'available': params.get('available'),
+            'author': params.get('author'),
+            'title_prefix': params.get('title')
+        }
+        version = await AsyncReadService.get_books_version(session, **filters)
+        headers, fresh = self.listing('books', args, version, request_headers)
+        if fresh:
+            return 304, None, headers
+
+        limit = self.page_limit(params)
+        books, next_cursor = await AsyncReadService.get_books_page(
+            session, limit, cursor=params.get('cursor'), fields=params.get('fields'), **filters
+        )
+        serialize = column_serializer(Book, params.get('fields'), rows=True)
+        return 200, {
+            'books': [serialize(row) for row in books],
+            'limit': limit,
+            'next_cursor': next_cursor
+        }, headers
+
+    async def get_book(self, session, args, request_headers, book_id):
+        book = await AsyncReadService.get_book_data(session, int(book_id))
+        if not book:
+            return 404, {'message': 'Book not found'}, {}
+        return self.resource(book, 'book', request_headers)
+
+    async def list_members(self, session, args, request_headers):
+        try:
+            params = member_list_query_schema.load(args)
+        except ValidationError as e:
+            return self.validation_error(e)
+
+        version = await AsyncReadService.get_members_version(session)
+        headers, fresh = self.listing('members', args, version, request_headers)
+        if fresh:
+            return 304, None, headers
+
+        serialize = column_serializer(Member, params.get('fields'), rows=True)
+        rows = await AsyncReadService.get_all_member_rows(session, params.get('fields'))
+        return 200, [serialize(row) for row in rows], headers
+
+    async def get_member(self, session, args, request_headers, member_id):
+        member = await AsyncReadService.get_member_data(session, int(member_id))
+        if not member:
+            return 404, {'message': 'Member not found'}, {}
+        return self.resource(member, 'member', request_headers)
+
+    async def list_loans(self, session, args, request_headers):
+        try:
+            params = loan_list_query_schema.load(args)
+        except ValidationError as e:
+            return self.validation_error(e)
+
+        limit = self.page_limit(params)
+        loans, next_cursor = await AsyncReadService.get_loans_page(
+            session, limit,
+            cursor=params.get('cursor'),
+            status=params.get('status'),
+            member_id=params.get('member_id'),
+            book_id=params.get('book_id'),
+            expand=params['expand'],
+            fields=params.get('fields')
+        )
+        serialize = LoanService.loan_row_serializer(params.get('fields'), params['expand'])
+        return 200, {
+            'loans': [serialize(row) for row in loans],
+            'limit': limit,
+            'next_cursor': next_cursor
+        }, {}
+
+def create_asgi_app(config_name='default'):
+    """Create the async read API over the database of a Flask configuration."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    # The Flask application loads the configuration
+    flask_app = create_app(config_name)
+    config = flask_app.config
+    engine = create_async_engine(async_database_uri(config['SQLALCHEMY_DATABASE_URI']),
+                                 **config['SQLALCHEMY_ENGINE_OPTIONS'])
+    apply_sqlite_pragmas(engine.sync_engine, config['SQLITE_PRAGMAS'])
+    return AsyncReadAPI(config, engine)
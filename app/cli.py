@@ -0,0 +1,146 @@
+import click
+from flask.cli import AppGroup
+
+# Command groups registered on the application
+stats_cli = AppGroup('stats', help='Dashboard statistics commands.')
+loans_cli = AppGroup('loans', help='Loan maintenance commands.')
+holds_cli = AppGroup('holds', help='Hold queue maintenance commands.')
+members_cli = AppGroup('members', help='Member maintenance commands.')
+jobs_cli = AppGroup('jobs', help='Background job commands.')
+
+@stats_cli.command('reconcile')
+def reconcile_stats():
+    """Recompute the statistics counters from the source tables."""
+    from app.services.stats_service import StatsService
+    
+    values, error = StatsService.reconcile()
+    if error:
+        raise click.ClickException(error)
+    click.echo(f"Reconciled {len(values)} counters")
+
+@loans_cli.command('sweep-overdue')
+@click.option('--batch-size', type=click.IntRange(min=1), default=None,
+              help='Loans updated per transaction (default: OVERDUE_SWEEP_BATCH_SIZE).')
+def sweep_overdue(batch_size):
+    """Mark loans past their due date as overdue and accrue fines."""
+    from app.services.loan_service import LoanService
+    
+    result, error = LoanService.sweep_overdue(batch_size=batch_size)
+    if error:
+        raise click.ClickException(error)
+    click.echo(f"Marked {result['marked']} loans overdue, updated {result['fined']} fines")
+
+@loans_cli.command('archive')
+@click.option('--after-days', type=click.IntRange(min=1), default=None,
+              help='Archive loans returned more than this many days ago (default: LOAN_ARCHIVE_AFTER_DAYS).')
+@click.option('--batch-size', type=click.IntRange(min=1), default=None,
+              help='Loans moved per transaction (default: LOAN_ARCHIVE_BATCH_SIZE).')
+def archive_loans(after_days, batch_size):
+    """Move long-returned loans to the loan history table."""
+    from app.services.loan_service import LoanService
+    
+    result, error = LoanService.archive_returned(after_days=after_days, batch_size=batch_size)
+    if error:
+        raise click.ClickException(error)
+    click.echo(f"Archived {result['archived']} loans")
+
+@holds_cli.command('expire')
+@click.option('--batch-size', type=click.IntRange(min=1), default=None,
+              help='Holds expired per transaction (default: HOLD_EXPIRY_BATCH_SIZE).')
+def expire_holds(batch_size):
+    """Expire uncollected holds and pass their books on."""
+    from app.services.hold_service import HoldService
+    
+    result, error = HoldService.expire_holds(batch_size=batch_size)
+    if error:
+        raise click.ClickException(error)
+    click.echo(f"Expired {result['expired']} holds, released {result['released']} books")
+
+@members_cli.command('check-loan-counts')
+@click.option('--fix', is_flag=True, help='Recompute the drifted counters from the loans table.')
+def check_loan_counts(fix):
+    """Check members' active loan counters against their open loans."""
+    from app.services.member_service import MemberService
+    
+    drifted, error = MemberService.check_loan_counts(fix=fix)
+    if error:
+        raise click.ClickException(error)
+    for member_id, stored, actual in drifted:
+        click.echo(f"Member {member_id}: active_loan_count {stored}, open loans {actual}")
+    if drifted and not fix:
+        raise click.ClickException(f"{len(drifted)} members have drifted counters; rerun with --fix")
+    click.echo(f"Fixed {len(drifted)} members" if drifted else "All member loan counters match")
+
+@jobs_cli.command('run')
+def run_jobs():
+    """Run the background jobs in this process until interrupted.
+    
+    Each job runs every *_INTERVAL seconds; jobs whose interval is 0 are
+    not run. Run one such process per database, beside the web workers.
+    """
+    import threading
+    from flask import current_app
+    from app.services.hold_service import HoldService
+    from app.services.loan_service import LoanService
+    from app.services.stats_service import StatsService
+    from app.utils.scheduler import start_periodic_job
+    
+    app = current_app._get_current_object()
+    jobs = [
+        ('stats-reconcile', app.config['STATS_RECONCILE_INTERVAL'], StatsService.reconcile),
+        ('overdue-sweep', app.config['OVERDUE_SWEEP_INTERVAL'], LoanService.sweep_overdue),
+        ('hold-expiry', app.config['HOLD_EXPIRY_INTERVAL'], HoldService.expire_holds),
+        ('loan-archive', app.config['LOAN_ARCHIVE_INTERVAL'], LoanService.archive_returned)
+    ]
+    jobs = [job for job in jobs if job[1]]
+    if not jobs:
+        raise click.ClickException("No jobs to run; set their *_INTERVAL settings")
+    
+    stops = [start_periodic_job(app, name, interval, func) for name, interval, func in jobs]
+    for name, interval, _ in jobs:
+        click.echo(f"Running {name} every {interval}s")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for stop in stops:
+            stop.set()
+
+@click.command('seed')
+@click.option('--books', type=click.IntRange(min=1), default=100000, show_default=True)
+@click.option('--members', type=click.IntRange(min=1), default=10000, show_default=True)
+@click.option('--loans', type=click.IntRange(min=0), default=1000000, show_default=True)
+@click.option('--seed', 'seed_value', type=int, default=0, show_default=True,
+              help='Random seed; the same seed and --now give the same rows.')
+@click.option('--now', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Date loans are generated up to (default: today).')
+@click.option('--days', type=click.IntRange(min=1), default=365, show_default=True,
+              help='Days over which loans were borrowed.')
+@click.option('--chunk-size', type=click.IntRange(min=1), default=50000, show_default=True,
+              help='Rows inserted per statement.')
+def seed(books, members, loans, seed_value, now, days, chunk_size):
+    """Fill an empty database with synthetic books, members and loans."""
+    import time
+    from app.services.seed_service import SeedService
+    
+    totals = {'books': books, 'members': members, 'loans': loans}
+    start = time.perf_counter()
+    result, error = SeedService.seed(
+        books, members, loans, seed=seed_value, now=now, days=days, chunk_size=chunk_size,
+        progress=lambda table, count: click.echo(f"{table}: {count}/{totals[table]}")
+    )
+    if error:
+        raise click.ClickException(error)
+    click.echo(f"Seeded {result['books']} books with {result['copies']} copies, {result['members']} members "
+               f"and {result['loans']} loans ({result['open_loans']} still out) "
+               f"in {time.perf_counter() - start:.1f}s")
+
+def register_commands(app):
+    """Register the CLI command groups on the application."""
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(loans_cli)
+    app.cli.add_command(holds_cli)
+    app.cli.add_command(members_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(seed)
@@ -24,20 +24,138 @@ class Config:
         'sqlite:///' + db_path.replace('\\', '/')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
+    
+    # Connection pool per process. Size it to the threads serving requests
+    # in each worker (gunicorn.conf.py sets DB_POOL_SIZE to its thread
+    # count), so a request never waits for a connection; connections are
+    # checked before use and recycled before servers drop idle ones
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': 30,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True
+    }
+    
+    # Pragmas applied to every new SQLite connection: write-ahead logging
+    # lets readers run alongside the writer, NORMAL sync is durable in WAL
+    # mode but skips an fsync per commit, writers wait for the lock instead
+    # of failing at once, and reads are served from a 256 MB memory map
+    # and a 64 MB page cache (negative cache_size is in KiB)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'mmap_size': 268435456,
+        'cache_size': -64000
+    }
+    
+    # Pagination settings for list endpoints
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 500
+    
+    # Number of rows validated and inserted per transaction by bulk imports
+    BULK_IMPORT_CHUNK_SIZE = 1000
+    
+    # Loan policies: days until a loan is due, and the fine accrued per
+    # whole day overdue, capped per loan. Borrows name a policy or get the default
+    LOAN_POLICIES = {
+        'standard': {'loan_days': 14, 'daily_fine_cents': 25, 'max_fine_cents': 2000},
+        'short': {'loan_days': 7, 'daily_fine_cents': 50, 'max_fine_cents': 2000},
+        'reference': {'loan_days': 2, 'daily_fine_cents': 100, 'max_fine_cents': 5000}
+    }
+    DEFAULT_LOAN_POLICY = 'standard'
+    
+    # Member tiers: the most loans a member may have out at once. Members
+    # get the default tier unless one is named
+    MEMBER_TIERS = {
+        'standard': {'max_loans': 5},
+        'premium': {'max_loans': 10},
+        'staff': {'max_loans': 25}
+    }
+    DEFAULT_MEMBER_TIER = 'standard'
+    
+    # Background jobs, run by a single `flask jobs run` process every
+    # *_INTERVAL seconds (0 leaves the job to its own command under cron).
+    # Never run them in the web workers: each would run its own copy
+    
+    # Overdue sweep marking loans past their due date and accruing fines
+    # (`flask loans sweep-overdue`)
+    OVERDUE_SWEEP_INTERVAL = int(os.environ.get('OVERDUE_SWEEP_INTERVAL', 0))
+    OVERDUE_SWEEP_BATCH_SIZE = 1000
+    
+    # Archival moving loans returned more than LOAN_ARCHIVE_AFTER_DAYS days
+    # ago from loans to loan_history, so the loans table holds little more
+    # than open loans (`flask loans archive`). Loans are kept for at least
+    # STATS_RECONCILE_DAYS, which are recounted from them
+    LOAN_ARCHIVE_INTERVAL = int(os.environ.get('LOAN_ARCHIVE_INTERVAL', 0))
+    LOAN_ARCHIVE_AFTER_DAYS = 90
+    LOAN_ARCHIVE_BATCH_SIZE = 1000
+    
+    # Days a returned book is set aside for the next member in its hold
+    # queue, and the sweep expiring uncollected holds (`flask holds expire`)
+    HOLD_PICKUP_DAYS = 3
+    HOLD_EXPIRY_INTERVAL = int(os.environ.get('HOLD_EXPIRY_INTERVAL', 0))
+    HOLD_EXPIRY_BATCH_SIZE = 500
+    
+    # Read-through cache for single book and member lookups ('lru', 'redis'
+    # or 'null'). The in-process LRU is per worker: a write only invalidates
+    # the worker that served it, and the others can serve the old entry
+    # for up to CACHE_TTL seconds. Production defaults to the shared Redis
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'lru'
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    CACHE_MAX_SIZE = 1024
+    CACHE_TTL = 300
+    
+    # Dashboard statistics reconciliation (`flask stats reconcile`)
+    STATS_RECONCILE_INTERVAL = int(os.environ.get('STATS_RECONCILE_INTERVAL', 0))
+    STATS_RECONCILE_DAYS = 30
+    
+    # Request metrics: per-route latency, SQL statement count and SQL time
+    # histograms at /metrics, a Server-Timing header on every response, and
+    # a warning logged for requests executing more statements than the
+    # threshold (0 disables it), which usually means a query per row
+    METRICS_ENABLED = True
+    SERVER_TIMING_ENABLED = True
+    N_PLUS_ONE_QUERY_THRESHOLD = 25
+    
+    # Slow-query log: statements taking at least this many milliseconds are
+    # logged with their parameters, route and query plan (0 disables it)
+    SLOW_QUERY_THRESHOLD_MS = 200
+    SLOW_QUERY_EXPLAIN = True
+    
+    # Per-request profiler: with it enabled, ?__profile=1 answers a request
+    # with its profile ('cprofile' or 'pyinstrument', which must be
+    # installed). Exposes code internals, so never enable it in production
+    PROFILER_ENABLED = False
+    PROFILER_BACKEND = 'cprofile'
+    PROFILER_TOP = 40
 
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
-    SQLALCHEMY_ECHO = True
+    # Log slow statements rather than echoing every one
+    SLOW_QUERY_THRESHOLD_MS = 50
+    PROFILER_ENABLED = True
 
 class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # In-memory databases use a single shared connection, not a pool
+    SQLALCHEMY_ENGINE_OPTIONS = {}
 
 class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
+    # gunicorn runs several workers, which must see each other's
+    # invalidations; CACHE_TYPE=lru is only safe with GUNICORN_WORKERS=1
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'redis'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        **Config.SQLALCHEMY_ENGINE_OPTIONS,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 8)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 4))
+    }
 
 # Configuration dictionary
 config = {
@@ -1,6 +1,10 @@
 # Import all models here for easy access
 from .book import Book
+from .copy import Copy
 from .member import Member
 from .loan import Loan
+from .loan_history import LoanHistory
+from .hold import Hold
+from .stats import StatsCounter
 
-__all__ = ['Book', 'Member', 'Loan']
+__all__ = ['Book', 'Copy', 'Member', 'Loan', 'LoanHistory', 'Hold', 'StatsCounter']
@@ -1,4 +1,6 @@
 from app import db
+from app.models.copy import Copy
+from app.utils.serialization import compile_serializer
 from datetime import datetime
 
 class Book(db.Model):
@@ -7,26 +9,47 @@ class Book(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
-    author = db.Column(db.String(100), nullable=False)
+    author = db.Column(db.String(100), nullable=False, index=True)
     isbn = db.Column(db.String(20), unique=True, nullable=True)
-    available = db.Column(db.Boolean, default=True, nullable=False)
+    # Maintained with the copies: whether any copy is on the shelf, how
+    # many are and how many there are in all
+    available = db.Column(db.Boolean, default=False, nullable=False, index=True)
+    available_count = db.Column(db.Integer, default=0, nullable=False)
+    copy_count = db.Column(db.Integer, default=0, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     
     # Relationship with loans
     loans = db.relationship('Loan', backref='book', lazy=True, cascade='all, delete-orphan')
     
+    # Relationship with archived loans
+    loan_history = db.relationship('LoanHistory', backref='book', lazy=True, cascade='all, delete-orphan')
+    
+    # Relationship with holds
+    holds = db.relationship('Hold', backref='book', lazy=True, cascade='all, delete-orphan')
+    
+    # Relationship with copies
+    copies = db.relationship('Copy', backref='book', lazy=True, cascade='all, delete-orphan')
+    
     def __repr__(self):
         return f'<Book {self.title} by {self.author}>'
     
+    def add_copies(self, count=1):
+        """Add copies on the shelf, keeping the availability counts in step."""
+        self.copies.extend(Copy(status='available') for _ in range(count))
+        self.copy_count = (self.copy_count or 0) + count
+        self.available_count = (self.available_count or 0) + count
+        self.available = self.available_count > 0
+    
     def to_dict(self):
         """Convert model to dictionary."""
-        return {
-            'id': self.id,
-            'title': self.title,
-            'author': self.author,
-            'isbn': self.isbn,
-            'available': self.available,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return _to_dict(self)
+    
+    @staticmethod
+    def row_to_dict(row):
+        """Convert a row of the table's columns, in order, to a dictionary."""
+        return _row_to_dict(row)
+
+# Precompiled serializers over the table's columns
+_to_dict = compile_serializer(Book.__table__.columns)
+_row_to_dict = compile_serializer(Book.__table__.columns, rows=True)
@@ -0,0 +1,41 @@
+from app import db
+from app.utils.serialization import compile_serializer
+from datetime import datetime
+
+# Copy statuses: on the shelf, lent out, set aside for a ready hold, or
+# withdrawn from the collection (kept for the history of its loans)
+COPY_STATUSES = ('available', 'on_loan', 'held', 'withdrawn')
+
+class Copy(db.Model):
+    """Copy model for the physical items of a book."""
+    __tablename__ = 'copies'
+    __table_args__ = (
+        # A copy on the shelf for a book: a single index seek
+        db.Index('ix_copies_book_id_status', 'book_id', 'status'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id'), nullable=False)
+    barcode = db.Column(db.String(50), unique=True, nullable=True)
+    status = db.Column(db.String(20), default='available', nullable=False)  # One of COPY_STATUSES
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
+
+    # Relationship with loans
+    loans = db.relationship('Loan', backref='copy', lazy=True)
+
+    def __repr__(self):
+        return f'<Copy #{self.id} of Book#{self.book_id} Status:{self.status}>'
+
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return _to_dict(self)
+
+    @staticmethod
+    def row_to_dict(row):
+        """Convert a row of the table's columns, in order, to a dictionary."""
+        return _row_to_dict(row)
+
+# Precompiled serializers over the table's columns
+_to_dict = compile_serializer(Copy.__table__.columns)
+_row_to_dict = compile_serializer(Copy.__table__.columns, rows=True)
@@ -0,0 +1,51 @@
+from app import db
+from app.utils.serialization import compile_serializer
+from datetime import datetime
+
+# Statuses of holds still in a book's queue: waiting in line, or ready
+# (the book is set aside for the member until the hold expires)
+OPEN_HOLD_STATUSES = ('waiting', 'ready')
+
+class Hold(db.Model):
+    """Hold model for queueing members for an unavailable book."""
+    __tablename__ = 'holds'
+    __table_args__ = (
+        # Next in line for a book: a single index seek whatever the queue length
+        db.Index('ix_holds_book_id_status_id', 'book_id', 'status', 'id'),
+        # Ready holds past their pickup window
+        db.Index('ix_holds_status_expires_at', 'status', 'expires_at'),
+        # At most one open hold per member and book
+        db.Index('uq_holds_open_book_member', 'book_id', 'member_id', unique=True,
+                 sqlite_where=db.text("status IN ('waiting', 'ready')"),
+                 postgresql_where=db.text("status IN ('waiting', 'ready')")),
+        # At most one member a copy is set aside for
+        db.Index('uq_holds_ready_copy_id', 'copy_id', unique=True,
+                 sqlite_where=db.text("status = 'ready'"),
+                 postgresql_where=db.text("status = 'ready'")),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id'), nullable=False)
+    member_id = db.Column(db.Integer, db.ForeignKey('members.id'), nullable=False)
+    copy_id = db.Column(db.Integer, db.ForeignKey('copies.id'), nullable=True)  # The copy set aside, once ready
+    status = db.Column(db.String(20), default='waiting', nullable=False)  # 'waiting', 'ready', 'fulfilled', 'expired' or 'cancelled'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    ready_at = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<Hold Book#{self.book_id} Member#{self.member_id} Status:{self.status}>'
+
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return _to_dict(self)
+
+    @staticmethod
+    def row_to_dict(row):
+        """Convert a row of the table's columns, in order, to a dictionary."""
+        return _row_to_dict(row)
+
+# Precompiled serializers over the table's columns
+_to_dict = compile_serializer(Hold.__table__.columns)
+_row_to_dict = compile_serializer(Hold.__table__.columns, rows=True)
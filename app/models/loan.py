@@ -1,35 +1,59 @@
 from app import db
-from datetime import datetime
+from app.utils.serialization import compile_serializer
+from flask import current_app
+from datetime import datetime, timedelta
+
+# Statuses of loans whose book has not been returned yet
+OPEN_LOAN_STATUSES = ('active', 'overdue')
+
+def _default_due_at(context):
+    """Due date under the default loan policy, from the loan's borrow time."""
+    policy = current_app.config['LOAN_POLICIES'][current_app.config['DEFAULT_LOAN_POLICY']]
+    return context.get_current_parameters()['borrowed_at'] + timedelta(days=policy['loan_days'])
 
 class Loan(db.Model):
     """Loan model for storing book borrowing information."""
     __tablename__ = 'loans'
+    __table_args__ = (
+        # Active loan lookups by book (borrow) and by member
+        db.Index('ix_loans_book_id_status', 'book_id', 'status'),
+        db.Index('ix_loans_member_id_status', 'member_id', 'status'),
+        # A member's loan history, in ID order for keyset pagination
+        db.Index('ix_loans_member_id_id', 'member_id', 'id'),
+        # Overdue sweeps and listings
+        db.Index('ix_loans_status_due_at', 'status', 'due_at'),
+        # At most one open loan per copy
+        db.Index('uq_loans_open_copy_id', 'copy_id', unique=True,
+                 sqlite_where=db.text("status != 'returned'"),
+                 postgresql_where=db.text("status != 'returned'")),
+        # Never reuse the IDs of loans archived to loan_history
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     book_id = db.Column(db.Integer, db.ForeignKey('books.id'), nullable=False)
+    copy_id = db.Column(db.Integer, db.ForeignKey('copies.id'), nullable=False, index=True)
     member_id = db.Column(db.Integer, db.ForeignKey('members.id'), nullable=False)
     borrowed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    due_at = db.Column(db.DateTime, default=_default_due_at, nullable=False)
     returned_at = db.Column(db.DateTime, nullable=True)
-    status = db.Column(db.String(20), default='active', nullable=False)  # 'active' or 'returned'
+    status = db.Column(db.String(20), default='active', nullable=False)  # 'active', 'overdue' or 'returned'
+    policy = db.Column(db.String(20), default='standard', nullable=False)
+    fine_cents = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     
     def __repr__(self):
         return f'<Loan Book#{self.book_id} Member#{self.member_id} Status:{self.status}>'
     
     def to_dict(self):
         """Convert model to dictionary."""
-        return {
-            'id': self.id,
-            'book_id': self.book_id,
-            'member_id': self.member_id,
-            'borrowed_at': self.borrowed_at.isoformat() if self.borrowed_at else None,
-            'returned_at': self.returned_at.isoformat() if self.returned_at else None,
-            'status': self.status
-        }
+        return _to_dict(self)
     
-    def return_book(self):
-        """Mark book as returned."""
-        self.returned_at = datetime.utcnow()
-        self.status = 'returned'
-        # Update book availability
-        if self.book:
-            self.book.available = True
+    @staticmethod
+    def row_to_dict(row):
+        """Convert a row of the table's columns, in order, to a dictionary."""
+        return _row_to_dict(row)
+
+# Precompiled serializers over the table's columns
+_to_dict = compile_serializer(Loan.__table__.columns)
+_row_to_dict = compile_serializer(Loan.__table__.columns, rows=True)
@@ -0,0 +1,30 @@
+from app import db
+
+class LoanHistory(db.Model):
+    """Returned loans moved out of the loans table by the archival job.
+    
+    Rows keep the loan's ID and every column of the loan as it was when
+    returned, so hot and archived loans can be read as one set.
+    """
+    __tablename__ = 'loan_history'
+    __table_args__ = (
+        # Loan history of a member or a book, in ID order
+        db.Index('ix_loan_history_member_id_id', 'member_id', 'id'),
+        db.Index('ix_loan_history_book_id_id', 'book_id', 'id'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    book_id = db.Column(db.Integer, db.ForeignKey('books.id'), nullable=False)
+    copy_id = db.Column(db.Integer, db.ForeignKey('copies.id'), nullable=False)
+    member_id = db.Column(db.Integer, db.ForeignKey('members.id'), nullable=False)
+    borrowed_at = db.Column(db.DateTime, nullable=False)
+    due_at = db.Column(db.DateTime, nullable=False)
+    returned_at = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    policy = db.Column(db.String(20), nullable=False)
+    fine_cents = db.Column(db.Integer, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f'<LoanHistory Book#{self.book_id} Member#{self.member_id}>'
@@ -1,4 +1,6 @@
 from app import db
+from app.utils.serialization import compile_serializer
+from app.models.loan import Loan, OPEN_LOAN_STATUSES
 from datetime import datetime
 
 class Member(db.Model):
@@ -9,26 +11,38 @@ class Member(db.Model):
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     phone = db.Column(db.String(20), nullable=True)
+    tier = db.Column(db.String(20), default='standard', nullable=False)
+    # Loans not yet returned, kept in step by borrows and returns
+    active_loan_count = db.Column(db.Integer, default=0, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     
     # Relationship with loans
     loans = db.relationship('Loan', backref='member', lazy=True, cascade='all, delete-orphan')
     
+    # Relationship with archived loans
+    loan_history = db.relationship('LoanHistory', backref='member', lazy=True, cascade='all, delete-orphan')
+    
+    # Relationship with holds
+    holds = db.relationship('Hold', backref='member', lazy=True, cascade='all, delete-orphan')
+    
     def __repr__(self):
         return f'<Member {self.name} ({self.email})>'
     
     def to_dict(self):
         """Convert model to dictionary."""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'email': self.email,
-            'phone': self.phone,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return _to_dict(self)
+    
+    @staticmethod
+    def row_to_dict(row):
+        """Convert a row of the table's columns, in order, to a dictionary."""
+        return _row_to_dict(row)
     
     def get_active_loans(self):
         """Get all active loans for this member."""
-        return [loan for loan in self.loans if loan.status == 'active']
+        # Queried rather than filtered from self.loans, which loads the whole history
+        return Loan.query.filter(Loan.member_id == self.id, Loan.status.in_(OPEN_LOAN_STATUSES)).all()
+
+# Precompiled serializers over the table's columns
+_to_dict = compile_serializer(Member.__table__.columns)
+_row_to_dict = compile_serializer(Member.__table__.columns, rows=True)
@@ -0,0 +1,16 @@
+from app import db
+
+class StatsCounter(db.Model):
+    """Named counter backing the dashboard statistics.
+    
+    Counters are adjusted incrementally by the services in the same
+    transaction as the change they count, and periodically recomputed
+    from the source tables by the reconciliation job.
+    """
+    __tablename__ = 'stats_counters'
+    
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f'<StatsCounter {self.name}={self.value}>'
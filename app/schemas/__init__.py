@@ -1,19 +1,30 @@
 # Import all schemas here for easy access
 from .book_schemas import (
-    book_schema, books_schema, book_create_schema, 
-    book_update_schema, book_list_schema
+    book_schema, books_schema, book_create_schema, book_bulk_create_schema,
+    book_update_schema, book_list_query_schema, book_list_schema, book_search_query_schema
 )
 from .member_schemas import (
     member_schema, members_schema, member_create_schema,
-    member_update_schema, member_list_schema
+    member_update_schema, member_list_schema, member_list_query_schema
 )
 from .loan_schemas import (
-    loan_schema, loans_schema, loan_create_schema,
-    loan_return_schema, loan_response_schema
+    loan_schema, loans_schema, loan_page_query_schema, loan_list_query_schema, member_loan_query_schema,
+    loan_create_schema, loan_return_schema, loan_batch_create_schema, loan_batch_return_schema,
+    loan_response_schema
 )
+from .copy_schemas import copy_schema, copy_create_schema
+from .hold_schemas import hold_schema, hold_create_schema, hold_list_query_schema
+from .export_schemas import export_query_schema
 
 __all__ = [
-    'book_schema', 'books_schema', 'book_create_schema', 'book_update_schema', 'book_list_schema',
+    'book_schema', 'books_schema', 'book_create_schema', 'book_bulk_create_schema', 'book_update_schema',
+    'book_list_query_schema', 'book_list_schema', 'book_search_query_schema',
     'member_schema', 'members_schema', 'member_create_schema', 'member_update_schema', 'member_list_schema',
-    'loan_schema', 'loans_schema', 'loan_create_schema', 'loan_return_schema', 'loan_response_schema'
+    'member_list_query_schema',
+    'loan_schema', 'loans_schema', 'loan_page_query_schema', 'loan_list_query_schema', 'member_loan_query_schema',
+    'loan_create_schema', 'loan_return_schema', 'loan_batch_create_schema', 'loan_batch_return_schema',
+    'loan_response_schema',
+    'copy_schema', 'copy_create_schema',
+    'hold_schema', 'hold_create_schema', 'hold_list_query_schema',
+    'export_query_schema'
 ]
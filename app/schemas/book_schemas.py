@@ -1,4 +1,6 @@
 from marshmallow import Schema, fields, validate, post_load
+from app.models.book import Book
+from app.schemas.fields import ColumnList
 
 class BookSchema(Schema):
     """Schema for Book serialization/deserialization."""
@@ -8,6 +10,8 @@ class BookSchema(Schema):
     author = fields.Str(required=True, validate=validate.Length(min=1, max=100))
     isbn = fields.Str(validate=validate.Length(max=20))
     available = fields.Bool(dump_only=True)  # Read-only field
+    available_count = fields.Int(dump_only=True)
+    copy_count = fields.Int(dump_only=True)
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
 
@@ -16,6 +20,7 @@ class BookCreateSchema(Schema):
     title = fields.Str(required=True, validate=validate.Length(min=1, max=200))
     author = fields.Str(required=True, validate=validate.Length(min=1, max=100))
     isbn = fields.Str(validate=validate.Length(max=20))
+    copies = fields.Int(load_default=1, validate=validate.Range(min=0, max=1000))
 
 class BookUpdateSchema(Schema):
     """Schema for updating a book."""
@@ -23,16 +28,39 @@ class BookUpdateSchema(Schema):
     author = fields.Str(validate=validate.Length(min=1, max=100))
     isbn = fields.Str(validate=validate.Length(max=20))
 
+class BookListQuerySchema(Schema):
+    """Schema for book listing query parameters."""
+    limit = fields.Int(validate=validate.Range(min=1))
+    cursor = fields.Int(validate=validate.Range(min=0))
+    available = fields.Bool()
+    author = fields.Str(validate=validate.Length(min=1, max=100))
+    title = fields.Str(validate=validate.Length(min=1, max=200))
+    fields = ColumnList(Book)
+
 class BookListSchema(Schema):
-    """Schema for listing books with pagination info."""
+    """Schema of the GET /books response: one page and the cursor of the next.
+
+    Pages are serialized by the precompiled row serializers rather than
+    dumped through this schema; with fields= each book has only the
+    requested fields.
+    """
     books = fields.List(fields.Nested(BookSchema))
-    total = fields.Int()
-    page = fields.Int()
-    per_page = fields.Int()
+    limit = fields.Int()
+    next_cursor = fields.Int(allow_none=True)
+
+class BookSearchQuerySchema(Schema):
+    """Schema for book search query parameters."""
+    q = fields.Str(required=True, validate=validate.Length(min=1, max=200))
+    limit = fields.Int(validate=validate.Range(min=1))
+    offset = fields.Int(validate=validate.Range(min=0))
+    available = fields.Bool()
 
 # Initialize schemas
 book_schema = BookSchema()
 books_schema = BookSchema(many=True)
 book_create_schema = BookCreateSchema()
+book_bulk_create_schema = BookCreateSchema(many=True)
 book_update_schema = BookUpdateSchema()
+book_list_query_schema = BookListQuerySchema()
 book_list_schema = BookListSchema()
+book_search_query_schema = BookSearchQuerySchema()
@@ -0,0 +1,19 @@
+from marshmallow import Schema, fields, validate
+
+class CopySchema(Schema):
+    """Schema for Copy serialization/deserialization."""
+    
+    id = fields.Int(dump_only=True)
+    book_id = fields.Int(dump_only=True)
+    barcode = fields.Str(dump_only=True)
+    status = fields.Str(dump_only=True)
+    created_at = fields.DateTime(dump_only=True)
+    updated_at = fields.DateTime(dump_only=True)
+
+class CopyCreateSchema(Schema):
+    """Schema for adding copies of a book."""
+    count = fields.Int(load_default=1, validate=validate.Range(min=1, max=1000))
+
+# Initialize schemas
+copy_schema = CopySchema()
+copy_create_schema = CopyCreateSchema()
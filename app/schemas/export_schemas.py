@@ -0,0 +1,9 @@
+from marshmallow import Schema, fields, validate
+
+class ExportQuerySchema(Schema):
+    """Schema for export query parameters."""
+    format = fields.Str(validate=validate.OneOf(['ndjson', 'csv']), load_default='ndjson')
+    since = fields.DateTime()
+
+# Initialize schemas
+export_query_schema = ExportQuerySchema()
@@ -0,0 +1,23 @@
+from marshmallow import fields, ValidationError
+
+class ColumnList(fields.Field):
+    """Comma-separated column names of a model, loaded as a tuple.
+
+    Used for ?fields= projections; duplicates are dropped and the
+    requested order is kept.
+    """
+    
+    def __init__(self, model, **kwargs):
+        super().__init__(**kwargs)
+        self.model = model
+    
+    def _deserialize(self, value, attr, data, **kwargs):
+        if not isinstance(value, str):
+            raise ValidationError('Expected comma-separated field names')
+        names = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+        if not names:
+            raise ValidationError('At least one field is required')
+        unknown = [name for name in names if name not in self.model.__table__.c]
+        if unknown:
+            raise ValidationError(f"Unknown fields: {', '.join(unknown)}")
+        return names
@@ -0,0 +1,29 @@
+from marshmallow import Schema, fields, validate
+
+class HoldSchema(Schema):
+    """Schema for Hold serialization/deserialization."""
+    
+    id = fields.Int(dump_only=True)
+    book_id = fields.Int(dump_only=True)
+    member_id = fields.Int(required=True)
+    copy_id = fields.Int(dump_only=True)
+    status = fields.Str(dump_only=True)
+    position = fields.Int(dump_only=True)
+    created_at = fields.DateTime(dump_only=True)
+    ready_at = fields.DateTime(dump_only=True)
+    expires_at = fields.DateTime(dump_only=True)
+    updated_at = fields.DateTime(dump_only=True)
+
+class HoldCreateSchema(Schema):
+    """Schema for placing a hold on a book."""
+    member_id = fields.Int(required=True)
+
+class HoldListQuerySchema(Schema):
+    """Schema for hold queue listing query parameters."""
+    limit = fields.Int(validate=validate.Range(min=1))
+    cursor = fields.Int(validate=validate.Range(min=0))
+
+# Initialize schemas
+hold_schema = HoldSchema()
+hold_create_schema = HoldCreateSchema()
+hold_list_query_schema = HoldListQuerySchema()
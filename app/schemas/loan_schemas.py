@@ -1,37 +1,110 @@
-from marshmallow import Schema, fields, validate
+from marshmallow import Schema, fields, validate, validates, post_load, ValidationError
+from app.models.loan import Loan
+from app.schemas.fields import ColumnList
 
 class LoanSchema(Schema):
     """Schema for Loan serialization/deserialization."""
     
     id = fields.Int(dump_only=True)
     book_id = fields.Int(required=True)
+    copy_id = fields.Int(dump_only=True)
     member_id = fields.Int(required=True)
     borrowed_at = fields.DateTime(dump_only=True)
+    due_at = fields.DateTime(dump_only=True)
     returned_at = fields.DateTime(dump_only=True)
     status = fields.Str(dump_only=True)
+    policy = fields.Str()
+    fine_cents = fields.Int(dump_only=True)
+    updated_at = fields.DateTime(dump_only=True)
+
+LOAN_STATUSES = ['active', 'overdue', 'returned']
+
+# Related objects that can be embedded in loan listings
+LOAN_EXPANSIONS = ['book', 'member']
+
+class LoanPageQuerySchema(Schema):
+    """Schema for query parameters shared by loan listings."""
+    limit = fields.Int(validate=validate.Range(min=1))
+    cursor = fields.Int(validate=validate.Range(min=0))
+    member_id = fields.Int()
+    book_id = fields.Int()
+    expand = fields.Str()
+    fields = ColumnList(Loan)
+    
+    @validates('expand')
+    def validate_expand(self, value):
+        unknown = set(value.split(',')) - set(LOAN_EXPANSIONS)
+        if unknown:
+            raise ValidationError(f"Cannot expand: {', '.join(sorted(unknown))}")
+    
+    @post_load
+    def split_expand(self, data, **kwargs):
+        data['expand'] = set(data['expand'].split(',')) if data.get('expand') else set()
+        return data
+
+class LoanListQuerySchema(LoanPageQuerySchema):
+    """Schema for loan listing query parameters."""
+    status = fields.Str()
+    
+    @validates('status')
+    def validate_status(self, value):
+        unknown = set(value.split(',')) - set(LOAN_STATUSES)
+        if unknown:
+            raise ValidationError(f"Unknown status: {', '.join(sorted(unknown))}")
+    
+    @post_load
+    def split_status(self, data, **kwargs):
+        if data.get('status'):
+            data['status'] = sorted(set(data['status'].split(',')))
+        return data
 
 class LoanCreateSchema(Schema):
     """Schema for creating a new loan (borrowing a book)."""
     book_id = fields.Int(required=True)
     member_id = fields.Int(required=True)
+    policy = fields.Str()
 
 class LoanReturnSchema(Schema):
     """Schema for returning a book."""
     loan_id = fields.Int(required=True)
 
+BATCH_MODES = ['all_or_nothing', 'best_effort']
+
+class LoanBatchCreateSchema(Schema):
+    """Schema for borrowing several books for one member."""
+    member_id = fields.Int(required=True)
+    book_ids = fields.List(fields.Int(), required=True, validate=validate.Length(min=1, max=100))
+    mode = fields.Str(validate=validate.OneOf(BATCH_MODES), load_default='all_or_nothing')
+    policy = fields.Str()
+
+class LoanBatchReturnSchema(Schema):
+    """Schema for returning several books."""
+    loan_ids = fields.List(fields.Int(), required=True, validate=validate.Length(min=1, max=100))
+    mode = fields.Str(validate=validate.OneOf(BATCH_MODES), load_default='all_or_nothing')
+
 class LoanResponseSchema(Schema):
     """Schema for loan response."""
     loan_id = fields.Int()
     book_id = fields.Int()
+    copy_id = fields.Int()
     member_id = fields.Int()
     borrowed_at = fields.DateTime()
+    due_at = fields.DateTime()
     returned_at = fields.DateTime()
     status = fields.Str()
+    policy = fields.Str()
+    fine_cents = fields.Int()
     message = fields.Str()
 
 # Initialize schemas
 loan_schema = LoanSchema()
 loans_schema = LoanSchema(many=True)
+loan_page_query_schema = LoanPageQuerySchema()
+loan_list_query_schema = LoanListQuerySchema()
+# A member's loans, the member being named by the path
+member_loan_query_schema = LoanListQuerySchema(exclude=('member_id',))
 loan_create_schema = LoanCreateSchema()
 loan_return_schema = LoanReturnSchema()
+loan_batch_create_schema = LoanBatchCreateSchema()
+loan_batch_return_schema = LoanBatchReturnSchema()
 loan_response_schema = LoanResponseSchema()
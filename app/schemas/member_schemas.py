@@ -1,4 +1,6 @@
 from marshmallow import Schema, fields, validate
+from app.models.member import Member
+from app.schemas.fields import ColumnList
 
 class MemberSchema(Schema):
     """Schema for Member serialization/deserialization."""
@@ -7,6 +9,8 @@ class MemberSchema(Schema):
     name = fields.Str(required=True, validate=validate.Length(min=1, max=100))
     email = fields.Email(required=True, validate=validate.Length(max=120))
     phone = fields.Str(validate=validate.Length(max=20))
+    tier = fields.Str(validate=validate.Length(max=20))
+    active_loan_count = fields.Int(dump_only=True)
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
 
@@ -15,12 +19,18 @@ class MemberCreateSchema(Schema):
     name = fields.Str(required=True, validate=validate.Length(min=1, max=100))
     email = fields.Email(required=True, validate=validate.Length(max=120))
     phone = fields.Str(validate=validate.Length(max=20))
+    tier = fields.Str(validate=validate.Length(max=20))
 
 class MemberUpdateSchema(Schema):
     """Schema for updating a member."""
     name = fields.Str(validate=validate.Length(min=1, max=100))
     email = fields.Email(validate=validate.Length(max=120))
     phone = fields.Str(validate=validate.Length(max=20))
+    tier = fields.Str(validate=validate.Length(max=20))
+
+class MemberListQuerySchema(Schema):
+    """Schema for member listing query parameters."""
+    fields = ColumnList(Member)
 
 class MemberListSchema(Schema):
     """Schema for listing members."""
@@ -33,3 +43,4 @@ members_schema = MemberSchema(many=True)
 member_create_schema = MemberCreateSchema()
 member_update_schema = MemberUpdateSchema()
 member_list_schema = MemberListSchema()
+member_list_query_schema = MemberListQuerySchema()
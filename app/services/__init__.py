@@ -2,5 +2,10 @@
 from .book_service import BookService
 from .member_service import MemberService
 from .loan_service import LoanService
+from .copy_service import CopyService
+from .hold_service import HoldService
+from .search_service import SearchService
+from .export_service import ExportService
+from .stats_service import StatsService
 
-__all__ = ['BookService', 'MemberService', 'LoanService']
+__all__ = ['BookService', 'MemberService', 'LoanService', 'CopyService', 'HoldService', 'SearchService', 'ExportService', 'StatsService']
@@ -0,0 +1,60 @@
+from app.models.book import Book
+from app.models.member import Member
+from app.services.book_service import BookService
+from app.services.member_service import MemberService
+from app.services.loan_service import LoanService
+from app.utils.sql import split_page
+from sqlalchemy import select
+
+class AsyncReadService:
+    """Read-only queries for the async API, run on an AsyncSession.
+
+    Each method executes the same statement as its synchronous
+    counterpart, so both paths return the same rows. Lookups skip the
+    read-through cache, whose invalidations only reach the processes
+    serving writes.
+    """
+
+    @staticmethod
+    async def get_books_page(session, limit, **filters):
+        """Async BookService.get_books_page."""
+        result = await session.execute(BookService.books_page_statement(limit, **filters))
+        return split_page(result.all(), limit)
+
+    @staticmethod
+    async def get_books_version(session, **filters):
+        """Async BookService.get_books_version."""
+        result = await session.execute(BookService.books_version_statement(**filters))
+        return result.one()
+
+    @staticmethod
+    async def get_book_data(session, book_id):
+        """Get a book as a dictionary, or None if there is no such book."""
+        result = await session.execute(select(*Book.__table__.columns).where(Book.id == book_id))
+        row = result.first()
+        return Book.row_to_dict(row) if row else None
+
+    @staticmethod
+    async def get_all_member_rows(session, fields=None):
+        """Async MemberService.get_all_member_rows."""
+        result = await session.execute(MemberService.member_rows_statement(fields))
+        return result.all()
+
+    @staticmethod
+    async def get_members_version(session):
+        """Async MemberService.get_members_version."""
+        result = await session.execute(MemberService.members_version_statement())
+        return result.one()
+
+    @staticmethod
+    async def get_member_data(session, member_id):
+        """Get a member as a dictionary, or None if there is no such member."""
+        result = await session.execute(select(*Member.__table__.columns).where(Member.id == member_id))
+        row = result.first()
+        return Member.row_to_dict(row) if row else None
+
+    @staticmethod
+    async def get_loans_page(session, limit, **filters):
+        """Async LoanService.get_loans_page."""
+        result = await session.execute(LoanService.loans_page_statement(limit, **filters))
+        return split_page(result.all(), limit)
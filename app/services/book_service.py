@@ -1,5 +1,11 @@
-from app import db
+from app import db, cache
 from app.models.book import Book
+from app.models.copy import Copy
+from app.models.loan import OPEN_LOAN_STATUSES
+from app.utils.serialization import table_columns
+from app.services.stats_service import StatsService, TOTAL_BOOKS, TOTAL_COPIES, AVAILABLE_COPIES
+from app.utils.sql import split_page
+from sqlalchemy import func, insert, select
 from sqlalchemy.exc import IntegrityError
 
 class BookService:
@@ -10,21 +16,91 @@ class BookService:
         """Get all books."""
         return Book.query.all()
     
+    @staticmethod
+    def get_books_page(limit, cursor=None, available=None, author=None, title_prefix=None, fields=None):
+        """Get a page of books using keyset pagination on id.
+        
+        Books are returned as read-only rows holding only the named fields
+        (all columns by default) followed by the id, which skips ORM object
+        construction, together with the cursor for the next page, which is
+        None once the last page has been reached.
+        """
+        statement = BookService.books_page_statement(limit, cursor, available, author, title_prefix, fields)
+        return split_page(db.session.execute(statement).all(), limit)
+    
+    @staticmethod
+    def books_page_statement(limit, cursor=None, available=None, author=None, title_prefix=None, fields=None):
+        """Build the SELECT for get_books_page, shared with the async read path."""
+        statement = select(*table_columns(Book, fields), Book.id)
+        statement = BookService._filter_books(statement, available, author, title_prefix)
+        if cursor is not None:
+            statement = statement.filter(Book.id > cursor)
+        
+        # Fetch one extra row to know whether another page exists
+        return statement.order_by(Book.id).limit(limit + 1)
+    
+    @staticmethod
+    def get_books_version(available=None, author=None, title_prefix=None):
+        """Get the number of matching books and their latest update time.
+        
+        Any insert, update or delete affecting the matching books changes
+        at least one of the two, so together they identify a version of
+        the listing.
+        """
+        return db.session.execute(BookService.books_version_statement(available, author, title_prefix)).one()
+    
+    @staticmethod
+    def books_version_statement(available=None, author=None, title_prefix=None):
+        """Build the SELECT for get_books_version, shared with the async read path."""
+        statement = select(func.count(Book.id), func.max(Book.updated_at))
+        return BookService._filter_books(statement, available, author, title_prefix)
+    
+    @staticmethod
+    def _filter_books(query, available=None, author=None, title_prefix=None):
+        if available is not None:
+            query = query.filter(Book.available == available)
+        if author:
+            query = query.filter(Book.author == author)
+        if title_prefix:
+            query = query.filter(Book.title.startswith(title_prefix, autoescape=True))
+        return query
+    
     @staticmethod
     def get_book_by_id(book_id):
         """Get a book by ID."""
         return Book.query.get(book_id)
     
+    @staticmethod
+    def cache_key(book_id):
+        """Get the cache key of a book."""
+        return f'book:{book_id}'
+    
+    @staticmethod
+    def get_book_data(book_id):
+        """Get a book as a dictionary, read through the cache."""
+        def load():
+            book = Book.query.get(book_id)
+            return book.to_dict() if book else None
+        return cache.get_or_set(BookService.cache_key(book_id), load)
+    
+    @staticmethod
+    def invalidate(*book_ids):
+        """Drop books from the cache after they changed."""
+        cache.delete(*[BookService.cache_key(book_id) for book_id in book_ids])
+    
     @staticmethod
     def create_book(book_data):
-        """Create a new book."""
+        """Create a new book with its copies on the shelf (one by default)."""
         try:
+            copies = book_data.get('copies', 1)
             book = Book(
                 title=book_data['title'],
                 author=book_data['author'],
                 isbn=book_data.get('isbn')
             )
+            book.add_copies(copies)
             db.session.add(book)
+            StatsService.increment({TOTAL_BOOKS: 1, TOTAL_COPIES: copies, AVAILABLE_COPIES: copies})
             db.session.commit()
             return book, None
         except IntegrityError as e:
@@ -36,6 +112,59 @@ class BookService:
             db.session.rollback()
             return None, str(e)
     
+    @staticmethod
+    def create_books(books_data):
+        """Create several books and their copies with two executemany inserts.
+        
+        ISBN conflicts with existing books and with earlier items of the same
+        batch are resolved with one pre-query instead of failing per row.
+        Returns a list holding None for each created book and an error
+        message for each rejected one, in input order.
+        """
+        errors = [None] * len(books_data)
+        isbns = {data['isbn'] for data in books_data if data.get('isbn') is not None}
+        taken = set()
+        if isbns:
+            taken = {isbn for (isbn,) in db.session.query(Book.isbn).filter(Book.isbn.in_(isbns))}
+        
+        rows = []
+        inserted = []
+        for index, data in enumerate(books_data):
+            isbn = data.get('isbn')
+            if isbn is not None:
+                if isbn in taken:
+                    errors[index] = "ISBN already exists"
+                    continue
+                taken.add(isbn)
+            copies = data.get('copies', 1)
+            rows.append({'title': data['title'], 'author': data['author'], 'isbn': isbn,
+                         'copy_count': copies, 'available_count': copies, 'available': copies > 0})
+            inserted.append(index)
+        
+        try:
+            if rows:
+                book_ids = db.session.scalars(
+                    insert(Book).returning(Book.id, sort_by_parameter_order=True), rows
+                ).all()
+                copy_rows = [{'book_id': book_id, 'status': 'available'}
+                             for book_id, row in zip(book_ids, rows) for _ in range(row['copy_count'])]
+                if copy_rows:
+                    db.session.execute(insert(Copy), copy_rows)
+                copies = len(copy_rows)
+                StatsService.increment({TOTAL_BOOKS: len(rows), TOTAL_COPIES: copies, AVAILABLE_COPIES: copies})
+            db.session.commit()
+        except IntegrityError as e:
+            # Another writer took an ISBN after the pre-query; reject the batch
+            db.session.rollback()
+            error = "ISBN already exists" if 'isbn' in str(e) else "Database error occurred"
+            for index in inserted:
+                errors[index] = error
+        except Exception as e:
+            db.session.rollback()
+            for index in inserted:
+                errors[index] = str(e)
+        return errors
+    
     @staticmethod
     def update_book(book_id, book_data):
         """Update a book."""
@@ -53,6 +182,7 @@ class BookService:
                 book.isbn = book_data['isbn']
             
             db.session.commit()
+            BookService.invalidate(book_id)
             return book, None
         except IntegrityError as e:
             db.session.rollback()
@@ -72,12 +202,15 @@ class BookService:
                 return False, "Book not found"
             
             # Check if book has active loans
-            active_loans = [loan for loan in book.loans if loan.status == 'active']
+            active_loans = [loan for loan in book.loans if loan.status in OPEN_LOAN_STATUSES]
             if active_loans:
                 return False, "Cannot delete book with active loans"
             
+            StatsService.increment({TOTAL_BOOKS: -1, TOTAL_COPIES: -book.copy_count,
+                                    AVAILABLE_COPIES: -book.available_count})
             db.session.delete(book)
             db.session.commit()
+            BookService.invalidate(book_id)
             return True, "Book deleted successfully"
         except Exception as e:
             db.session.rollback()
@@ -85,21 +218,6 @@ class BookService:
     
     @staticmethod
     def is_book_available(book_id):
-        """Check if a book is available for borrowing."""
+        """Check if a copy of a book is available for borrowing."""
         book = Book.query.get(book_id)
-        return book and book.available
-    
-    @staticmethod
-    def set_book_availability(book_id, available):
-        """Set book availability status."""
-        try:
-            book = Book.query.get(book_id)
-            if not book:
-                return False, "Book not found"
-            
-            book.available = available
-            db.session.commit()
-            return True, None
-        except Exception as e:
-            db.session.rollback()
-            return False, str(e)
+        return book and book.available_count > 0
@@ -0,0 +1,184 @@
+from app import db
+from app.models.copy import Copy
+from app.models.book import Book
+from app.services.book_service import BookService
+from app.services.stats_service import StatsService, TOTAL_COPIES, AVAILABLE_COPIES
+from app.utils.sql import update_matching
+from datetime import datetime
+from sqlalchemy import select, update, case
+
+class CopyService:
+    """Service class for the physical copies of books.
+
+    Each book keeps how many of its copies there are and how many are on
+    the shelf in available_count and copy_count, along with the available
+    flag, so listings and searches never count copies per row. Every
+    change of a copy's status updates the counts in the same transaction.
+    """
+
+    @staticmethod
+    def get_copies(book_id):
+        """Get the copies of a book in the collection as read-only rows, in ID order."""
+        return Copy.query.with_entities(*Copy.__table__.columns).filter(
+            Copy.book_id == book_id, Copy.status != 'withdrawn'
+        ).order_by(Copy.id).all()
+
+    @staticmethod
+    def add_copies(book_id, count=1):
+        """Add new copies of a book to the collection.
+
+        Like returned copies, they go to the members waiting in the book's
+        hold queue first (see HoldService.pass_on) and the rest go on the
+        shelf.
+        """
+        from app.services.hold_service import HoldService
+
+        try:
+            book = Book.query.get(book_id)
+            if not book:
+                return None, "Book not found"
+
+            # Off the shelf until pass_on places them
+            now = datetime.utcnow()
+            copies = [Copy(book_id=book_id, status='held') for _ in range(count)]
+            db.session.add_all(copies)
+            db.session.flush()
+            db.session.execute(
+                update(Book)
+                .where(Book.id == book_id)
+                .values(copy_count=Book.copy_count + count, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            StatsService.increment({TOTAL_COPIES: count})
+            HoldService.pass_on([(book_id, copy.id) for copy in copies], now)
+            db.session.commit()
+            BookService.invalidate(book_id)
+            return copies, None
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+
+    @staticmethod
+    def withdraw_copy(book_id, copy_id):
+        """Withdraw a copy that is on the shelf from the collection.
+
+        The copy is kept, marked withdrawn, for the history of its loans.
+        """
+        try:
+            copy = Copy.query.get(copy_id)
+            if not copy or copy.book_id != book_id or copy.status == 'withdrawn':
+                return False, "Copy not found"
+
+            # Only a copy still on the shelf can go
+            if not db.session.execute(
+                update(Copy)
+                .where(Copy.id == copy_id, Copy.status == 'available')
+                .values(status='withdrawn')
+                .execution_options(synchronize_session=False)
+            ).rowcount:
+                return False, "Copy is not on the shelf"
+
+            db.session.execute(
+                update(Book)
+                .where(Book.id == book_id)
+                .values(copy_count=Book.copy_count - 1,
+                        available_count=Book.available_count - 1,
+                        available=Book.available_count > 1, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            StatsService.increment({TOTAL_COPIES: -1, AVAILABLE_COPIES: -1})
+            db.session.commit()
+            BookService.invalidate(book_id)
+            return True, "Copy withdrawn successfully"
+        except Exception as e:
+            db.session.rollback()
+            return False, str(e)
+
+    @staticmethod
+    def check_out(book_id, now, *criteria):
+        """Take a copy of a book off the shelf for a loan.
+
+        Runs in the caller's transaction. The book's count is decremented
+        with a single conditional UPDATE, so concurrent borrows cannot take
+        more copies than are on the shelf, and further criteria can be
+        added to it. Returns the ID of the copy taken, or None if there was
+        none on the shelf or the criteria did not hold.
+        """
+        if not CopyService.claim([book_id], now, *criteria):
+            return None
+        return CopyService.take_copy(book_id, 'on_loan')
+
+    @staticmethod
+    def claim(book_ids, now, *criteria):
+        """Decrement the shelf counts of books that have a copy on it.
+
+        Runs in the caller's transaction. Each book ID may appear once.
+        Returns the IDs of the books claimed; take_copy must then be called
+        once for each of them.
+        """
+        claimed = update_matching(
+            db.session, Book, book_ids, [Book.available_count > 0, *criteria],
+            {'available_count': Book.available_count - 1,
+             'available': Book.available_count > 1, 'updated_at': now}
+        )
+        if claimed:
+            StatsService.increment({AVAILABLE_COPIES: -len(claimed)})
+        return claimed
+
+    @staticmethod
+    def take_copy(book_id, status):
+        """Move one copy of a claimed book from the shelf to status.
+
+        Runs in the caller's transaction. Returns the copy's ID.
+        """
+        while True:
+            copy_id = db.session.execute(
+                select(Copy.id)
+                .where(Copy.book_id == book_id, Copy.status == 'available')
+                .order_by(Copy.id)
+                .limit(1)
+            ).scalar()
+            if copy_id is None:
+                raise RuntimeError(f"Book {book_id} has no copy on the shelf to match its count")
+            # Retry if a concurrent borrow took the same copy first
+            if db.session.execute(
+                update(Copy)
+                .where(Copy.id == copy_id, Copy.status == 'available')
+                .values(status=status)
+                .execution_options(synchronize_session=False)
+            ).rowcount:
+                return copy_id
+
+    @staticmethod
+    def set_status(copy_ids, status):
+        """Set the status of copies. Runs in the caller's transaction."""
+        if copy_ids:
+            db.session.execute(
+                update(Copy)
+                .where(Copy.id.in_(copy_ids))
+                .values(status=status)
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def release(copies, now):
+        """Put copies back on the shelf and count them in their books.
+
+        Runs in the caller's transaction. copies is a list of (book_id,
+        copy_id) pairs. Issues two UPDATE statements however many there are.
+        """
+        if not copies:
+            return
+
+        counts = {}
+        for book_id, _ in copies:
+            counts[book_id] = counts.get(book_id, 0) + 1
+        CopyService.set_status([copy_id for _, copy_id in copies], 'available')
+        db.session.execute(
+            update(Book)
+            .where(Book.id.in_(counts))
+            .values(available_count=Book.available_count + case(counts, value=Book.id, else_=0),
+                    available=True, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        StatsService.increment({AVAILABLE_COPIES: len(copies)})
@@ -0,0 +1,88 @@
+import csv
+import io
+from app import db
+from app.models.book import Book
+from app.models.member import Member
+from app.models.loan import Loan
+from app.services.loan_service import LoanService
+from app.utils.serialization import dumps
+from sqlalchemy import select
+
+# Models that can be exported, by resource name
+EXPORT_MODELS = {
+    'books': Book,
+    'members': Member,
+    'loans': Loan
+}
+
+# Number of rows fetched from the database cursor and written per chunk
+EXPORT_BATCH_SIZE = 1000
+
+class ExportService:
+    """Service class for streaming full and incremental data exports."""
+
+    @staticmethod
+    def get_columns(resource):
+        """Get the exported column names of a resource."""
+        return [column.name for column in EXPORT_MODELS[resource].__table__.columns]
+
+    @staticmethod
+    def iter_rows(resource, since=None):
+        """Yield rows of a resource as tuples, in ID order.
+
+        Rows are read through a server-side cursor in batches, so memory
+        use stays constant however large the table is. When since is given
+        only rows updated at or after that time are returned. Loans include
+        those moved to loan_history, which keep their IDs and columns.
+        """
+        model = EXPORT_MODELS[resource]
+        if model is Loan:
+            rows = LoanService.with_archived(
+                lambda table: [table.c.updated_at >= since] if since is not None else []
+            )
+            statement = select(*rows.c).order_by(rows.c.id)
+        else:
+            statement = select(*model.__table__.columns).order_by(model.id)
+            if since is not None:
+                statement = statement.where(model.updated_at >= since)
+        return db.session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+    @staticmethod
+    def export(resource, export_format, since=None):
+        """Yield an export of a resource as NDJSON or CSV text chunks."""
+        columns = ExportService.get_columns(resource)
+        rows = ExportService.iter_rows(resource, since)
+        if export_format == 'csv':
+            return ExportService._to_csv(columns, rows)
+        return ExportService._to_ndjson(EXPORT_MODELS[resource].row_to_dict, rows)
+
+    @staticmethod
+    def _format_value(value):
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    @staticmethod
+    def _to_ndjson(row_to_dict, rows):
+        lines = []
+        for row in rows:
+            lines.append(dumps(row_to_dict(row)))
+            if len(lines) >= EXPORT_BATCH_SIZE:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _to_csv(columns, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        count = 0
+        for row in rows:
+            writer.writerow([ExportService._format_value(value) for value in row])
+            count += 1
+            if count >= EXPORT_BATCH_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                count = 0
+        yield buffer.getvalue()
@@ -0,0 +1,252 @@
+from app import db
+from app.models.hold import Hold, OPEN_HOLD_STATUSES
+from app.models.book import Book
+from app.models.member import Member
+from app.models.loan import Loan, OPEN_LOAN_STATUSES
+from app.services.book_service import BookService
+from app.services.copy_service import CopyService
+from flask import current_app
+from datetime import datetime, timedelta
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+class HoldService:
+    """Service class for the per-book hold queues.
+
+    Each book's queue is its open holds in ID order. When a copy comes
+    back it is set aside for the member at the head of the queue for
+    HOLD_PICKUP_DAYS; finding and promoting it is one seek on the
+    (book_id, status, id) index and one UPDATE, however long the queue.
+    Holds are only placed while no copy of the book is on the shelf.
+    """
+
+    @staticmethod
+    def get_queue_page(book_id, limit, cursor=None):
+        """Get a page of a book's open holds in queue order.
+
+        Returns the holds as read-only rows, the queue position of the
+        first one (1 is the next member to get the book) and the cursor
+        for the next page.
+        """
+        query = Hold.query.with_entities(*Hold.__table__.columns).filter(
+            Hold.book_id == book_id, Hold.status.in_(OPEN_HOLD_STATUSES)
+        )
+        first_position = 1
+        if cursor is not None:
+            first_position += query.filter(Hold.id <= cursor).count()
+            query = query.filter(Hold.id > cursor)
+
+        holds = query.order_by(Hold.id).limit(limit + 1).all()
+        next_cursor = None
+        if len(holds) > limit:
+            holds = holds[:limit]
+            next_cursor = holds[-1].id
+        return holds, first_position, next_cursor
+
+    @staticmethod
+    def get_position(hold):
+        """Get the queue position of an open hold, 1 being next in line."""
+        return Hold.query.filter(
+            Hold.book_id == hold.book_id,
+            Hold.status.in_(OPEN_HOLD_STATUSES),
+            Hold.id <= hold.id
+        ).count()
+
+    @staticmethod
+    def place_hold(book_id, member_id):
+        """Join a member to the hold queue of a book that is on loan."""
+        try:
+            book = Book.query.get(book_id)
+            if not book:
+                return None, "Book not found"
+            if not Member.query.get(member_id):
+                return None, "Member not found"
+            if book.available_count > 0:
+                return None, "Book is available for borrowing"
+            if Loan.query.filter(Loan.book_id == book_id, Loan.member_id == member_id,
+                                 Loan.status.in_(OPEN_LOAN_STATUSES)).first():
+                return None, "Member already has this book on loan"
+
+            hold = Hold(book_id=book_id, member_id=member_id, status='waiting')
+            db.session.add(hold)
+            db.session.commit()
+            return hold, None
+
+        except IntegrityError:
+            # The partial unique index rejected a second open hold
+            db.session.rollback()
+            return None, "Member already has a hold on this book"
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+
+    @staticmethod
+    def cancel_hold(book_id, hold_id):
+        """Cancel an open hold, passing a set-aside copy to the next in line."""
+        try:
+            hold = Hold.query.get(hold_id)
+            if not hold or hold.book_id != book_id:
+                return None, "Hold not found"
+            if hold.status not in OPEN_HOLD_STATUSES:
+                return None, "Hold is no longer open"
+
+            now = datetime.utcnow()
+            was_ready = hold.status == 'ready'
+            hold.status = 'cancelled'
+            db.session.flush()
+            if was_ready:
+                HoldService.pass_on([(book_id, hold.copy_id)], now)
+            db.session.commit()
+            BookService.invalidate(book_id)
+            return hold, None
+
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+
+    @staticmethod
+    def assign_next(book_id, copy_id, now=None):
+        """Set a returned copy aside for the next member in its book's queue.
+
+        Runs in the caller's transaction and leaves the copy's status to
+        the caller. Returns the ID of the promoted hold, or None if nobody
+        is waiting and the copy can go back on the shelf.
+        """
+        now = now or datetime.utcnow()
+        hold_id = db.session.execute(
+            select(Hold.id)
+            .where(Hold.book_id == book_id, Hold.status == 'waiting')
+            .order_by(Hold.id)
+            .limit(1)
+        ).scalar()
+        if hold_id is None:
+            return None
+
+        pickup = timedelta(days=current_app.config['HOLD_PICKUP_DAYS'])
+        db.session.execute(
+            update(Hold)
+            .where(Hold.id == hold_id)
+            .values(status='ready', copy_id=copy_id, ready_at=now, expires_at=now + pickup, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        return hold_id
+
+    @staticmethod
+    def pass_on(copies, now):
+        """Pass returned copies to the next in line, or back to the shelf.
+
+        Runs in the caller's transaction. copies is a list of (book_id,
+        copy_id) pairs. One query finds the books with members waiting;
+        each copy of those costs a SELECT and an UPDATE to promote the next
+        hold, and the other copies go back on the shelf together. Returns
+        the number of copies released to the shelf.
+        """
+        queued = HoldService._books_with_queue({book_id for book_id, _ in copies})
+        held = []
+        released = []
+        for book_id, copy_id in copies:
+            if book_id in queued and HoldService.assign_next(book_id, copy_id, now) is not None:
+                held.append(copy_id)
+            else:
+                released.append((book_id, copy_id))
+        CopyService.set_status(held, 'held')
+        CopyService.release(released, now)
+        return len(released)
+
+    @staticmethod
+    def _books_with_queue(book_ids):
+        """Get the IDs of the books among book_ids with a waiting hold, one seek per book."""
+        if not book_ids:
+            return set()
+        waiting = select(Hold.id).where(Hold.book_id == Book.id, Hold.status == 'waiting').exists()
+        return set(db.session.scalars(select(Book.id).where(Book.id.in_(book_ids), waiting)))
+
+    @staticmethod
+    def get_ready_holds(member_id, book_ids):
+        """Get a member's ready holds on the given books as (hold ID, copy ID), by book ID."""
+        return {
+            book_id: (hold_id, copy_id) for book_id, hold_id, copy_id in
+            db.session.query(Hold.book_id, Hold.id, Hold.copy_id)
+            .filter(Hold.member_id == member_id, Hold.book_id.in_(set(book_ids)), Hold.status == 'ready')
+        }
+
+    @staticmethod
+    def has_ready_hold(book_id, member_id):
+        """SQL condition that a member has a ready hold on a book, to add to other statements."""
+        return select(Hold.id).where(
+            Hold.book_id == book_id, Hold.member_id == member_id, Hold.status == 'ready'
+        ).exists()
+
+    @staticmethod
+    def fulfill(book_id, member_id, now=None):
+        """Mark a member's ready hold on a book as fulfilled by a borrow.
+
+        Runs in the caller's transaction. Returns the ID of the copy that
+        was set aside, now on loan, or None if there was no ready hold.
+        """
+        now = now or datetime.utcnow()
+        hold = HoldService.get_ready_holds(member_id, [book_id]).get(book_id)
+        if hold is None:
+            return None
+        hold_id, copy_id = hold
+        if not db.session.execute(
+            update(Hold)
+            .where(Hold.id == hold_id, Hold.status == 'ready')
+            .values(status='fulfilled', updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount:
+            return None
+        CopyService.set_status([copy_id], 'on_loan')
+        return copy_id
+
+    @staticmethod
+    def is_reserved(book_id):
+        """Check whether a copy of a book is set aside for a member with a ready hold."""
+        return db.session.query(
+            select(Hold.id).where(Hold.book_id == book_id, Hold.status == 'ready').exists()
+        ).scalar()
+
+    @staticmethod
+    def expire_holds(now=None, batch_size=None):
+        """Expire ready holds past their pickup window.
+
+        Runs off the request path, from the CLI or the scheduler. Each
+        expired copy goes to the next in line or back on the shelf. Holds
+        are processed batch_size at a time, each batch in its own
+        transaction. Returns the number of holds expired and of copies
+        released to the shelf.
+        """
+        now = now or datetime.utcnow()
+        batch_size = batch_size or current_app.config['HOLD_EXPIRY_BATCH_SIZE']
+        expired = released = 0
+        try:
+            while True:
+                holds = db.session.execute(
+                    select(Hold.id, Hold.book_id, Hold.copy_id)
+                    .where(Hold.status == 'ready', Hold.expires_at < now)
+                    .order_by(Hold.expires_at)
+                    .limit(batch_size)
+                ).all()
+                if not holds:
+                    break
+
+                # Skip holds fulfilled or cancelled since they were selected
+                copies = []
+                for hold in holds:
+                    if db.session.execute(
+                        update(Hold)
+                        .where(Hold.id == hold.id, Hold.status == 'ready')
+                        .values(status='expired', updated_at=now)
+                        .execution_options(synchronize_session=False)
+                    ).rowcount:
+                        copies.append((hold.book_id, hold.copy_id))
+                released += HoldService.pass_on(copies, now)
+                db.session.commit()
+                BookService.invalidate(*{book_id for book_id, _ in copies})
+                expired += len(copies)
+                if len(holds) < batch_size:
+                    break
+            return {'expired': expired, 'released': released}, None
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
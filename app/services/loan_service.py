@@ -1,19 +1,133 @@
 from app import db
-from app.models.loan import Loan
+from app.models.loan import Loan, OPEN_LOAN_STATUSES
+from app.models.loan_history import LoanHistory
 from app.models.book import Book
 from app.models.member import Member
+from app.models.hold import Hold
 from app.services.book_service import BookService
 from app.services.member_service import MemberService
-from datetime import datetime
+from app.services.hold_service import HoldService
+from app.services.copy_service import CopyService
+from app.services.stats_service import StatsService, OVERDUE_LOANS
+from flask import current_app
+from datetime import datetime, timedelta
+from collections import Counter
+from sqlalchemy import update, select, case, delete, insert, literal, union_all
+from sqlalchemy.exc import IntegrityError
+from app.utils.serialization import table_columns, column_serializer
+from app.utils.sql import whole_days_between, update_matching, split_page
 
 class LoanService:
     """Service class for Loan operations."""
     
+    # Error reported for batch items skipped because another item failed
+    BATCH_ABORTED = "Not applied because another item in the batch failed"
+    
+    UNKNOWN_POLICY = "Unknown loan policy"
+    
+    LIMIT_REACHED = "Member has reached their borrowing limit"
+    
     @staticmethod
     def get_all_loans():
         """Get all loans."""
         return Loan.query.all()
     
+    @staticmethod
+    def get_loans_page(limit, cursor=None, status=None, member_id=None, book_id=None,
+                       expand=(), fields=None, overdue_at=None, include_archived=False):
+        """Get a page of loans using keyset pagination on id.
+        
+        status is a collection of statuses to include. With overdue_at,
+        only loans not returned and due before that time are included,
+        whether or not the overdue sweep has marked them yet. With
+        include_archived, loans moved to loan_history are included too.
+        Loans are returned as read-only rows holding the named fields (all
+        columns by default), then the columns of each related object named
+        in expand ('book', 'member'), joined in the same query, then the
+        loan id. Use loan_row_serializer to turn them into dictionaries.
+        Returns the rows on the page and the cursor for the next page.
+        """
+        statement = LoanService.loans_page_statement(limit, cursor, status, member_id, book_id,
+                                                     expand, fields, overdue_at, include_archived)
+        return split_page(db.session.execute(statement).all(), limit)
+    
+    @staticmethod
+    def loans_page_statement(limit, cursor=None, status=None, member_id=None, book_id=None,
+                             expand=(), fields=None, overdue_at=None, include_archived=False):
+        """Build the SELECT for get_loans_page, shared with the async read path."""
+        def criteria(table):
+            clauses = []
+            if cursor is not None:
+                clauses.append(table.c.id > cursor)
+            if status:
+                clauses.append(table.c.status.in_(status))
+            if overdue_at is not None:
+                clauses += [table.c.status.in_(OPEN_LOAN_STATUSES), table.c.due_at < overdue_at]
+            if member_id is not None:
+                clauses.append(table.c.member_id == member_id)
+            if book_id is not None:
+                clauses.append(table.c.book_id == book_id)
+            return clauses
+        
+        def order(table):
+            if member_id is not None and status and len(status) > 1:
+                # Several statuses cannot be read from the member/status index in ID
+                # order; without this the planner walks the member's whole history
+                # on the member/ID index instead of sorting the few matching loans
+                return table.c.id + 0
+            return table.c.id
+        
+        # Archived loans are all returned, and none is overdue
+        if include_archived and overdue_at is None and (not status or 'returned' in status):
+            loans = LoanService.with_archived(criteria)
+            where, order_by = [], loans.c.id
+        else:
+            loans = Loan.__table__
+            where, order_by = criteria(loans), order(loans)
+        
+        statement = select(*[loans.c[column.name] for column in table_columns(Loan, fields)])
+        for name, model, foreign_key in LoanService._expansions(expand):
+            statement = statement.add_columns(*table_columns(model)).join(model, loans.c[foreign_key.key] == model.id)
+        statement = statement.add_columns(loans.c.id).where(*where)
+        return statement.order_by(order_by).limit(limit + 1)
+    
+    @staticmethod
+    def with_archived(criteria):
+        """Loans and archived loans matching criteria, as one UNION ALL subquery.
+        
+        criteria is called with the loans and loan_history tables in turn
+        and returns the WHERE clauses for it. Ordered by id with a limit,
+        the database merges the two tables' (member_id, id) or (book_id, id)
+        index scans and stops at the limit, whatever the history's length.
+        """
+        names = [column.name for column in Loan.__table__.columns]
+        return union_all(*[
+            select(*[table.c[name] for name in names]).where(*criteria(table))
+            for table in (Loan.__table__, LoanHistory.__table__)
+        ]).subquery('all_loans')
+    
+    @staticmethod
+    def loan_row_serializer(fields=None, expand=()):
+        """Get a function converting rows from get_loans_page to dictionaries."""
+        serialize_loan = column_serializer(Loan, fields, rows=True)
+        offset = len(table_columns(Loan, fields))
+        related = []
+        for name, model, foreign_key in LoanService._expansions(expand):
+            related.append((name, column_serializer(model, rows=True, offset=offset)))
+            offset += len(model.__table__.columns)
+        
+        def serialize(row):
+            result = serialize_loan(row)
+            for name, serialize_related in related:
+                result[name] = serialize_related(row)
+            return result
+        return serialize
+    
+    @staticmethod
+    def _expansions(expand):
+        related = [('book', Book, Loan.book_id), ('member', Member, Loan.member_id)]
+        return [expansion for expansion in related if expansion[0] in expand]
+    
     @staticmethod
     def get_loan_by_id(loan_id):
         """Get a loan by ID."""
@@ -21,88 +135,391 @@ class LoanService:
     
     @staticmethod
     def get_active_loan_by_book(book_id):
-        """Get active loan for a specific book."""
-        return Loan.query.filter_by(book_id=book_id, status='active').first()
+        """Get the loan of a book that has not been returned, if any."""
+        return Loan.query.filter(Loan.book_id == book_id, Loan.status.in_(OPEN_LOAN_STATUSES)).first()
+    
+    @staticmethod
+    def get_policy(name=None):
+        """Get a loan policy by name, or the default one. None if unknown."""
+        name = name or current_app.config['DEFAULT_LOAN_POLICY']
+        policy = current_app.config['LOAN_POLICIES'].get(name)
+        return (name, policy) if policy else None
+    
+    @staticmethod
+    def calculate_fine(loan, now):
+        """Fine accrued by a loan as of now, under its policy."""
+        policy = current_app.config['LOAN_POLICIES'].get(loan.policy)
+        if policy is None:
+            return loan.fine_cents
+        if loan.due_at >= now:
+            return 0
+        days = (now - loan.due_at).days
+        return min(days * policy['daily_fine_cents'], policy['max_fine_cents'])
+    
+    @staticmethod
+    def fine_expression(now):
+        """SQL expression for a loan's fine as of now, the set-based calculate_fine."""
+        days = whole_days_between(Loan.due_at, now)
+        whens = []
+        for name, policy in current_app.config['LOAN_POLICIES'].items():
+            fine = days * policy['daily_fine_cents']
+            capped = case((fine > policy['max_fine_cents'], policy['max_fine_cents']), else_=fine)
+            whens.append((Loan.policy == name, capped))
+        return case((Loan.due_at >= now, 0), *whens, else_=Loan.fine_cents)
     
     @staticmethod
     def borrow_book(loan_data):
-        """Create a new loan (borrow a book)."""
+        """Create a new loan (borrow a book).
+        
+        The loan is first counted against the member's tier limit with a
+        conditional UPDATE of their active_loan_count. A copy is then
+        claimed with a single conditional UPDATE of the book's
+        available_count, so concurrent borrows cannot take more copies than
+        are on the shelf, and the loan is inserted in the same transaction.
+        The claim also checks that the member has no ready hold on the
+        book; if they do, the copy set aside for them is lent instead by
+        fulfilling the hold, so books without holds cost no hold lookup.
+        """
         try:
             book_id = loan_data['book_id']
             member_id = loan_data['member_id']
+            policy = LoanService.get_policy(loan_data.get('policy'))
+            if policy is None:
+                return None, LoanService.UNKNOWN_POLICY
+            now = datetime.utcnow()
             
-            # Validate book exists
-            book = Book.query.get(book_id)
-            if not book:
-                return None, "Book not found"
-            
-            # Validate member exists
-            member = Member.query.get(member_id)
-            if not member:
-                return None, "Member not found"
-            
-            # Check if book is available
-            if not book.available:
-                return None, "Book is not available for borrowing"
-            
-            # Check if there's already an active loan for this book
-            existing_loan = LoanService.get_active_loan_by_book(book_id)
-            if existing_loan:
-                return None, "Book is already borrowed"
+            # Count the loan against the member's limit, then take a copy
+            # from the shelf, or the copy set aside for the member
+            copy_id = None
+            if MemberService.claim_loan_slots(member_id, 1, now):
+                copy_id = CopyService.check_out(book_id, now, ~HoldService.has_ready_hold(book_id, member_id))
+                if copy_id is None:
+                    copy_id = HoldService.fulfill(book_id, member_id, now)
+            if copy_id is None:
+                db.session.rollback()
+                return None, LoanService._borrow_failure_reason(book_id, member_id)
             
             # Create loan
             loan = Loan(
                 book_id=book_id,
+                copy_id=copy_id,
                 member_id=member_id,
-                status='active'
+                borrowed_at=now,
+                due_at=now + timedelta(days=policy[1]['loan_days']),
+                updated_at=now,
+                status='active',
+                policy=policy[0],
+                fine_cents=0
             )
-            
-            # Update book availability
-            book.available = False
-            
             db.session.add(loan)
+            db.session.flush()
+            StatsService.record_borrows(1, now)
+            
+            # Keep the loaded loan usable after commit without a refresh query
+            db.session.expunge(loan)
             db.session.commit()
+            BookService.invalidate(book_id)
+            MemberService.invalidate(member_id)
             
             return loan, None
             
+        except IntegrityError:
+            # The partial unique index rejected a second open loan of the copy
+            db.session.rollback()
+            return None, "Book is already borrowed"
         except Exception as e:
             db.session.rollback()
             return None, str(e)
     
+    @staticmethod
+    def _borrow_failure_reason(book_id, member_id):
+        """Work out why a book could not be claimed for borrowing."""
+        book = Book.query.get(book_id)
+        if not book:
+            return "Book not found"
+        member = Member.query.get(member_id)
+        if not member:
+            return "Member not found"
+        if member.active_loan_count >= MemberService.loan_limit(member.tier):
+            return LoanService.LIMIT_REACHED
+        if HoldService.is_reserved(book_id):
+            return "Book is reserved for another member"
+        return "Book is not available for borrowing"
+    
     @staticmethod
     def return_book(loan_id):
-        """Return a borrowed book."""
+        """Return a borrowed book.
+        
+        The copy goes to the next member in the book's hold queue, if any,
+        and back on the shelf otherwise. The loan is closed with the
+        conditional UPDATE of return_books, so of concurrent returns of the
+        same loan only one releases the copy and updates the counts.
+        """
+        return LoanService.return_books([loan_id])[0]
+    
+    @staticmethod
+    def borrow_books(member_id, book_ids, all_or_nothing=True, policy=None):
+        """Borrow several books for one member in a single transaction.
+        
+        The member and the books are each loaded with one query and a copy
+        of each book is claimed with one conditional UPDATE of the counts.
+        Books beyond the member's borrowing limit fail, and the loans are
+        counted against it with one more conditional UPDATE. Returns a list of
+        (loan, error) tuples in the order of book_ids. In all-or-nothing
+        mode nothing is applied if any item fails.
+        """
         try:
-            loan = Loan.query.get(loan_id)
-            if not loan:
-                return None, "Loan not found"
+            policy = LoanService.get_policy(policy)
+            if policy is None:
+                return [(None, LoanService.UNKNOWN_POLICY)] * len(book_ids)
             
-            if loan.status == 'returned':
-                return None, "Book has already been returned"
+            member = Member.query.get(member_id)
+            if not member:
+                return [(None, "Member not found")] * len(book_ids)
+            
+            books = {book.id: book for book in Book.query.filter(Book.id.in_(set(book_ids)))}
+            holds = HoldService.get_ready_holds(member_id, book_ids)
+            errors = {}
+            candidates = {}
+            for index, book_id in enumerate(book_ids):
+                book = books.get(book_id)
+                if not book:
+                    errors[index] = "Book not found"
+                elif (book.available_count == 0 and book_id not in holds) or book_id in candidates.values():
+                    errors[index] = "Book is not available for borrowing"
+                elif len(candidates) >= MemberService.loan_limit(member.tier) - member.active_loan_count:
+                    errors[index] = LoanService.LIMIT_REACHED
+                else:
+                    candidates[index] = book_id
             
-            # Update loan status
-            loan.returned_at = datetime.utcnow()
-            loan.status = 'returned'
+            if errors and all_or_nothing:
+                return LoanService._abort_batch(len(book_ids), errors)
             
-            # Update book availability
-            book = Book.query.get(loan.book_id)
-            if book:
-                book.available = True
+            now = datetime.utcnow()
+            due_at = now + timedelta(days=policy[1]['loan_days'])
+            claimed = CopyService.claim(
+                [book_id for book_id in candidates.values() if book_id not in holds], now
+            )
+            fulfilled = update_matching(
+                db.session, Hold, [holds[book_id][0] for book_id in candidates.values() if book_id in holds],
+                [Hold.status == 'ready'], {'status': 'fulfilled', 'updated_at': now}
+            )
+            copies = {book_id: copy_id for book_id, (hold_id, copy_id) in holds.items() if hold_id in fulfilled}
+            CopyService.set_status(list(copies.values()), 'on_loan')
+            for book_id in claimed:
+                copies[book_id] = CopyService.take_copy(book_id, 'on_loan')
+            loans = {}
+            for index, book_id in candidates.items():
+                if book_id in copies:
+                    loans[index] = Loan(book_id=book_id, copy_id=copies[book_id], member_id=member_id, borrowed_at=now,
+                                        due_at=due_at, updated_at=now, status='active',
+                                        policy=policy[0], fine_cents=0)
+                else:
+                    # Borrowed by someone else since the books were loaded
+                    errors[index] = "Book is not available for borrowing"
             
+            if errors and all_or_nothing:
+                db.session.rollback()
+                return LoanService._abort_batch(len(book_ids), errors)
+            
+            if loans and not MemberService.claim_loan_slots(member_id, len(loans), now):
+                # Other borrows by the member since it was loaded used up the limit
+                db.session.rollback()
+                return [(None, LoanService.LIMIT_REACHED)] * len(book_ids)
+            
+            db.session.add_all(loans.values())
+            db.session.flush()
+            StatsService.record_borrows(len(loans), now)
+            for loan in loans.values():
+                db.session.expunge(loan)
             db.session.commit()
+            BookService.invalidate(*[loan.book_id for loan in loans.values()])
+            MemberService.invalidate(member_id)
             
-            return loan, None
+            return [(loans.get(index), errors.get(index)) for index in range(len(book_ids))]
+            
+        except IntegrityError:
+            db.session.rollback()
+            return [(None, "Book is already borrowed")] * len(book_ids)
+        except Exception as e:
+            db.session.rollback()
+            return [(None, str(e))] * len(book_ids)
+    
+    @staticmethod
+    def return_books(loan_ids, all_or_nothing=True):
+        """Return several loans in a single transaction.
+        
+        The loans are loaded with one query and closed with one conditional
+        UPDATE that also settles their fines. One query finds the books with
+        members waiting for them; each copy of those is set aside for the
+        next member with a SELECT and an UPDATE (see HoldService.pass_on),
+        and the other copies are released to the shelf with two more. One
+        more UPDATE adjusts the members' loan counts. Returns a list of
+        (loan, error) tuples in the order of loan_ids. In all-or-nothing
+        mode nothing is applied if any item fails.
+        """
+        try:
+            loans = {loan.id: loan for loan in Loan.query.filter(Loan.id.in_(set(loan_ids)))}
+            errors = {}
+            candidates = {}
+            for index, loan_id in enumerate(loan_ids):
+                loan = loans.get(loan_id)
+                if not loan:
+                    errors[index] = "Loan not found"
+                elif loan.status == 'returned' or loan_id in candidates.values():
+                    errors[index] = "Book has already been returned"
+                else:
+                    candidates[index] = loan_id
+            
+            if errors and all_or_nothing:
+                return LoanService._abort_batch(len(loan_ids), errors)
+            
+            now = datetime.utcnow()
+            fines = {loan_id: LoanService.calculate_fine(loans[loan_id], now)
+                     for loan_id in candidates.values()}
+            closed = update_matching(
+                db.session, Loan, list(candidates.values()), [Loan.status.in_(OPEN_LOAN_STATUSES)],
+                {'status': 'returned', 'returned_at': now, 'updated_at': now,
+                 'fine_cents': case(fines, value=Loan.id, else_=Loan.fine_cents) if fines else Loan.fine_cents}
+            )
+            for index, loan_id in list(candidates.items()):
+                if loan_id not in closed:
+                    # Returned by someone else since the loans were loaded
+                    errors[index] = "Book has already been returned"
+                    del candidates[index]
+            
+            if errors and all_or_nothing:
+                db.session.rollback()
+                return LoanService._abort_batch(len(loan_ids), errors)
+            
+            book_ids = {loans[loan_id].book_id for loan_id in closed}
+            if closed:
+                HoldService.pass_on([(loans[loan_id].book_id, loans[loan_id].copy_id) for loan_id in closed], now)
+                MemberService.release_loan_slots(Counter(loans[loan_id].member_id for loan_id in closed), now)
+                overdue = sum(1 for loan_id in closed if loans[loan_id].status == 'overdue')
+                StatsService.record_returns(len(closed), now, overdue=overdue)
+            
+            # Reflect the bulk update on the returned objects without flushing them
+            for loan_id in closed:
+                loan = loans[loan_id]
+                db.session.expunge(loan)
+                loan.status = 'returned'
+                loan.returned_at = now
+                loan.updated_at = now
+                loan.fine_cents = fines[loan_id]
+            db.session.commit()
+            BookService.invalidate(*book_ids)
+            MemberService.invalidate(*{loans[loan_id].member_id for loan_id in closed})
+            
+            return [(loans[candidates[index]] if index in candidates else None, errors.get(index))
+                    for index in range(len(loan_ids))]
             
+        except Exception as e:
+            db.session.rollback()
+            return [(None, str(e))] * len(loan_ids)
+    
+    @staticmethod
+    def sweep_overdue(now=None, batch_size=None):
+        """Mark loans past their due date as overdue and accrue their fines.
+        
+        Runs off the request path, from the CLI or the scheduler. Loans are
+        updated with set-based UPDATE statements of at most batch_size rows,
+        each committed on its own so locks are held briefly, and the fines
+        are computed in the database. Returns the number of loans marked
+        overdue and the number whose fine changed.
+        """
+        now = now or datetime.utcnow()
+        batch_size = batch_size or current_app.config['OVERDUE_SWEEP_BATCH_SIZE']
+        try:
+            marked = LoanService._update_in_batches(
+                [Loan.status == 'active', Loan.due_at < now],
+                {'status': 'overdue', 'updated_at': now},
+                batch_size, lambda count: StatsService.increment({OVERDUE_LOANS: count})
+            )
+            fine = LoanService.fine_expression(now)
+            fined = LoanService._update_in_batches(
+                [Loan.status == 'overdue', Loan.fine_cents != fine],
+                {'fine_cents': fine, 'updated_at': now},
+                batch_size
+            )
+            return {'marked': marked, 'fined': fined}, None
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+    
+    @staticmethod
+    def archive_returned(now=None, after_days=None, batch_size=None):
+        """Move loans returned more than after_days days ago to loan_history.
+        
+        Runs off the request path, from the CLI or the scheduler. Each batch
+        of at most batch_size loans is copied with one INSERT ... SELECT and
+        removed with one DELETE, in its own transaction, so the loans table
+        keeps little more than open loans. Loans are kept for at least
+        STATS_RECONCILE_DAYS days, which reconciliation recounts from them.
+        Returns the number of loans archived.
+        """
+        now = now or datetime.utcnow()
+        after_days = max(after_days or current_app.config['LOAN_ARCHIVE_AFTER_DAYS'],
+                         current_app.config['STATS_RECONCILE_DAYS'])
+        batch_size = batch_size or current_app.config['LOAN_ARCHIVE_BATCH_SIZE']
+        cutoff = now - timedelta(days=after_days)
+        columns = list(Loan.__table__.columns)
+        total = 0
+        try:
+            while True:
+                ids = db.session.scalars(
+                    select(Loan.id).where(Loan.status == 'returned', Loan.returned_at < cutoff).limit(batch_size)
+                ).all()
+                if ids:
+                    db.session.execute(insert(LoanHistory).from_select(
+                        [column.name for column in columns] + ['archived_at'],
+                        select(*columns, literal(now, db.DateTime)).where(Loan.id.in_(ids))
+                    ))
+                    db.session.execute(
+                        delete(Loan).where(Loan.id.in_(ids)).execution_options(synchronize_session=False))
+                db.session.commit()
+                total += len(ids)
+                if len(ids) < batch_size:
+                    return {'archived': total}, None
         except Exception as e:
             db.session.rollback()
             return None, str(e)
     
+    @staticmethod
+    def _update_in_batches(criteria, values, batch_size, on_batch=None):
+        """Update the loans matching criteria, batch_size rows per transaction.
+        
+        The criteria must stop matching a loan once it is updated. on_batch
+        is called with each batch's row count before it is committed.
+        """
+        total = 0
+        while True:
+            batch = select(Loan.id).where(*criteria).limit(batch_size).correlate(None)
+            count = db.session.execute(
+                update(Loan)
+                .where(Loan.id.in_(batch))
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if count and on_batch:
+                on_batch(count)
+            db.session.commit()
+            total += count
+            if count < batch_size:
+                return total
+    
+    @staticmethod
+    def _abort_batch(count, errors):
+        """Build the results of an all-or-nothing batch that was not applied."""
+        return [(None, errors.get(index, LoanService.BATCH_ABORTED)) for index in range(count)]
+    
     @staticmethod
     def get_member_active_loans(member_id):
-        """Get all active loans for a member."""
-        return Loan.query.filter_by(member_id=member_id, status='active').all()
+        """Get all loans of a member that have not been returned."""
+        return Loan.query.filter(Loan.member_id == member_id, Loan.status.in_(OPEN_LOAN_STATUSES)).all()
     
     @staticmethod
     def get_book_loan_history(book_id):
-        """Get loan history for a book."""
-        return Loan.query.filter_by(book_id=book_id).all()
+        """Get loan history for a book, archived loans included, as read-only rows in ID order."""
+        loans = LoanService.with_archived(lambda table: [table.c.book_id == book_id])
+        return db.session.execute(select(loans).order_by(loans.c.id)).all()
@@ -1,20 +1,65 @@
-from app import db
+from app import db, cache
 from app.models.member import Member
+from app.models.loan import Loan, OPEN_LOAN_STATUSES
+from app.utils.serialization import table_columns
+from app.services.stats_service import StatsService, TOTAL_MEMBERS
+from flask import current_app
+from sqlalchemy import case, exists, func, select, update
 from sqlalchemy.exc import IntegrityError
 
 class MemberService:
     """Service class for Member operations."""
     
+    UNKNOWN_TIER = "Unknown member tier"
+    
     @staticmethod
     def get_all_members():
         """Get all members."""
         return Member.query.all()
     
+    @staticmethod
+    def get_all_member_rows(fields=None):
+        """Get all members as read-only rows of the named fields, in ID order."""
+        return db.session.execute(MemberService.member_rows_statement(fields)).all()
+    
+    @staticmethod
+    def member_rows_statement(fields=None):
+        """Build the SELECT for get_all_member_rows, shared with the async read path."""
+        return select(*table_columns(Member, fields)).order_by(Member.id)
+    
+    @staticmethod
+    def get_members_version():
+        """Get the number of members and their latest update time."""
+        return db.session.execute(MemberService.members_version_statement()).one()
+    
+    @staticmethod
+    def members_version_statement():
+        """Build the SELECT for get_members_version, shared with the async read path."""
+        return select(func.count(Member.id), func.max(Member.updated_at))
+    
     @staticmethod
     def get_member_by_id(member_id):
         """Get a member by ID."""
         return Member.query.get(member_id)
     
+    @staticmethod
+    def cache_key(member_id):
+        """Get the cache key of a member."""
+        return f'member:{member_id}'
+    
+    @staticmethod
+    def get_member_data(member_id):
+        """Get a member as a dictionary, read through the cache."""
+        def load():
+            member = Member.query.get(member_id)
+            return member.to_dict() if member else None
+        return cache.get_or_set(MemberService.cache_key(member_id), load)
+    
+    @staticmethod
+    def invalidate(*member_ids):
+        """Drop members from the cache after they changed."""
+        cache.delete(*[MemberService.cache_key(member_id) for member_id in member_ids])
+    
     @staticmethod
     def get_member_by_email(email):
         """Get a member by email."""
@@ -29,12 +74,18 @@ class MemberService:
             if existing_member:
                 return None, "Email already exists"
             
+            tier = member_data.get('tier', current_app.config['DEFAULT_MEMBER_TIER'])
+            if tier not in current_app.config['MEMBER_TIERS']:
+                return None, MemberService.UNKNOWN_TIER
+            
             member = Member(
                 name=member_data['name'],
                 email=member_data['email'],
-                phone=member_data.get('phone')
+                phone=member_data.get('phone'),
+                tier=tier
             )
             db.session.add(member)
+            StatsService.increment({TOTAL_MEMBERS: 1})
             db.session.commit()
             return member, None
         except IntegrityError as e:
@@ -60,6 +111,9 @@ class MemberService:
                 if existing_member:
                     return None, "Email already exists"
             
+            if 'tier' in member_data and member_data['tier'] not in current_app.config['MEMBER_TIERS']:
+                return None, MemberService.UNKNOWN_TIER
+            
             # Update fields if provided
             if 'name' in member_data:
                 member.name = member_data['name']
@@ -67,8 +121,11 @@ class MemberService:
                 member.email = member_data['email']
             if 'phone' in member_data:
                 member.phone = member_data['phone']
+            if 'tier' in member_data:
+                member.tier = member_data['tier']
             
             db.session.commit()
+            MemberService.invalidate(member_id)
             return member, None
         except IntegrityError as e:
             db.session.rollback()
@@ -82,15 +139,148 @@ class MemberService:
     @staticmethod
     def has_active_loans(member_id):
         """Check if member has active loans."""
-        member = Member.query.get(member_id)
-        if not member:
-            return False
-        return len(member.get_active_loans()) > 0
+        return db.session.query(
+            exists().where(Loan.member_id == member_id, Loan.status.in_(OPEN_LOAN_STATUSES))
+        ).scalar()
+    
+    @staticmethod
+    def count_active_loans(member_id):
+        """Count the loans of a member that have not been returned."""
+        return db.session.scalar(
+            select(func.count()).where(Loan.member_id == member_id, Loan.status.in_(OPEN_LOAN_STATUSES))
+        )
+    
+    @staticmethod
+    def loan_limit(tier):
+        """Most loans a member of a tier may have out at once."""
+        tiers = current_app.config['MEMBER_TIERS']
+        return tiers.get(tier, tiers[current_app.config['DEFAULT_MEMBER_TIER']])['max_loans']
+    
+    @staticmethod
+    def loan_limit_expression():
+        """SQL expression for a member's loan limit, the set-based loan_limit."""
+        limits = {name: tier['max_loans'] for name, tier in current_app.config['MEMBER_TIERS'].items()}
+        return case(limits, value=Member.tier, else_=MemberService.loan_limit(None))
     
     @staticmethod
-    def get_member_loans(member_id):
-        """Get all loans for a member."""
-        member = Member.query.get(member_id)
-        if not member:
+    def claim_loan_slots(member_id, count, now):
+        """Count loans against a member's borrowing limit.
+        
+        Runs in the caller's transaction. The member's active_loan_count is
+        incremented with a single conditional UPDATE, so concurrent borrows
+        cannot take the member past the tier's limit. Returns False, and
+        changes nothing, if the member does not exist or has too few loans
+        left.
+        """
+        return db.session.execute(
+            update(Member)
+            .where(Member.id == member_id,
+                   Member.active_loan_count + count <= MemberService.loan_limit_expression())
+            .values(active_loan_count=Member.active_loan_count + count, updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+    
+    @staticmethod
+    def release_loan_slots(counts, now):
+        """Take returned loans off their members' counts.
+        
+        Runs in the caller's transaction; counts maps member IDs to the
+        number of their loans returned.
+        """
+        if not counts:
+            return
+        db.session.execute(
+            update(Member)
+            .where(Member.id.in_(list(counts)))
+            .values(active_loan_count=Member.active_loan_count - case(counts, value=Member.id),
+                    updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    
+    @staticmethod
+    def check_loan_counts(fix=False):
+        """Compare members' active_loan_count with their open loans.
+        
+        Returns (member_id, stored, actual) for each member whose counter
+        has drifted. With fix, the drifted counters are recomputed from the
+        loans table in one UPDATE.
+        """
+        actual = (
+            select(func.count())
+            .where(Loan.member_id == Member.id, Loan.status.in_(OPEN_LOAN_STATUSES))
+            .correlate(Member)
+            .scalar_subquery()
+        )
+        try:
+            drifted = db.session.execute(
+                select(Member.id, Member.active_loan_count, actual)
+                .where(Member.active_loan_count != actual)
+                .order_by(Member.id)
+            ).all()
+            if fix and drifted:
+                db.session.execute(
+                    update(Member)
+                    .where(Member.active_loan_count != actual)
+                    .values(active_loan_count=actual)
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+                MemberService.invalidate(*[row[0] for row in drifted])
+            return [tuple(row) for row in drifted], None
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+    
+    @staticmethod
+    def get_member_loans(member_id, limit, cursor=None, status=None, expand=(), fields=None):
+        """Get a page of a member's loans using keyset pagination on id.
+        
+        Archived loans are included. Returns the rows and next cursor as
+        LoanService.get_loans_page does, or None if the member does not
+        exist.
+        """
+        from app.services.loan_service import LoanService
+        
+        if not db.session.query(exists().where(Member.id == member_id)).scalar():
+            return None
+        return LoanService.get_loans_page(limit, cursor=cursor, status=status, member_id=member_id,
+                                          expand=expand, fields=fields, include_archived=True)
+    
+    @staticmethod
+    def get_member_stats(member_id):
+        """Get a member's borrowing statistics in one aggregate query.
+        
+        Archived loans are included. Returns None if the member does not
+        exist. Fines on open loans are still accruing; fines_cents includes
+        them.
+        """
+        from app.services.loan_service import LoanService
+        
+        loans = LoanService.with_archived(lambda table: [table.c.member_id == member_id])
+        
+        def count_of(*statuses):
+            return func.coalesce(func.sum(case((loans.c.status.in_(statuses), 1), else_=0)), 0)
+        
+        row = db.session.execute(
+            select(
+                func.count(loans.c.id).label('total_loans'),
+                count_of(*OPEN_LOAN_STATUSES).label('open_loans'),
+                count_of('overdue').label('overdue_loans'),
+                count_of('returned').label('returned_loans'),
+                func.coalesce(func.sum(loans.c.fine_cents), 0).label('fines_cents'),
+                func.coalesce(func.sum(case((loans.c.status.in_(OPEN_LOAN_STATUSES), loans.c.fine_cents), else_=0)), 0)
+                    .label('accruing_fines_cents'),
+                func.min(loans.c.borrowed_at).label('first_borrowed_at'),
+                func.max(loans.c.borrowed_at).label('last_borrowed_at')
+            )
+            .select_from(Member)
+            .outerjoin(loans, loans.c.member_id == Member.id)
+            .where(Member.id == member_id)
+            .group_by(Member.id)
+        ).first()
+        if row is None:
             return None
-        return member.loans
+        stats = {'member_id': member_id, **row._asdict()}
+        for key in ('first_borrowed_at', 'last_borrowed_at'):
+            stats[key] = stats[key].isoformat() if stats[key] else None
+        return stats
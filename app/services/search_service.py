@@ -0,0 +1,137 @@
+from app import db
+from app.models.book import Book
+from flask import current_app
+from sqlalchemy import text, and_, or_
+from sqlalchemy.exc import OperationalError
+
+# FTS5 index over the searchable book columns. It is an external content
+# table, so the text is read from the books table and only the index is
+# stored. The triggers keep it in sync with every write to books.
+FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+        title, author, isbn,
+        content='books', content_rowid='id',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+        INSERT INTO books_fts(rowid, title, author, isbn)
+        VALUES (new.id, new.title, new.author, new.isbn);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, isbn)
+        VALUES ('delete', old.id, old.title, old.author, old.isbn);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE OF title, author, isbn ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, isbn)
+        VALUES ('delete', old.id, old.title, old.author, old.isbn);
+        INSERT INTO books_fts(rowid, title, author, isbn)
+        VALUES (new.id, new.title, new.author, new.isbn);
+    END
+    """
+]
+
+class SearchService:
+    """Service class for full-text book search."""
+
+    @staticmethod
+    def ensure_index():
+        """Create the FTS5 index if the database supports it.
+
+        Returns True when the FTS5 index is in use and False when search
+        falls back to LIKE matching.
+        """
+        if db.engine.dialect.name != 'sqlite':
+            return False
+
+        try:
+            with db.engine.begin() as conn:
+                exists = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books_fts'"
+                )).first()
+                for statement in FTS_SCHEMA:
+                    conn.execute(text(statement))
+                if not exists:
+                    # Index rows that were inserted before the index existed
+                    conn.execute(text("INSERT INTO books_fts(books_fts) VALUES ('rebuild')"))
+            return True
+        except OperationalError:
+            # SQLite was built without FTS5
+            return False
+
+    @staticmethod
+    def rebuild_index():
+        """Rebuild the FTS5 index from the books table."""
+        if not current_app.config.get('BOOK_SEARCH_FTS'):
+            return False
+        db.session.execute(text("INSERT INTO books_fts(books_fts) VALUES ('rebuild')"))
+        db.session.commit()
+        return True
+
+    @staticmethod
+    def search_books(query, limit, offset=0, available=None):
+        """Search books by title, author and ISBN.
+
+        Every search term is matched as a prefix. Returns the matching books
+        ranked by relevance and the offset of the next page, which is None
+        once the last page has been reached.
+        """
+        terms = query.split()
+        if not terms:
+            return [], None
+
+        if current_app.config.get('BOOK_SEARCH_FTS'):
+            book_ids = SearchService._search_fts(terms, limit + 1, offset, available)
+            books_by_id = {
+                book.id: book for book in Book.query.filter(Book.id.in_(book_ids)).all()
+            }
+            books = [books_by_id[book_id] for book_id in book_ids if book_id in books_by_id]
+        else:
+            books = SearchService._search_like(terms, limit + 1, offset, available)
+
+        next_offset = None
+        if len(books) > limit:
+            books = books[:limit]
+            next_offset = offset + limit
+        return books, next_offset
+
+    @staticmethod
+    def _search_fts(terms, limit, offset, available):
+        """Return the IDs of matching books ranked by bm25."""
+        # Quote every term so FTS5 syntax in user input is matched literally
+        match = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        sql = """
+            SELECT books_fts.rowid FROM books_fts
+            JOIN books ON books.id = books_fts.rowid
+            WHERE books_fts MATCH :match
+        """
+        params = {'match': match, 'limit': limit, 'offset': offset}
+        if available is not None:
+            sql += " AND books.available = :available"
+            params['available'] = available
+        sql += " ORDER BY bm25(books_fts) LIMIT :limit OFFSET :offset"
+        return [row[0] for row in db.session.execute(text(sql), params)]
+
+    @staticmethod
+    def _search_like(terms, limit, offset, available):
+        """Return matching books using LIKE on databases without FTS5."""
+        conditions = []
+        for term in terms:
+            pattern = '%{}%'.format(
+                term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            )
+            conditions.append(or_(
+                Book.title.ilike(pattern, escape='\\'),
+                Book.author.ilike(pattern, escape='\\'),
+                Book.isbn.ilike(pattern, escape='\\')
+            ))
+        query = Book.query.filter(and_(*conditions))
+        if available is not None:
+            query = query.filter(Book.available == available)
+        return query.order_by(Book.id).limit(limit).offset(offset).all()
@@ -0,0 +1,341 @@
+from app import db
+from app.models.book import Book
+from app.models.copy import Copy
+from app.models.member import Member
+from app.models.loan import Loan
+from app.services.search_service import SearchService
+from app.services.stats_service import StatsService
+from flask import current_app
+from datetime import datetime, timedelta
+from itertools import accumulate
+from sqlalchemy import bindparam, text, update
+import math
+import random
+
+FIRST_NAMES = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda',
+               'David', 'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica',
+               'Thomas', 'Sarah', 'Charles', 'Karen', 'Daniel', 'Nancy', 'Matthew', 'Lisa',
+               'Anthony', 'Betty', 'Mark', 'Margaret', 'Aisha', 'Wei', 'Priya', 'Omar']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+              'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson',
+              'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin', 'Lee', 'Perez', 'Thompson',
+              'White', 'Harris', 'Clark', 'Lewis', 'Robinson', 'Khan', 'Chen', 'Patel', 'Nguyen']
+TITLE_WORDS = ['River', 'Garden', 'Night', 'Winter', 'Silver', 'Empire', 'Shadow', 'Ocean',
+               'Stone', 'Crown', 'Forest', 'Letter', 'Mirror', 'Island', 'Storm', 'Glass',
+               'Harvest', 'Lantern', 'Orchard', 'Compass', 'Feather', 'Thunder', 'Harbor', 'Ember']
+
+# Zipf exponents of book popularity and member activity, and the share of
+# loans under each policy and of members in each tier
+BOOK_POPULARITY_S = 1.0
+MEMBER_ACTIVITY_S = 0.8
+POLICY_MIX = [('standard', 85), ('short', 10), ('reference', 5)]
+TIER_MIX = [('standard', 90), ('premium', 8), ('staff', 2)]
+
+# Columns of the generated rows, in the order of their values
+BOOK_COLUMNS = ('id', 'title', 'author', 'isbn', 'available', 'available_count', 'copy_count',
+                'created_at', 'updated_at')
+COPY_COLUMNS = ('id', 'book_id', 'status', 'created_at', 'updated_at')
+MEMBER_COLUMNS = ('id', 'name', 'email', 'phone', 'tier', 'active_loan_count', 'created_at', 'updated_at')
+LOAN_COLUMNS = ('book_id', 'copy_id', 'member_id', 'borrowed_at', 'due_at', 'returned_at', 'status',
+                'policy', 'fine_cents', 'updated_at')
+
+def _zipf_cum_weights(n, s):
+    """Cumulative weights of ranks 1..n under a Zipf distribution with exponent s."""
+    return list(accumulate(1 / rank ** s for rank in range(1, n + 1)))
+
+def _isbn13(number):
+    """A valid ISBN-13 in the 978 prefix for a number below 10^9."""
+    digits = f'978{number:09d}'
+    check = (10 - sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits)) % 10) % 10
+    return digits + str(check)
+
+class SeedService:
+    """Service class generating synthetic data at production scale.
+
+    Book popularity and member activity follow Zipf distributions over a
+    shuffled ranking, so a few books and members account for most loans,
+    and loan durations are log-normal around the policy's loan period, so
+    some loans come back late with a fine and some are still out. Rows are
+    written with Core executemany inserts in chunks on one connection,
+    which on SQLite runs with fsync off for the load. The same seed and
+    now always produce the same rows.
+    """
+
+    @staticmethod
+    def seed(books, members, loans, seed=0, now=None, days=365, chunk_size=50000, progress=None):
+        """Fill an empty database with books, copies, members and loans.
+
+        Loans are borrowed over the days before now. progress, if given,
+        is called with a table name and the rows written so far. Returns
+        the number of rows of each kind written.
+        """
+        now = now or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        progress = progress or (lambda table, count: None)
+        if db.session.query(Book.id).first() or db.session.query(Member.id).first():
+            return None, "Database is not empty"
+        db.session.close()
+
+        rng = random.Random(seed)
+        try:
+            try:
+                with db.engine.connect() as conn:
+                    copy_count, open_loans = SeedService._load(conn, rng, books, members, loans, now, days,
+                                                               chunk_size, progress)
+            finally:
+                # The load drops the search index; rebuild it even if the load failed
+                if current_app.config.get('BOOK_SEARCH_FTS'):
+                    SearchService.ensure_index()
+
+            # Open loans past their due date are marked overdue and fined
+            from app.services.loan_service import LoanService
+            _, error = LoanService.sweep_overdue(now=now)
+            if error:
+                return None, error
+            _, error = StatsService.reconcile()
+            if error:
+                return None, error
+            return {'books': books, 'copies': copy_count, 'members': members,
+                    'loans': loans, 'open_loans': open_loans}, None
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+
+    @staticmethod
+    def _load(conn, rng, books, members, loans, now, days, chunk_size, progress):
+        """Write the rows on conn, with the search and non-unique loan indexes dropped.
+
+        The loan indexes are rebuilt in one pass afterwards, also when the
+        load fails, and the search index is left to the caller. Returns the
+        number of copies and of loans still out.
+        """
+        is_sqlite = conn.dialect.name == 'sqlite'
+        # Every chunk would be logged
+        conn.execution_options(log_slow_queries=False)
+        if is_sqlite:
+            # Only this connection skips fsync, and only for the load
+            synchronous = conn.exec_driver_sql('PRAGMA synchronous').scalar()
+            conn.exec_driver_sql('PRAGMA synchronous = OFF')
+        loan_indexes = [index for index in Loan.__table__.indexes if not index.unique]
+        try:
+            if is_sqlite:
+                # Indexed after the load in one pass
+                conn.execute(text('DROP TABLE IF EXISTS books_fts'))
+                for trigger in ('insert', 'delete', 'update'):
+                    conn.execute(text(f'DROP TRIGGER IF EXISTS books_fts_{trigger}'))
+            for index in loan_indexes:
+                index.drop(conn)
+            conn.commit()
+
+            copies = SeedService._insert_books(conn, rng, books, now, chunk_size, progress)
+            limits = SeedService._insert_members(conn, rng, members, now, chunk_size, progress)
+            open_loans, out_by_member = SeedService._insert_loans(conn, rng, loans, copies, limits, now, days,
+                                                                  chunk_size, progress)
+
+            # Take the copies still on loan off the shelf
+            for start in range(0, len(open_loans), chunk_size):
+                conn.execute(
+                    update(Copy).where(Copy.id == bindparam('copy_id')).values(status='on_loan'),
+                    [{'copy_id': copy_id} for copy_id in open_loans[start:start + chunk_size]]
+                )
+            out = {}
+            for copy_id in open_loans:
+                book_id = copies['book_of'][copy_id]
+                out[book_id] = out.get(book_id, 0) + 1
+            rows = [{'book_id': book_id, 'on_shelf': copies['count'][book_id] - count,
+                     'any_on_shelf': copies['count'][book_id] > count}
+                    for book_id, count in out.items()]
+            for start in range(0, len(rows), chunk_size):
+                conn.execute(
+                    update(Book).where(Book.id == bindparam('book_id'))
+                    .values(available_count=bindparam('on_shelf'), available=bindparam('any_on_shelf')),
+                    rows[start:start + chunk_size]
+                )
+            rows = [{'member_id': member_id, 'out': count} for member_id, count in out_by_member.items()]
+            for start in range(0, len(rows), chunk_size):
+                conn.execute(
+                    update(Member).where(Member.id == bindparam('member_id'))
+                    .values(active_loan_count=bindparam('out')),
+                    rows[start:start + chunk_size]
+                )
+            if conn.dialect.name == 'postgresql':
+                # The rows were inserted with their IDs, which does not
+                # advance the sequences; move them past the highest ID
+                for table in (Book.__table__, Copy.__table__, Member.__table__):
+                    conn.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                        f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {table.name}), false)"
+                    ))
+            conn.commit()
+            return len(copies['book_of']) - 1, len(open_loans)
+        finally:
+            # Whether or not the load succeeded, the database keeps its indexes
+            conn.rollback()
+            for index in loan_indexes:
+                index.create(conn, checkfirst=True)
+            conn.commit()
+            if is_sqlite:
+                conn.exec_driver_sql(f'PRAGMA synchronous = {synchronous}')
+
+    @staticmethod
+    def _insert(conn, table, columns, rows):
+        """Insert rows, tuples of values for columns, with one executemany.
+
+        On SQLite the rows go straight to the driver, skipping SQLAlchemy's
+        per-value type processing, so datetimes must already be formatted
+        with SeedService._timestamp.
+        """
+        if conn.dialect.name == 'sqlite':
+            conn.exec_driver_sql(
+                f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                rows
+            )
+        else:
+            conn.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+
+    @staticmethod
+    def _timestamp(conn):
+        """Function converting datetimes to the values _insert takes."""
+        if conn.dialect.name == 'sqlite':
+            # The format of SQLAlchemy's SQLite DateTime type
+            return lambda value: value.isoformat(' ', 'microseconds')
+        return lambda value: value
+
+    @staticmethod
+    def _insert_books(conn, rng, books, now, chunk_size, progress):
+        """Insert books and their copies, more copies for the most popular books.
+
+        Returns the books' IDs by popularity rank, the cumulative rank
+        weights, each book's copy count and first copy ID, and each copy's
+        book ID (indexed by copy ID).
+        """
+        stamp = SeedService._timestamp(conn)
+        by_rank = list(range(1, books + 1))
+        rng.shuffle(by_rank)
+        rank_of = [0] * (books + 1)
+        for rank, book_id in enumerate(by_rank):
+            rank_of[book_id] = rank
+
+        count = [0] * (books + 1)
+        first_copy = [0] * (books + 1)
+        book_of = [0]
+        authors = max(books // 8, 1)
+        author_names = [f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}' for _ in range(authors)]
+        author_weights = _zipf_cum_weights(authors, 1.0)
+        for start in range(1, books + 1, chunk_size):
+            book_rows = []
+            copy_rows = []
+            ids = range(start, min(start + chunk_size, books + 1))
+            for book_id, author in zip(ids, rng.choices(author_names, cum_weights=author_weights, k=len(ids))):
+                rank = rank_of[book_id]
+                count[book_id] = 3 if rank < books // 100 else 2 if rank < books // 10 else 1
+                first_copy[book_id] = len(book_of)
+                book_of.extend([book_id] * count[book_id])
+                created_at = stamp(now - timedelta(days=730, minutes=books - book_id))
+                words = rng.sample(TITLE_WORDS, 2)
+                title = f'The {words[0]} of the {words[1]}' if book_id % 3 else f'{words[0]} and {words[1]}'
+                book_rows.append((book_id, title, author, _isbn13(book_id), True,
+                                  count[book_id], count[book_id], created_at, created_at))
+                for copy_id in range(first_copy[book_id], first_copy[book_id] + count[book_id]):
+                    copy_rows.append((copy_id, book_id, 'available', created_at, created_at))
+            SeedService._insert(conn, Book.__table__, BOOK_COLUMNS, book_rows)
+            SeedService._insert(conn, Copy.__table__, COPY_COLUMNS, copy_rows)
+            conn.commit()
+            progress('books', ids[-1])
+
+        return {'by_rank': by_rank, 'weights': _zipf_cum_weights(books, BOOK_POPULARITY_S),
+                'count': count, 'first_copy': first_copy, 'book_of': book_of}
+
+    @staticmethod
+    def _insert_members(conn, rng, members, now, chunk_size, progress):
+        """Insert members with unique emails and a mix of tiers.
+
+        Returns each member's borrowing limit (indexed by member ID).
+        """
+        stamp = SeedService._timestamp(conn)
+        tiers = current_app.config['MEMBER_TIERS']
+        tier_names = [name for name, _ in TIER_MIX if name in tiers] or [current_app.config['DEFAULT_MEMBER_TIER']]
+        tier_weights = list(accumulate(weight for name, weight in TIER_MIX if name in tiers)) or [1]
+        limits = [0]
+        for start in range(1, members + 1, chunk_size):
+            rows = []
+            ids = range(start, min(start + chunk_size, members + 1))
+            for member_id, tier in zip(ids, rng.choices(tier_names, cum_weights=tier_weights, k=len(ids))):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                created_at = stamp(now - timedelta(days=730, minutes=members - member_id))
+                rows.append((member_id, f'{first} {last}', f'{first}.{last}.{member_id}@example.com'.lower(),
+                             f'555-{member_id % 10000000:07d}', tier, 0, created_at, created_at))
+                limits.append(tiers[tier]['max_loans'])
+            SeedService._insert(conn, Member.__table__, MEMBER_COLUMNS, rows)
+            conn.commit()
+            progress('members', ids[-1])
+        return limits
+
+    @staticmethod
+    def _insert_loans(conn, rng, loans, copies, limits, now, days, chunk_size, progress):
+        """Insert loans borrowed evenly over the days before now.
+
+        A loan whose return would fall after now is still out. If every copy
+        of its book is out, it goes to another book with a copy on the
+        shelf, or failing that, was returned early, as it was if the member
+        is at their borrowing limit. Returns the IDs of the copies on loan
+        and the number of loans out per member.
+        """
+        stamp = SeedService._timestamp(conn)
+        policies = current_app.config['LOAN_POLICIES']
+        policy_names = [name for name, _ in POLICY_MIX if name in policies]
+        policy_weights = list(accumulate(weight for name, weight in POLICY_MIX if name in policies))
+        members = len(limits) - 1
+        member_by_rank = list(range(1, members + 1))
+        rng.shuffle(member_by_rank)
+        member_weights = _zipf_cum_weights(members, MEMBER_ACTIVITY_S)
+        count, first_copy = copies['count'], copies['first_copy']
+
+        start_at = now - timedelta(days=days)
+        step = timedelta(days=days) / max(loans, 1)
+        out = {}
+        out_by_member = {}
+        open_loans = []
+        for start in range(0, loans, chunk_size):
+            size = min(chunk_size, loans - start)
+            book_ids = rng.choices(copies['by_rank'], cum_weights=copies['weights'], k=size)
+            member_ids = rng.choices(member_by_rank, cum_weights=member_weights, k=size)
+            policy_picks = rng.choices(policy_names, cum_weights=policy_weights, k=size)
+            rows = []
+            for i in range(size):
+                book_id = book_ids[i]
+                member_id = member_ids[i]
+                policy = policies[policy_picks[i]]
+                borrowed_at = start_at + step * (start + i + rng.random())
+                due_at = borrowed_at + timedelta(days=policy['loan_days'])
+                # Median return at 70% of the loan period, a tenth or so late
+                returned_at = borrowed_at + timedelta(
+                    days=rng.lognormvariate(math.log(policy['loan_days'] * 0.7), 0.45))
+
+                if returned_at > now:
+                    # With every copy of the book out, the member took another one
+                    for _ in range(3):
+                        if out.get(book_id, 0) < count[book_id]:
+                            break
+                        book_id = rng.randrange(1, len(count))
+                if (returned_at > now and out.get(book_id, 0) < count[book_id]
+                        and out_by_member.get(member_id, 0) < limits[member_id]):
+                    copy_id = first_copy[book_id] + out.get(book_id, 0)
+                    out[book_id] = out.get(book_id, 0) + 1
+                    out_by_member[member_id] = out_by_member.get(member_id, 0) + 1
+                    open_loans.append(copy_id)
+                    rows.append((book_id, copy_id, member_id, stamp(borrowed_at), stamp(due_at), None,
+                                 'active', policy_picks[i], 0, stamp(borrowed_at)))
+                    continue
+
+                if returned_at > now:
+                    # Every copy or the member's limit is out, so this one came back already
+                    returned_at = borrowed_at + (now - borrowed_at) * rng.random()
+                late_days = (returned_at - due_at).days if returned_at > due_at else 0
+                rows.append((book_id, first_copy[book_id] + rng.randrange(count[book_id]), member_id,
+                             stamp(borrowed_at), stamp(due_at), stamp(returned_at), 'returned', policy_picks[i],
+                             min(late_days * policy['daily_fine_cents'], policy['max_fine_cents']),
+                             stamp(returned_at)))
+            SeedService._insert(conn, Loan.__table__, LOAN_COLUMNS, rows)
+            conn.commit()
+            progress('loans', start + size)
+        return open_loans, out_by_member
@@ -0,0 +1,184 @@
+from app import db
+from app.models.book import Book
+from app.models.copy import Copy
+from app.models.member import Member
+from app.models.loan import Loan, OPEN_LOAN_STATUSES
+from app.models.stats import StatsCounter
+from flask import current_app
+from datetime import datetime, timedelta
+from collections import Counter
+from sqlalchemy import event, func
+
+# Counters kept for the whole library
+TOTAL_BOOKS = 'total_books'
+TOTAL_COPIES = 'total_copies'
+AVAILABLE_COPIES = 'available_copies'
+TOTAL_MEMBERS = 'total_members'
+ACTIVE_LOANS = 'active_loans'
+OVERDUE_LOANS = 'overdue_loans'
+
+# Prefixes of the per-day loan counters, suffixed with an ISO date
+LOANS_BORROWED = 'loans_borrowed:'
+LOANS_RETURNED = 'loans_returned:'
+
+# Session info key of the counter deltas waiting for the transaction to commit
+PENDING_DELTAS = 'stats_deltas'
+
+class StatsService:
+    """Service class for the incrementally maintained library statistics."""
+
+    @staticmethod
+    def increment(deltas):
+        """Add deltas to counters in the current transaction.
+
+        The deltas are collected on the session and written when the
+        caller commits, together with the change being counted: every
+        counter changed by the transaction is adjusted with a single upsert
+        statement. They are dropped if the transaction rolls back.
+        """
+        db.session.info.setdefault(PENDING_DELTAS, Counter()).update(deltas)
+
+    @staticmethod
+    def _write(session, deltas):
+        """Add deltas to the counters with one upsert statement."""
+        rows = [{'name': name, 'value': delta} for name, delta in deltas.items() if delta]
+        if not rows:
+            return
+
+        table = StatsCounter.__table__
+        dialect = session.get_bind().dialect.name
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            # No portable upsert: update, then create missing counters
+            for row in rows:
+                updated = session.execute(
+                    table.update()
+                    .where(table.c.name == row['name'])
+                    .values(value=table.c.value + row['value'])
+                ).rowcount
+                if not updated:
+                    session.execute(table.insert().values(**row))
+            return
+
+        stmt = insert(table).values(rows)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.name],
+            set_={'value': table.c.value + stmt.excluded.value}
+        ))
+
+    @staticmethod
+    def record_borrows(count, when=None):
+        """Count books borrowed in the current transaction.
+
+        Copies leaving and returning to the shelf are counted by CopyService.
+        """
+        day = (when or datetime.utcnow()).date().isoformat()
+        StatsService.increment({
+            ACTIVE_LOANS: count,
+            LOANS_BORROWED + day: count
+        })
+
+    @staticmethod
+    def record_returns(count, when=None, overdue=0):
+        """Count books returned in the current transaction.
+
+        overdue is how many of the returned loans had been marked overdue.
+        """
+        day = (when or datetime.utcnow()).date().isoformat()
+        StatsService.increment({
+            ACTIVE_LOANS: -count,
+            OVERDUE_LOANS: -overdue,
+            LOANS_RETURNED + day: count
+        })
+
+    @staticmethod
+    def get_stats(days=30):
+        """Get the library statistics, including loans per day for recent days."""
+        today = datetime.utcnow().date()
+        dates = [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+        names = [TOTAL_BOOKS, TOTAL_COPIES, AVAILABLE_COPIES, TOTAL_MEMBERS, ACTIVE_LOANS, OVERDUE_LOANS]
+        names += [LOANS_BORROWED + day for day in dates] + [LOANS_RETURNED + day for day in dates]
+
+        counters = dict(
+            db.session.query(StatsCounter.name, StatsCounter.value)
+            .filter(StatsCounter.name.in_(names))
+        )
+        total_copies = counters.get(TOTAL_COPIES, 0)
+        available_copies = counters.get(AVAILABLE_COPIES, 0)
+        return {
+            'total_books': counters.get(TOTAL_BOOKS, 0),
+            'total_copies': total_copies,
+            'available_copies': available_copies,
+            'unavailable_copies': total_copies - available_copies,
+            'total_members': counters.get(TOTAL_MEMBERS, 0),
+            'active_loans': counters.get(ACTIVE_LOANS, 0),
+            'overdue_loans': counters.get(OVERDUE_LOANS, 0),
+            'loans_per_day': [
+                {
+                    'date': day,
+                    'borrowed': counters.get(LOANS_BORROWED + day, 0),
+                    'returned': counters.get(LOANS_RETURNED + day, 0)
+                }
+                for day in dates
+            ]
+        }
+
+    @staticmethod
+    def reconcile(days=None):
+        """Recompute the counters from the source tables.
+
+        Corrects any drift. Active loans include overdue ones; loans count
+        as overdue once the overdue sweep has marked them. Per-day loan
+        counters are rebuilt for the last STATS_RECONCILE_DAYS days.
+        """
+        days = days or current_app.config['STATS_RECONCILE_DAYS']
+        now = datetime.utcnow()
+        since = datetime.combine(now.date() - timedelta(days=days - 1), datetime.min.time())
+
+        values = {
+            TOTAL_BOOKS: Book.query.count(),
+            TOTAL_COPIES: Copy.query.filter(Copy.status != 'withdrawn').count(),
+            AVAILABLE_COPIES: Copy.query.filter(Copy.status == 'available').count(),
+            TOTAL_MEMBERS: Member.query.count(),
+            ACTIVE_LOANS: Loan.query.filter(Loan.status.in_(OPEN_LOAN_STATUSES)).count(),
+            OVERDUE_LOANS: Loan.query.filter(Loan.status == 'overdue').count()
+        }
+        for offset in range(days):
+            day = (since.date() + timedelta(days=offset)).isoformat()
+            values[LOANS_BORROWED + day] = 0
+            values[LOANS_RETURNED + day] = 0
+        for prefix, column in [(LOANS_BORROWED, Loan.borrowed_at), (LOANS_RETURNED, Loan.returned_at)]:
+            per_day = (
+                db.session.query(func.date(column), func.count())
+                .filter(column >= since)
+                .group_by(func.date(column))
+            )
+            for day, count in per_day:
+                values[prefix + str(day)] = count
+
+        try:
+            table = StatsCounter.__table__
+            db.session.execute(table.delete().where(table.c.name.in_(list(values))))
+            db.session.execute(table.insert(), [
+                {'name': name, 'value': value} for name, value in values.items()
+            ])
+            db.session.commit()
+            return values, None
+        except Exception as e:
+            db.session.rollback()
+            return None, str(e)
+
+@event.listens_for(db.session, 'before_commit')
+def _write_pending_deltas(session):
+    deltas = session.info.pop(PENDING_DELTAS, None)
+    if deltas:
+        StatsService._write(session, deltas)
+
+@event.listens_for(db.session, 'after_transaction_end')
+def _drop_pending_deltas(session, transaction):
+    # Left over only when the transaction was rolled back or closed
+    if transaction.parent is None:
+        session.info.pop(PENDING_DELTAS, None)
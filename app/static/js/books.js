@@ -2,6 +2,7 @@
 
 let booksData = [];
 let filteredBooks = [];
+let nextBooksCursor = null;  // keyset cursor when listing, result offset when searching
 
 document.addEventListener('DOMContentLoaded', function() {
     loadBooks();
@@ -12,13 +13,13 @@ function initializeEventListeners() {
     // Search functionality
     const searchInput = document.getElementById('searchBooks');
     if (searchInput) {
-        searchInput.addEventListener('input', debounce(filterBooks, 300));
+        searchInput.addEventListener('input', debounce(() => loadBooks(), 300));
     }
     
     // Filter functionality
     const filterSelect = document.getElementById('filterAvailability');
     if (filterSelect) {
-        filterSelect.addEventListener('change', filterBooks);
+        filterSelect.addEventListener('change', () => loadBooks());
     }
     
     // Form submissions
@@ -33,12 +34,36 @@ function initializeEventListeners() {
     }
 }
 
+function getBookListParams() {
+    const params = {};
+    const searchTerm = document.getElementById('searchBooks').value.trim();
+    const availabilityFilter = document.getElementById('filterAvailability').value;
+    if (searchTerm) {
+        params.q = searchTerm;
+    }
+    if (availabilityFilter) {
+        params.available = availabilityFilter;
+    }
+    return params;
+}
+
+async function fetchBooksPage(params, next = null) {
+    // Searches are ranked and paginated by offset, plain listings by cursor
+    if (params.q) {
+        const page = await API.searchBooks(next === null ? params : { ...params, offset: next });
+        return { books: page.books, next: page.next_offset };
+    }
+    const page = await API.getBooks(next === null ? params : { ...params, cursor: next });
+    return { books: page.books, next: page.next_cursor };
+}
+
 async function loadBooks() {
     try {
         showLoadingState(document.getElementById('booksTableBody'));
-        booksData = await API.getBooks();
-        filteredBooks = [...booksData];
-        renderBooksTable();
+        const page = await fetchBooksPage(getBookListParams());
+        booksData = page.books;
+        nextBooksCursor = page.next;
+        filterBooks();
     } catch (error) {
         console.error('Error loading books:', error);
         showToast('Error loading books: ' + error.message, 'danger');
@@ -53,6 +78,33 @@ async function loadBooks() {
     }
 }
 
+async function loadMoreBooks() {
+    if (nextBooksCursor === null) return;
+    
+    try {
+        const page = await fetchBooksPage(getBookListParams(), nextBooksCursor);
+        booksData = booksData.concat(page.books);
+        nextBooksCursor = page.next;
+        filterBooks();
+    } catch (error) {
+        console.error('Error loading more books:', error);
+        showToast('Error loading more books: ' + error.message, 'danger');
+    }
+}
+
+function renderLoadMoreRow() {
+    if (nextBooksCursor === null) return '';
+    return `
+        <tr>
+            <td colspan="7" class="text-center">
+                <button type="button" class="btn btn-sm btn-outline-secondary" onclick="loadMoreBooks()">
+                    <i class="fas fa-chevron-down me-1"></i>Load more
+                </button>
+            </td>
+        </tr>
+    `;
+}
+
 function renderBooksTable() {
     const tbody = document.getElementById('booksTableBody');
     
@@ -64,7 +116,8 @@ function renderBooksTable() {
                     <br>No books found
                 </td>
             </tr>
-        `;
+        ` + renderLoadMoreRow();
+        showLoadingState(tbody, false);
         return;
     }
     
@@ -79,7 +132,7 @@ function renderBooksTable() {
             <td>
                 <span class="badge ${book.available ? 'bg-success' : 'bg-warning'}">
                     <i class="fas ${book.available ? 'fa-check-circle' : 'fa-clock'} me-1"></i>
-                    ${book.available ? 'Available' : 'Borrowed'}
+                    ${book.available ? `${book.available_count} of ${book.copy_count} available` : 'Borrowed'}
                 </span>
             </td>
             <td>${formatDate(book.created_at)}</td>
@@ -94,35 +147,21 @@ function renderBooksTable() {
                 </div>
             </td>
         </tr>
-    `).join('');
+    `).join('') + renderLoadMoreRow();
     
     showLoadingState(tbody, false);
 }
 
 function filterBooks() {
-    const searchTerm = document.getElementById('searchBooks').value.toLowerCase();
-    const availabilityFilter = document.getElementById('filterAvailability').value;
-    
-    filteredBooks = booksData.filter(book => {
-        const matchesSearch = !searchTerm || 
-            book.title.toLowerCase().includes(searchTerm) ||
-            book.author.toLowerCase().includes(searchTerm) ||
-            (book.isbn && book.isbn.toLowerCase().includes(searchTerm));
-        
-        const matchesAvailability = !availabilityFilter || 
-            book.available.toString() === availabilityFilter;
-        
-        return matchesSearch && matchesAvailability;
-    });
-    
+    // Search and availability filters are applied server-side
+    filteredBooks = [...booksData];
     renderBooksTable();
 }
 
 function clearFilters() {
     document.getElementById('searchBooks').value = '';
     document.getElementById('filterAvailability').value = '';
-    filteredBooks = [...booksData];
-    renderBooksTable();
+    loadBooks();
 }
 
 async function handleAddBook(event) {
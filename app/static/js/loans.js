@@ -2,6 +2,8 @@
 
 let availableBooks = [];
 let allMembers = [];
+let activeLoans = [];
+let nextLoansCursor = null;
 
 document.addEventListener('DOMContentLoaded', function() {
     loadLoansPageData();
@@ -23,9 +25,9 @@ function initializeLoansEventListeners() {
 
 async function loadLoansPageData() {
     try {
-        // Load all books and filter available ones
-        const allBooks = await API.getBooks();
-        availableBooks = allBooks.filter(book => book.available);
+        // Load available books
+        const page = await API.getBooks({ available: true });
+        availableBooks = page.books;
         
         // Load all members
         allMembers = await API.getMembers();
@@ -158,8 +160,11 @@ async function handleNewLoan(event) {
         showLoadingState(form);
         const loan = await API.createLoan(loanData);
         
-        // Remove the book from available books
-        availableBooks = availableBooks.filter(book => book.id !== loanData.book_id);
+        // Take the copy off the shelf, removing the book once none are left
+        availableBooks.forEach(book => {
+            if (book.id === loanData.book_id) book.available_count -= 1;
+        });
+        availableBooks = availableBooks.filter(book => book.available_count > 0);
         
         // Re-render the page
         renderAvailableBooks();
@@ -226,11 +231,19 @@ async function handleReturnBook(event) {
     }
 }
 
+function fetchActiveLoansPage(cursor = null) {
+    // Books and members come embedded, so the list needs no follow-up requests
+    const params = { status: 'active,overdue', expand: 'book,member' };
+    if (cursor !== null) params.cursor = cursor;
+    return API.getLoans(params);
+}
+
 async function loadCurrentLoans() {
     try {
-        const loans = await API.getLoans();
-        const activeLoans = loans.filter(loan => loan.status === 'active');
-        renderCurrentLoans(activeLoans);
+        const page = await fetchActiveLoansPage();
+        activeLoans = page.loans;
+        nextLoansCursor = page.next_cursor;
+        renderCurrentLoans();
     } catch (error) {
         console.error('Error loading current loans:', error);
         const currentLoansSection = document.getElementById('currentLoansSection');
@@ -243,7 +256,32 @@ async function loadCurrentLoans() {
     }
 }
 
-function renderCurrentLoans(activeLoans) {
+async function loadMoreLoans() {
+    if (nextLoansCursor === null) return;
+    
+    try {
+        const page = await fetchActiveLoansPage(nextLoansCursor);
+        activeLoans = activeLoans.concat(page.loans);
+        nextLoansCursor = page.next_cursor;
+        renderCurrentLoans();
+    } catch (error) {
+        console.error('Error loading more loans:', error);
+        showToast('Error loading more loans: ' + error.message, 'danger');
+    }
+}
+
+function renderLoadMoreLoans() {
+    if (nextLoansCursor === null) return '';
+    return `
+        <div class="text-center">
+            <button type="button" class="btn btn-sm btn-outline-secondary" onclick="loadMoreLoans()">
+                <i class="fas fa-chevron-down me-1"></i>Load more
+            </button>
+        </div>
+    `;
+}
+
+function renderCurrentLoans() {
     const currentLoansSection = document.getElementById('currentLoansSection');
     
     if (activeLoans.length === 0) {
@@ -257,11 +295,8 @@ function renderCurrentLoans(activeLoans) {
     }
     
     const loansHtml = activeLoans.map(loan => {
-        // Find book and member details
-        const allBooks = [...availableBooks]; // Available books
-        // We need to get borrowed books too, so let's use a different approach
-        const book = { id: loan.book_id, title: 'Loading...', author: 'Loading...' };
-        const member = allMembers.find(m => m.id === loan.member_id) || { name: 'Unknown Member' };
+        const book = loan.book || { title: 'Unknown Book', author: 'Unknown Author' };
+        const member = loan.member || { name: 'Unknown Member' };
         
         return `
             <div class="card mb-3">
@@ -270,12 +305,12 @@ function renderCurrentLoans(activeLoans) {
                         <div class="col-md-8">
                             <h6 class="card-title mb-1">
                                 <i class="fas fa-book text-primary me-2"></i>
-                                <span id="book-title-${loan.book_id}">${escapeHtml(book.title)}</span>
+                                ${escapeHtml(book.title)}
                             </h6>
                             <p class="card-text mb-1">
                                 <small class="text-muted">
                                     <i class="fas fa-user me-1"></i>
-                                    Author: <span id="book-author-${loan.book_id}">${escapeHtml(book.author)}</span>
+                                    Author: ${escapeHtml(book.author)}
                                 </small>
                             </p>
                             <p class="card-text mb-1">
@@ -284,21 +319,31 @@ function renderCurrentLoans(activeLoans) {
                                     Borrowed by: ${escapeHtml(member.name)}
                                 </small>
                             </p>
-                            <p class="card-text mb-0">
+                            <p class="card-text mb-1">
                                 <small class="text-muted">
                                     <i class="fas fa-calendar me-1"></i>
                                     Borrowed on: ${formatDateTime(loan.borrowed_at)}
                                 </small>
                             </p>
+                            <p class="card-text mb-0">
+                                <small class="${loan.status === 'overdue' ? 'text-danger' : 'text-muted'}">
+                                    <i class="fas fa-calendar-check me-1"></i>
+                                    Due: ${formatDateTime(loan.due_at)}${loan.fine_cents ? ` &middot; Fine: ${formatFine(loan.fine_cents)}` : ''}
+                                </small>
+                            </p>
                         </div>
                         <div class="col-md-4 text-end">
                             <button type="button" class="btn btn-success btn-sm" onclick="quickReturnBook(${loan.id})" title="Return Book">
                                 <i class="fas fa-undo me-1"></i>Return
                             </button>
                             <br>
+                            ${loan.status === 'overdue' ? `
+                            <span class="badge bg-danger mt-2">
+                                <i class="fas fa-exclamation-circle me-1"></i>Overdue
+                            </span>` : `
                             <span class="badge bg-warning mt-2">
                                 <i class="fas fa-clock me-1"></i>Active
-                            </span>
+                            </span>`}
                         </div>
                     </div>
                 </div>
@@ -306,20 +351,7 @@ function renderCurrentLoans(activeLoans) {
         `;
     }).join('');
     
-    currentLoansSection.innerHTML = loansHtml;
-    
-    // Load book details for each loan
-    activeLoans.forEach(async (loan) => {
-        try {
-            const book = await API.getBook(loan.book_id);
-            const titleElement = document.getElementById(`book-title-${loan.book_id}`);
-            const authorElement = document.getElementById(`book-author-${loan.book_id}`);
-            if (titleElement) titleElement.textContent = book.title;
-            if (authorElement) authorElement.textContent = book.author;
-        } catch (error) {
-            console.error(`Error loading book ${loan.book_id}:`, error);
-        }
-    });
+    currentLoansSection.innerHTML = loansHtml + renderLoadMoreLoans();
 }
 
 function quickReturnBook(loanId) {
@@ -347,6 +379,7 @@ function showLoanDetails(loan) {
             <p><strong>Book:</strong> ${escapeHtml(book.title)} by ${escapeHtml(book.author)}</p>
             <p><strong>Member:</strong> ${escapeHtml(member.name)}</p>
             <p><strong>Borrowed At:</strong> ${formatDateTime(loan.borrowed_at)}</p>
+            <p><strong>Due:</strong> ${formatDateTime(loan.due_at)}</p>
             <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
         </div>
     `;
@@ -370,6 +403,7 @@ function showReturnDetails(returnResult) {
             <p><strong>Member:</strong> ${escapeHtml(member.name)}</p>
             <p><strong>Borrowed At:</strong> ${formatDateTime(returnResult.borrowed_at)}</p>
             <p><strong>Returned At:</strong> ${formatDateTime(returnResult.returned_at)}</p>
+            ${returnResult.fine_cents ? `<p><strong>Fine:</strong> ${formatFine(returnResult.fine_cents)}</p>` : ''}
             <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
         </div>
     `;
@@ -378,6 +412,10 @@ function showReturnDetails(returnResult) {
     currentLoansSection.innerHTML = details + currentLoansSection.innerHTML;
 }
 
+function formatFine(cents) {
+    return (cents / 100).toFixed(2);
+}
+
 function escapeHtml(text) {
     if (!text) return '';
     const map = {
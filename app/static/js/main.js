@@ -117,8 +117,14 @@ async function apiRequest(endpoint, options = {}) {
 // Common API functions
 const API = {
     // Books
-    async getBooks() {
-        return await apiRequest('/books');
+    async getBooks(params = {}) {
+        const query = new URLSearchParams(params).toString();
+        return await apiRequest(query ? `/books?${query}` : '/books');
+    },
+    
+    async searchBooks(params) {
+        const query = new URLSearchParams(params).toString();
+        return await apiRequest(`/books/search?${query}`);
     },
     
     async getBook(id) {
@@ -169,8 +175,9 @@ const API = {
     },
     
     // Loans
-    async getLoans() {
-        return await apiRequest('/loans');
+    async getLoans(params = {}) {
+        const query = new URLSearchParams(params).toString();
+        return await apiRequest(query ? `/loans?${query}` : '/loans');
     },
     
     async createLoan(loanData) {
@@ -0,0 +1,213 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+
+class CacheBackend:
+    """Interface of cache backends.
+
+    Values must be JSON-serializable so they can be shared between
+    processes by out-of-process backends.
+    """
+
+    def get(self, key):
+        """Get a value, or None if the key is missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key, value):
+        """Store a value."""
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        """Remove keys if present."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every key."""
+        raise NotImplementedError
+
+    def stats(self):
+        """Get the hit, miss and eviction counters."""
+        raise NotImplementedError
+
+class NullCache(CacheBackend):
+    """Backend that stores nothing, for disabling the cache."""
+
+    def __init__(self):
+        self.misses = 0
+
+    def get(self, key):
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {'backend': 'null', 'hits': 0, 'misses': self.misses, 'evictions': 0, 'size': 0}
+
+class LRUCache(CacheBackend):
+    """In-process cache bounded by size, evicting the least recently used key.
+
+    Entries also expire ttl seconds after being stored. Invalidations only
+    reach the current process, so with several workers stale reads are
+    bounded by the TTL.
+    """
+
+    def __init__(self, max_size=1024, ttl=300, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {'backend': 'lru', 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'size': len(self._entries)}
+
+class RedisCache(CacheBackend):
+    """Cache stored in Redis, or any client with the same get/set/delete API.
+
+    Entries expire after ttl seconds and size is bounded by the server's
+    maxmemory policy, so evictions are read from the server's statistics.
+    """
+
+    def __init__(self, client, ttl=300, prefix='library:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self):
+        return {'backend': 'redis', 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.client.info('stats').get('evicted_keys', 0),
+                'size': None}
+
+class Cache:
+    """Flask extension giving access to the configured cache backend.
+
+    CACHE_TYPE selects the backend: 'lru' (default), 'redis' (needs the
+    redis package and CACHE_REDIS_URL) or 'null'.
+    """
+
+    def __init__(self, app=None):
+        self._backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, backend=None):
+        """Create the backend for an app, or use the given one."""
+        if backend is None:
+            backend = self._create_backend(app.config)
+        app.extensions['cache'] = backend
+        self._backend = backend
+
+    @staticmethod
+    def _create_backend(config):
+        cache_type = config.get('CACHE_TYPE', 'lru')
+        ttl = config.get('CACHE_TTL', 300)
+        if cache_type == 'null':
+            return NullCache()
+        if cache_type == 'lru':
+            return LRUCache(max_size=config.get('CACHE_MAX_SIZE', 1024), ttl=ttl)
+        if cache_type == 'redis':
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("CACHE_TYPE 'redis' requires the redis package")
+            return RedisCache(redis.Redis.from_url(config['CACHE_REDIS_URL']), ttl=ttl)
+        raise ValueError(f'Unknown CACHE_TYPE: {cache_type}')
+
+    @property
+    def backend(self):
+        if has_app_context() and 'cache' in current_app.extensions:
+            return current_app.extensions['cache']
+        return self._backend
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+    def delete(self, *keys):
+        self.backend.delete(*keys)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return self.backend.stats()
+
+    def get_or_set(self, key, loader):
+        """Read through the cache: return the cached value, or load and store it.
+
+        Values loaded as None (e.g. missing rows) are not cached.
+        """
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            if value is not None:
+                self.set(key, value)
+        return value
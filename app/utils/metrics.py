@@ -0,0 +1,201 @@
+import logging
+import threading
+import time
+from collections import Counter
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Bucket upper bounds of the per-request histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """Prometheus histogram with a series per combination of label values."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, label_values, value):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, total, count) in sorted(self._series.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _labels(self.label_names, label_values, f'le="{_number(bound)}"')
+                lines.append(f'{self.name}_bucket{labels} {bucket_count}')
+            labels = _labels(self.label_names, label_values, 'le="+Inf"')
+            lines.append(f'{self.name}_bucket{labels} {count}')
+            labels = _labels(self.label_names, label_values)
+            lines.append(f'{self.name}_sum{labels} {_number(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+class CounterMetric:
+    """Prometheus counter with a series per combination of label values."""
+
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._series = Counter()
+
+    def inc(self, label_values, amount=1):
+        self._series[label_values] += amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        for label_values, value in sorted(self._series.items()):
+            lines.append(f'{self.name}{_labels(self.label_names, label_values)} {_number(value)}')
+        return lines
+
+class MetricsRegistry:
+    """The request metrics of one application process."""
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS):
+        self._lock = threading.Lock()
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Time to handle a request.',
+            ('method', 'route', 'status'), latency_buckets)
+        self.db_queries = Histogram(
+            'http_request_db_queries', 'SQL statements executed per request.',
+            ('method', 'route'), QUERY_COUNT_BUCKETS)
+        self.db_duration = Histogram(
+            'http_request_db_duration_seconds', 'Time spent executing SQL statements per request.',
+            ('method', 'route'), latency_buckets)
+        self.query_threshold_exceeded = CounterMetric(
+            'http_request_db_query_threshold_exceeded_total',
+            'Requests that executed more SQL statements than N_PLUS_ONE_QUERY_THRESHOLD.',
+            ('method', 'route'))
+
+    def record(self, method, route, status, duration, queries, db_duration, exceeded):
+        with self._lock:
+            self.request_duration.observe((method, route, str(status)), duration)
+            self.db_queries.observe((method, route), queries)
+            self.db_duration.observe((method, route), db_duration)
+            if exceeded:
+                self.query_threshold_exceeded.inc((method, route))
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            lines = []
+            for metric in (self.request_duration, self.db_queries, self.db_duration,
+                           self.query_threshold_exceeded):
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+class RequestMetrics:
+    """The time and SQL statements of the request being handled."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_duration = 0.0
+        self.statements = Counter()
+
+    def add_query(self, statement, duration):
+        self.queries += 1
+        self.db_duration += duration
+        self.statements[statement] += 1
+
+class Metrics:
+    """Flask extension recording per-route latency and SQL statement metrics.
+
+    Every request's latency, SQL statement count and SQL time are recorded
+    in histograms by route, exposed at /metrics in the Prometheus text
+    format, and returned to the client in a Server-Timing header. Requests
+    executing more statements than N_PLUS_ONE_QUERY_THRESHOLD are logged
+    with their most repeated statement, the usual sign of a query per row.
+
+    Metrics are kept per process; Prometheus sums them over workers. Time
+    spent streaming a response body after its headers is not included.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        app.extensions['metrics'] = MetricsRegistry()
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule('/metrics', 'metrics', self._metrics_view)
+
+    @staticmethod
+    def instrument(engine):
+        """Count and time the statements an engine executes during requests."""
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context.metrics_start = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if has_request_context():
+                request_metrics = g.get('request_metrics')
+                if request_metrics is not None:
+                    request_metrics.add_query(statement, time.perf_counter() - context.metrics_start)
+
+    @staticmethod
+    def _start_request():
+        g.request_metrics = RequestMetrics()
+
+    @staticmethod
+    def _finish_request(response):
+        request_metrics = g.pop('request_metrics', None)
+        if request_metrics is None:
+            return response
+
+        duration = time.perf_counter() - request_metrics.start
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        threshold = current_app.config.get('N_PLUS_ONE_QUERY_THRESHOLD', 0)
+        exceeded = bool(threshold) and request_metrics.queries > threshold
+        if exceeded:
+            statement, repeats = request_metrics.statements.most_common(1)[0]
+            logger.warning('%s %s executed %d SQL statements (threshold %d); most repeated, %d times: %s',
+                           request.method, request.path, request_metrics.queries, threshold,
+                           repeats, ' '.join(statement.split()))
+
+        current_app.extensions['metrics'].record(
+            request.method, route, response.status_code, duration,
+            request_metrics.queries, request_metrics.db_duration, exceeded)
+
+        if current_app.config.get('SERVER_TIMING_ENABLED', True):
+            response.headers['Server-Timing'] = (
+                f'db;dur={request_metrics.db_duration * 1000:.2f};desc="{request_metrics.queries} queries", '
+                f'app;dur={duration * 1000:.2f}'
+            )
+        return response
+
+    @staticmethod
+    def _metrics_view():
+        return Response(current_app.extensions['metrics'].render(),
+                        mimetype='text/plain; version=0.0.4; charset=utf-8')
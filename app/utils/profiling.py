@@ -0,0 +1,135 @@
+import cProfile
+import io
+import logging
+import pstats
+import time
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from werkzeug.datastructures import ImmutableMultiDict
+
+logger = logging.getLogger(__name__)
+
+# Statements the database can explain without running them
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')
+
+def _query_plan(dbapi_connection, dialect, statement, parameters):
+    """Get the database's plan for a statement as lines of text."""
+    cursor = dbapi_connection.cursor()
+    try:
+        if dialect == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+            # Rows are (id, parent, notused, detail); indent children under parents
+            depths = {0: -1}
+            lines = []
+            for node_id, parent, _, detail in cursor.fetchall():
+                depths[node_id] = depths.get(parent, -1) + 1
+                lines.append('  ' * depths[node_id] + detail)
+            return lines
+        cursor.execute('EXPLAIN ' + statement, parameters)
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+def log_slow_queries(engine, threshold_ms, explain=True):
+    """Log statements on an engine taking at least threshold_ms milliseconds.
+
+    Each entry has the statement, its parameters, its duration, the
+    request it ran for and, if explain is set, the database's query plan.
+    Only slow statements are explained, on the connection that ran them.
+    Connections with the log_slow_queries=False execution option, such as
+    bulk loads, are not logged.
+    """
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context.slow_query_start = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - context.slow_query_start) * 1000
+        if duration_ms < threshold_ms or not context.execution_options.get('log_slow_queries', True):
+            return
+
+        origin = f'{request.method} {request.path}' if has_request_context() else 'outside a request'
+        plan = ''
+        if explain and not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+            try:
+                plan = '\nQuery plan:\n' + '\n'.join(
+                    _query_plan(conn.connection.dbapi_connection, engine.dialect.name, statement, parameters))
+            except Exception as e:
+                plan = f'\nQuery plan unavailable: {e}'
+        params = repr(parameters)
+        if len(params) > 1000:
+            params = params[:1000] + '...'
+        logger.warning('Slow query (%.1f ms) in %s:\n%s\nParameters: %s%s',
+                       duration_ms, origin, statement, params, plan)
+
+class Profiler:
+    """Flask extension profiling single requests on demand.
+
+    With PROFILER_ENABLED set, a request with ?__profile=1 is run under
+    the profiler named by PROFILER_BACKEND ('cprofile' or 'pyinstrument')
+    and answered with the profile as text instead of its response. Other
+    requests are not profiled, and with the flag unset no hooks are
+    registered at all. Never enable it on a public deployment.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('PROFILER_ENABLED', False):
+            return
+        backend = app.config.get('PROFILER_BACKEND', 'cprofile')
+        if backend == 'pyinstrument':
+            try:
+                import pyinstrument  # noqa: F401
+            except ImportError:
+                raise RuntimeError("PROFILER_BACKEND 'pyinstrument' requires the pyinstrument package")
+        elif backend != 'cprofile':
+            raise ValueError(f'Unknown PROFILER_BACKEND: {backend}')
+        app.before_request(self._start_profile)
+        app.after_request(self._finish_profile)
+
+    @staticmethod
+    def _start_profile():
+        if request.args.get('__profile') != '1':
+            return
+        # Hide the flag from the endpoint's query parameter validation
+        request.args = ImmutableMultiDict(
+            [(key, value) for key, value in request.args.items(multi=True) if key != '__profile'])
+
+        if current_app.config.get('PROFILER_BACKEND', 'cprofile') == 'pyinstrument':
+            from pyinstrument import Profiler as InstrumentProfiler
+            profiler = InstrumentProfiler()
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler per process
+                return {'message': 'Another request is being profiled'}, 409
+        g.profiler = profiler
+        g.profile_start = time.perf_counter()
+
+    @staticmethod
+    def _finish_profile(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+
+        duration_ms = (time.perf_counter() - g.pop('profile_start')) * 1000
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            output = io.StringIO()
+            stats = pstats.Stats(profiler, stream=output)
+            stats.sort_stats('cumulative').print_stats(current_app.config.get('PROFILER_TOP', 40))
+            report = output.getvalue()
+        else:
+            profiler.stop()
+            report = profiler.output_text()
+
+        header = f'{request.method} {request.path} -> {response.status} in {duration_ms:.1f} ms\n\n'
+        return Response(header + report, mimetype='text/plain')
@@ -0,0 +1,30 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+def start_periodic_job(app, name, interval, func):
+    """Run func every interval seconds in a daemon thread inside an app context.
+    
+    func returns a (result, error) tuple, as the service methods do.
+    Errors, returned or raised, are logged and do not stop the job.
+    Returns the stop event.
+    """
+    stop = threading.Event()
+    
+    def run():
+        while not stop.wait(interval):
+            with app.app_context():
+                try:
+                    result, error = func()
+                except Exception:
+                    logger.exception('Periodic job %s failed', name)
+                    continue
+                if error:
+                    logger.error('Periodic job %s failed: %s', name, error)
+                else:
+                    logger.info('Periodic job %s: %s', name, result)
+    
+    thread = threading.Thread(target=run, name=f'periodic-{name}', daemon=True)
+    thread.start()
+    return stop
@@ -0,0 +1,85 @@
+from sqlalchemy import Integer, event, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+class whole_days_between(FunctionElement):
+    """Number of whole days from start to end, as a SQL expression.
+
+    Compiled per dialect so date arithmetic runs in the database.
+    """
+    type = Integer()
+    inherit_cache = True
+    name = 'whole_days_between'
+
+@compiles(whole_days_between)
+def _compile_whole_days_between(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return 'CAST(FLOOR(EXTRACT(EPOCH FROM ({} - {})) / 86400) AS INTEGER)'.format(
+        compiler.process(end, **kw), compiler.process(start, **kw)
+    )
+
+@compiles(whole_days_between, 'sqlite')
+def _compile_whole_days_between_sqlite(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return 'CAST(julianday({}) - julianday({}) AS INTEGER)'.format(
+        compiler.process(end, **kw), compiler.process(start, **kw)
+    )
+
+def update_matching(session, model, ids, criteria, values):
+    """Conditionally update rows by ID and return the IDs that changed.
+
+    Uses a single UPDATE ... RETURNING where the database supports it
+    and one conditional UPDATE per row otherwise.
+    """
+    if not ids:
+        return set()
+
+    if getattr(session.get_bind().dialect, 'update_returning', False):
+        result = session.execute(
+            update(model)
+            .where(model.id.in_(ids), *criteria)
+            .values(**values)
+            .returning(model.id)
+            .execution_options(synchronize_session=False)
+        )
+        return {row[0] for row in result}
+
+    changed = set()
+    for row_id in ids:
+        result = session.execute(
+            update(model)
+            .where(model.id == row_id, *criteria)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            changed.add(row_id)
+    return changed
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run PRAGMA statements on every new connection of a SQLite engine.
+
+    Does nothing for other databases.
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+
+def split_page(rows, limit):
+    """Split the limit + 1 rows fetched for a keyset page.
+
+    Returns the rows on the page and the cursor for the next one, the id
+    in the last column of the page's last row, or None on the last page.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1][-1]
+    return rows, None
@@ -0,0 +1,110 @@
+import codecs
+import csv
+import json
+import zlib
+from app.utils.serialization import dumps
+
+READ_SIZE = 64 * 1024
+
+class StreamFormatError(ValueError):
+    """Raised when a streamed request body cannot be parsed."""
+    pass
+
+def iter_json_array(stream):
+    """Yield the items of a JSON array read incrementally from a binary stream."""
+    decoder = json.JSONDecoder()
+    reader = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    started = False
+    eof = False
+
+    while True:
+        # Skip whitespace and separators between items
+        pos = 0
+        while pos < len(buffer) and (buffer[pos].isspace() or (started and buffer[pos] == ',')):
+            pos += 1
+        buffer = buffer[pos:]
+
+        if buffer and not started:
+            if buffer[0] != '[':
+                raise StreamFormatError('Expected a JSON array')
+            started = True
+            buffer = buffer[1:]
+            continue
+
+        if buffer.startswith(']'):
+            return
+
+        if buffer:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                # The item may continue in the next chunk
+                item = end = None
+            if end is not None and (end < len(buffer) or eof):
+                yield item
+                buffer = buffer[end:]
+                continue
+
+        if eof:
+            raise StreamFormatError('Unexpected end of JSON array')
+
+        chunk = stream.read(READ_SIZE)
+        eof = not chunk
+        buffer += reader.decode(chunk, final=eof)
+
+def iter_lines(stream):
+    """Yield decoded text lines, newline included, from a binary stream.
+    
+    The stream is read in large blocks, which is much cheaper than reading
+    request bodies line by line.
+    """
+    reader = codecs.getincrementaldecoder('utf-8')()
+    pending = ''
+    while True:
+        chunk = stream.read(READ_SIZE)
+        lines = (pending + reader.decode(chunk, final=not chunk)).split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+        if not chunk:
+            break
+    if pending:
+        yield pending
+
+def iter_ndjson(stream):
+    """Yield one parsed object per non-empty line of an NDJSON stream.
+
+    Lines that are not valid JSON are yielded as StreamFormatError instances
+    so callers can report them per row and carry on.
+    """
+    for line in iter_lines(stream):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield StreamFormatError('Invalid JSON')
+
+def iter_csv(stream):
+    """Yield one dict per CSV record, keyed by the header row.
+
+    Empty cells are left out so optional fields are treated as missing.
+    """
+    for record in csv.DictReader(iter_lines(stream)):
+        yield {key: value for key, value in record.items() if key and value not in ('', None)}
+
+def to_ndjson(items):
+    """Serialize an iterable of dicts as NDJSON lines."""
+    for item in items:
+        yield dumps(item) + '\n'
+
+def gzip_chunks(chunks, level=6):
+    """Compress an iterable of text chunks into a gzip byte stream."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
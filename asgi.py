@@ -0,0 +1,10 @@
+"""Async read-only API entry point.
+
+Serve the book, member and loan GET endpoints with an ASGI server
+alongside the WSGI application (see app/asgi.py):
+    uvicorn asgi:app --workers 2
+"""
+import os
+from app.asgi import create_asgi_app
+
+app = create_asgi_app(os.getenv('FLASK_ENV', 'production'))
@@ -0,0 +1,140 @@
+"""Async vs sync read path benchmark.
+
+Serves the same mix of book, member and loan GET requests through the
+Flask application, one thread per concurrent client as under a threaded
+WSGI server, and through the async read API, one event loop for all
+clients, at increasing concurrency. Both run in-process against the same
+SQLite file, so the comparison excludes the HTTP server. Needs aiosqlite.
+
+Usage:
+    python benchmarks/bench_async_reads.py
+    python benchmarks/bench_async_reads.py --concurrency 1,16,64,256 --requests 5000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+BOOKS = 5000
+MEMBERS = 200
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', default='1,16,64,256',
+                        help='Comma-separated numbers of concurrent clients')
+    parser.add_argument('--requests', type=int, default=3000,
+                        help='Requests issued at each concurrency')
+    return parser.parse_args()
+
+def request_mix(count):
+    """The same sequence of (path, query) requests for both paths."""
+    rng = random.Random(42)
+    requests = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.5:
+            requests.append(('/api/v1/books', f'limit=20&cursor={rng.randrange(BOOKS)}'))
+        elif roll < 0.8:
+            requests.append((f'/api/v1/books/{rng.randrange(1, BOOKS + 1)}', ''))
+        elif roll < 0.9:
+            requests.append((f'/api/v1/members/{rng.randrange(1, MEMBERS + 1)}', ''))
+        else:
+            requests.append(('/api/v1/loans', f'limit=20&expand=book&member_id={rng.randrange(1, MEMBERS + 1)}'))
+    return requests
+
+def seed(app, db):
+    from app.services.book_service import BookService
+    from app.services.loan_service import LoanService
+    from app.models import Member
+
+    with app.app_context():
+        db.create_all()
+        BookService.create_books([{'title': f'Book {i}', 'author': f'Author {i % 300}', 'copies': 2}
+                                  for i in range(BOOKS)])
+        db.session.execute(Member.__table__.insert(), [
+            {'name': f'Member {i}', 'email': f'member{i}@example.com'} for i in range(MEMBERS)
+        ])
+        db.session.commit()
+        rng = random.Random(7)
+        for _ in range(2000):
+            LoanService.borrow_book({'book_id': rng.randrange(1, BOOKS + 1),
+                                     'member_id': rng.randrange(1, MEMBERS + 1)})
+
+def summarize(timings, elapsed):
+    timings.sort()
+    return {
+        'rps': len(timings) / elapsed,
+        'p50': statistics.median(timings),
+        'p95': timings[int(len(timings) * 0.95) - 1]
+    }
+
+def run_sync(app, requests, concurrency):
+    """Serve the requests through Flask with a thread per concurrent client."""
+    def handle(item):
+        path, query = item
+        start = time.perf_counter()
+        response = app.test_client().get(f'{path}?{query}')
+        if response.status_code != 200:
+            raise RuntimeError(f'{path}?{query}: {response.status_code}')
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        timings = list(pool.map(handle, requests))
+    return summarize(timings, time.perf_counter() - start)
+
+async def run_async(asgi_app, requests, concurrency):
+    """Serve the requests through the async API with at most concurrency in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def handle(item):
+        path, query = item
+        statuses = []
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        async with semaphore:
+            start = time.perf_counter()
+            await asgi_app({'type': 'http', 'method': 'GET', 'path': path,
+                            'query_string': query.encode(), 'headers': []}, receive, send)
+            if statuses != [200]:
+                raise RuntimeError(f'{path}?{query}: {statuses}')
+            return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    timings = await asyncio.gather(*(handle(item) for item in requests))
+    return summarize(list(timings), time.perf_counter() - start)
+
+def main():
+    args = parse_args()
+    levels = [int(level) for level in args.concurrency.split(',')]
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    from app import create_app, db
+    from app.asgi import create_asgi_app
+
+    app = create_app('production')
+    seed(app, db)
+    asgi_app = create_asgi_app('production')
+    requests = request_mix(args.requests)
+
+    print(f"{'clients':>8} {'path':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for concurrency in levels:
+        for name, result in [('sync', run_sync(app, requests, concurrency)),
+                             ('async', asyncio.run(run_async(asgi_app, requests, concurrency)))]:
+            print(f"{concurrency:>8} {name:>6} {result['rps']:>9.1f} {result['p50']:>8.2f} {result['p95']:>8.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Borrow latency benchmark.
+
+Measures LoanService.borrow_book latency while the loans table grows,
+to check that the loan lookup indexes keep checkout time flat.
+
+Usage:
+    python benchmarks/bench_borrow.py
+    python benchmarks/bench_borrow.py --sizes 10000,100000,1000000,10000000
+    python benchmarks/bench_borrow.py --drop-indexes   # compare without indexes
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+BOOKS = 10000
+MEMBERS = 1000
+CHUNK_SIZE = 50000
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000',
+                        help='Comma-separated loans table sizes to measure at')
+    parser.add_argument('--borrows', type=int, default=200,
+                        help='Number of borrows timed at each size')
+    parser.add_argument('--drop-indexes', action='store_true',
+                        help='Drop the loan lookup indexes before measuring')
+    return parser.parse_args()
+
+def seed_loans(db, Loan, start, stop):
+    """Insert returned loans with ids in [start, stop) spread over all books.
+
+    Each book has a single copy, whose ID is the book's.
+    """
+    rng = random.Random(start)
+    base = datetime(2020, 1, 1)
+    table = Loan.__table__
+    for chunk_start in range(start, stop, CHUNK_SIZE):
+        rows = []
+        for _ in range(chunk_start, min(chunk_start + CHUNK_SIZE, stop)):
+            borrowed_at = base + timedelta(minutes=rng.randrange(2000000))
+            book_id = rng.randrange(1, BOOKS + 1)
+            rows.append({
+                'book_id': book_id,
+                'copy_id': book_id,
+                'member_id': rng.randrange(1, MEMBERS + 1),
+                'borrowed_at': borrowed_at,
+                'due_at': borrowed_at + timedelta(days=14),
+                'returned_at': borrowed_at + timedelta(days=14),
+                'status': 'returned',
+                'updated_at': borrowed_at + timedelta(days=14)
+            })
+        db.session.execute(table.insert(), rows)
+        db.session.commit()
+
+def measure(LoanService, borrows):
+    """Time borrow_book over distinct books, returning them afterwards."""
+    rng = random.Random(42)
+    book_ids = rng.sample(range(1, BOOKS + 1), borrows)
+    timings = []
+    loan_ids = []
+    for book_id in book_ids:
+        member_id = rng.randrange(1, MEMBERS + 1)
+        start = time.perf_counter()
+        loan, error = LoanService.borrow_book({'book_id': book_id, 'member_id': member_id})
+        timings.append((time.perf_counter() - start) * 1000)
+        if error:
+            raise RuntimeError(error)
+        loan_ids.append(loan.id)
+    for loan_id in loan_ids:
+        LoanService.return_book(loan_id)
+    timings.sort()
+    return {
+        'p50': statistics.median(timings),
+        'p95': timings[int(len(timings) * 0.95) - 1],
+        'mean': statistics.mean(timings)
+    }
+
+def main():
+    args = parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+
+    from app import create_app, db
+    from app.models import Book, Copy, Member, Loan
+    from app.services.loan_service import LoanService
+    from sqlalchemy import text
+
+    app = create_app('production')
+    with app.app_context():
+        db.create_all()
+        if args.drop_indexes:
+            db.session.execute(text('DROP INDEX IF EXISTS ix_loans_book_id_status'))
+            db.session.execute(text('DROP INDEX IF EXISTS ix_loans_member_id_status'))
+        db.session.execute(Book.__table__.insert(), [
+            {'title': f'Book {i}', 'author': f'Author {i % 500}', 'isbn': f'bench-{i}',
+             'available': True, 'available_count': 1, 'copy_count': 1}
+            for i in range(BOOKS)
+        ])
+        db.session.execute(Copy.__table__.insert(), [
+            {'id': book_id, 'book_id': book_id, 'status': 'available'}
+            for book_id in range(1, BOOKS + 1)
+        ])
+        db.session.execute(Member.__table__.insert(), [
+            {'name': f'Member {i}', 'email': f'member{i}@example.com'}
+            for i in range(MEMBERS)
+        ])
+        db.session.commit()
+
+        print(f"{'loans':>12} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+        seeded = 0
+        for size in sizes:
+            seed_loans(db, Loan, seeded, size)
+            seeded = size
+            db.session.execute(text('ANALYZE'))
+            result = measure(LoanService, args.borrows)
+            print(f"{size:>12} {result['p50']:>8.3f} {result['p95']:>8.3f} {result['mean']:>8.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""List serialization benchmark.
+
+Measures rows/sec for turning a large listing into a JSON body, comparing
+the previous path (ORM objects, hand-built dict or marshmallow dump, then
+marshal_with, then json) with the precompiled row serializers, and with
+column-projected rows (?fields=). Also reports the memory held per loaded
+row by ORM instances, full rows and projected rows.
+
+Usage:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --rows 100000 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+CHUNK_SIZE = 50000
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000,
+                        help='Number of books and members in the listings')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per variant; the best is reported')
+    return parser.parse_args()
+
+def seed(db, Book, Member, rows):
+    now = datetime.utcnow()
+    for start in range(0, rows, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, rows)
+        db.session.execute(Book.__table__.insert(), [
+            {'title': f'Book title {i}', 'author': f'Author {i % 5000}', 'isbn': f'978{i:010d}',
+             'available': i % 3 != 0, 'available_count': int(i % 3 != 0), 'copy_count': 1,
+             'created_at': now, 'updated_at': now}
+            for i in range(start, stop)
+        ])
+        db.session.execute(Member.__table__.insert(), [
+            {'name': f'Member {i}', 'email': f'member{i}@example.com', 'phone': f'555-{i:07d}',
+             'created_at': now, 'updated_at': now}
+            for i in range(start, stop)
+        ])
+    db.session.commit()
+
+def best_rate(func, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return rows / best, len(body)
+
+def bytes_per_row(load, rows):
+    """Measure the memory held by the result of load, per row."""
+    tracemalloc.start()
+    result = load()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size / rows
+
+def main():
+    args = parse_args()
+    from flask_restx import marshal
+    from app import create_app, db
+    from app.models import Book, Member
+    from app.api.books import book_model
+    from app.api.members import member_model
+    from app.schemas.member_schemas import members_schema
+    from app.utils.serialization import dumps, orjson, column_serializer, table_columns
+
+    app = create_app('testing')
+    with app.app_context():
+        seed(db, Book, Member, args.rows)
+
+        def books_before():
+            db.session.expunge_all()
+            result = [{
+                'id': book.id,
+                'title': book.title,
+                'author': book.author,
+                'isbn': book.isbn,
+                'available': book.available,
+                'created_at': book.created_at.isoformat() if book.created_at else None,
+                'updated_at': book.updated_at.isoformat() if book.updated_at else None
+            } for book in Book.query.order_by(Book.id).all()]
+            return json.dumps(marshal(result, book_model))
+
+        def books_after():
+            rows = Book.query.with_entities(*Book.__table__.columns).order_by(Book.id).all()
+            return dumps([Book.row_to_dict(row) for row in rows])
+
+        projected = ('id', 'title', 'available')
+        serialize_projected = column_serializer(Book, projected, rows=True)
+
+        def books_projected():
+            rows = Book.query.with_entities(*table_columns(Book, projected)).order_by(Book.id).all()
+            return dumps([serialize_projected(row) for row in rows])
+
+        def members_before():
+            db.session.expunge_all()
+            members = Member.query.order_by(Member.id).all()
+            return json.dumps(marshal(members_schema.dump(members), member_model))
+
+        def members_after():
+            rows = Member.query.with_entities(*Member.__table__.columns).order_by(Member.id).all()
+            return dumps([Member.row_to_dict(row) for row in rows])
+
+        print(f'{args.rows} rows, JSON encoder: {"orjson" if orjson else "json"}')
+        print(f'{"listing":<10}{"before rows/s":>16}{"after rows/s":>16}{"speedup":>10}')
+        for name, before, after in [('books', books_before, books_after),
+                                    ('members', members_before, members_after)]:
+            before_rate, _ = best_rate(before, args.rows, args.repeat)
+            after_rate, _ = best_rate(after, args.rows, args.repeat)
+            print(f'{name:<10}{before_rate:>16,.0f}{after_rate:>16,.0f}{after_rate / before_rate:>9.1f}x')
+        rate, _ = best_rate(books_projected, args.rows, args.repeat)
+        print(f'books with fields={",".join(projected)}: {rate:,.0f} rows/s')
+
+        print(f'\n{"loaded as":<28}{"bytes/row":>10}')
+        for name, load in [
+            ('ORM instances', lambda: Book.query.order_by(Book.id).all()),
+            ('rows, all columns', lambda: Book.query.with_entities(*table_columns(Book)).all()),
+            ('rows, ' + ','.join(projected), lambda: Book.query.with_entities(*table_columns(Book, projected)).all())
+        ]:
+            db.session.expunge_all()
+            print(f'{name:<28}{bytes_per_row(load, args.rows):>10,.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""HTTP load test.
+
+Starts the API on a seeded SQLite database under each server setup in
+turn and drives it with concurrent clients for a fixed time, reporting
+throughput and latency percentiles. The mix is paginated book listings,
+book lookups, and borrows each followed by a return.
+
+Setups:
+    dev         Flask development server, default SQLite settings
+    dev-tuned   Flask development server with SQLITE_PRAGMAS applied
+    gunicorn    gunicorn with gunicorn.conf.py (needs gunicorn installed)
+
+Usage:
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --servers dev,gunicorn --clients 32 --duration 30
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+BOOKS = 5000
+MEMBERS = 500
+
+# Runs the development server the way run.py does, without the reloader
+DEV_SERVER = """
+import sys
+from app.config import Config
+if sys.argv[2] == 'untuned':
+    Config.SQLITE_PRAGMAS = {}
+from app import create_app
+create_app('production').run(port=int(sys.argv[1]), threaded=True)
+"""
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--servers', default='dev,dev-tuned,gunicorn',
+                        help='Comma-separated server setups to measure')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=15, help='Seconds to measure each setup')
+    return parser.parse_args()
+
+def seed(db_path):
+    """Create the database with books and members, in the default journal mode."""
+    os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+    from app.config import Config
+    Config.SQLITE_PRAGMAS = {}
+    from app import create_app, db
+    from app.services.book_service import BookService
+    from app.models import Member
+
+    app = create_app('production')
+    with app.app_context():
+        db.create_all()
+        BookService.create_books([{'title': f'Book {i}', 'author': f'Author {i % 200}', 'copies': 3}
+                                  for i in range(BOOKS)])
+        db.session.execute(Member.__table__.insert(), [
+            {'name': f'Member {i}', 'email': f'member{i}@example.com'} for i in range(MEMBERS)
+        ])
+        db.session.commit()
+        db.engine.dispose()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(name, port, env):
+    if name == 'gunicorn':
+        if not shutil.which('gunicorn'):
+            return None
+        command = ['gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}',
+                   '--access-logfile', '/dev/null', 'wsgi:app']
+    else:
+        command = [sys.executable, '-c', DEV_SERVER, str(port), 'tuned' if name == 'dev-tuned' else 'untuned']
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1)
+            return process
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'{name} server did not start')
+
+def request(base, method, path, payload=None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(base + path, data=data, method=method,
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            return response.status, json.loads(response.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+def client(base, seed_value, stop, timings, errors):
+    """Issue requests from the mix until stopped, recording each latency."""
+    rng = random.Random(seed_value)
+    while not stop.is_set():
+        roll = rng.random()
+        start = time.perf_counter()
+        if roll < 0.6:
+            status, _ = request(base, 'GET', f'/api/v1/books?limit=20&cursor={rng.randrange(BOOKS)}')
+            ok = status == 200
+        elif roll < 0.9:
+            status, _ = request(base, 'GET', f'/api/v1/books/{rng.randrange(1, BOOKS + 1)}')
+            ok = status == 200
+        else:
+            status, loan = request(base, 'POST', '/api/v1/loans', {
+                'book_id': rng.randrange(1, BOOKS + 1), 'member_id': rng.randrange(1, MEMBERS + 1)
+            })
+            # Another client may hold every copy; that is not an error
+            ok = status in (201, 409)
+            if status == 201:
+                status, _ = request(base, 'POST', '/api/v1/returns', {'loan_id': loan['loan_id']})
+                ok = status == 200
+        timings.append((time.perf_counter() - start) * 1000)
+        if not ok:
+            errors.append(status)
+
+def measure(base, clients, duration):
+    stop = threading.Event()
+    timings = []
+    errors = []
+    threads = [threading.Thread(target=client, args=(base, i, stop, timings, errors)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    timings.sort()
+    return {
+        'rps': len(timings) / duration,
+        'p50': statistics.median(timings),
+        'p95': timings[int(len(timings) * 0.95) - 1],
+        'p99': timings[int(len(timings) * 0.99) - 1],
+        'errors': len(errors)
+    }
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp()
+    template = os.path.join(workdir, 'template.db')
+    seed(template)
+
+    print(f"{'server':>10} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name in args.servers.split(','):
+        # Every setup starts from the same data
+        db_path = os.path.join(workdir, f'{name}.db')
+        shutil.copy(template, db_path)
+        env = {**os.environ, 'DATABASE_URL': 'sqlite:///' + db_path, 'FLASK_ENV': 'production'}
+        port = free_port()
+        process = start_server(name, port, env)
+        if process is None:
+            print(f'{name:>10} skipped (not installed)')
+            continue
+        try:
+            result = measure(f'http://127.0.0.1:{port}', args.clients, args.duration)
+        finally:
+            process.terminate()
+            process.wait()
+        print(f"{name:>10} {result['rps']:>9.1f} {result['p50']:>8.2f} {result['p95']:>8.2f} "
+              f"{result['p99']:>8.2f} {result['errors']:>7}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+"""API benchmark suite with regression gates.
+
+Seeds a database of synthetic books, members and loans at the chosen
+size, then drives the borrow/return/list/lookup/search/loan-listing
+workload through the Flask test client (one client, in-process) or a real
+WSGI server (concurrent HTTP clients; gunicorn if installed, otherwise
+the threaded development server). Reports p50/p95/p99 latency and
+throughput per endpoint.
+
+Results can be saved as a JSON baseline, and compared with a saved one:
+the run fails (exit status 1) if any endpoint's p50 or p95 latency grows,
+or its throughput drops, by more than the threshold.
+
+Usage:
+    python benchmarks/suite.py --size 1k
+    python benchmarks/suite.py --size 100k --driver server --clients 16 --duration 30
+    python benchmarks/suite.py --size 1k --save benchmarks/baselines/1k-client.json
+    python benchmarks/suite.py --size 1k --baseline benchmarks/baselines/1k-client.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+from load_test import free_port, request, start_server  # noqa: E402
+from app.services.seed_service import TITLE_WORDS  # noqa: E402
+
+# Books at each size, with a member per 10 books and 10 loans per book
+SIZES = {'1k': 1000, '100k': 100000, '1m': 1000000}
+
+# Operations of the workload and their relative weights; a successful
+# borrow is followed by returning the loan
+OPERATIONS = [('list', 30), ('lookup', 25), ('search', 15), ('loans', 10), ('borrow', 20)]
+
+# Gated measurements, and whether a higher value is a regression
+GATES = [('p50', True), ('p95', True), ('rps', False)]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', choices=SIZES, default='1k', help='Dataset size')
+    parser.add_argument('--driver', choices=['client', 'server'], default='client',
+                        help='Flask test client in-process, or HTTP against a WSGI server')
+    parser.add_argument('--requests', type=int, default=2000,
+                        help='Operations issued by the client driver')
+    parser.add_argument('--warmup', type=int, default=200,
+                        help='Operations issued, and not measured, before the client driver starts timing')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent clients of the server driver')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds the server driver runs')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='Times the workload is run; the median of each measurement is reported')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'library-bench'),
+                        help='Where seeded databases are kept between runs')
+    parser.add_argument('--reseed', action='store_true', help='Seed the database even if it exists')
+    parser.add_argument('--save', metavar='PATH', help='Save the results as a JSON baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare with a saved baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed relative regression against the baseline')
+    return parser.parse_args()
+
+def members_for(books):
+    return max(books // 10, 10)
+
+def use_database(db_path):
+    """Point the production configuration at a database file."""
+    os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+    from app.config import ProductionConfig
+    ProductionConfig.SQLALCHEMY_DATABASE_URI = os.environ['DATABASE_URL']
+
+def seed(db_path, books):
+    """Create a database with `flask seed`'s generator, 10 loans per book."""
+    use_database(db_path)
+    from app import create_app, db
+    from app.services.seed_service import SeedService
+
+    with create_app('production').app_context():
+        db.create_all()
+        _, error = SeedService.seed(books, members_for(books), books * 10, seed=books,
+                                    now=datetime(2024, 1, 1))
+        if error:
+            raise RuntimeError(error)
+
+def run_operation(send, rng, books, members, record):
+    """Issue one operation of the workload, recording each request's latency."""
+    def timed(endpoint, method, path, payload=None, expected=(200,)):
+        start = time.perf_counter()
+        status, body = send(method, path, payload)
+        record(endpoint, (time.perf_counter() - start) * 1000, status in expected)
+        return status, body
+
+    operation = rng.choices([name for name, _ in OPERATIONS], [weight for _, weight in OPERATIONS])[0]
+    if operation == 'list':
+        timed('GET /api/v1/books', 'GET', f'/api/v1/books?limit=20&cursor={rng.randrange(books)}')
+    elif operation == 'lookup':
+        timed('GET /api/v1/books/<id>', 'GET', f'/api/v1/books/{rng.randrange(1, books + 1)}')
+    elif operation == 'search':
+        timed('GET /api/v1/books/search', 'GET', f'/api/v1/books/search?q={rng.choice(TITLE_WORDS).lower()}&limit=20')
+    elif operation == 'loans':
+        timed('GET /api/v1/loans', 'GET', f'/api/v1/loans?limit=20&member_id={rng.randrange(1, members + 1)}')
+    else:
+        # Every copy may be out; that is not an error
+        status, loan = timed('POST /api/v1/loans', 'POST', '/api/v1/loans', {
+            'book_id': rng.randrange(1, books + 1), 'member_id': rng.randrange(1, members + 1)
+        }, expected=(201, 409))
+        if status == 201:
+            timed('POST /api/v1/returns', 'POST', '/api/v1/returns', {'loan_id': loan['loan_id']})
+
+class Recorder:
+    """Latencies and failures by endpoint, shared by client threads."""
+
+    def __init__(self):
+        self.timings = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, endpoint, ms, ok):
+        with self._lock:
+            self.timings.setdefault(endpoint, []).append(ms)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self, elapsed):
+        def percentiles(timings):
+            timings = sorted(timings)
+            return {
+                'count': len(timings),
+                'rps': round(len(timings) / elapsed, 2),
+                'p50': round(statistics.median(timings), 3),
+                'p95': round(timings[max(int(len(timings) * 0.95) - 1, 0)], 3),
+                'p99': round(timings[max(int(len(timings) * 0.99) - 1, 0)], 3)
+            }
+
+        endpoints = {endpoint: {**percentiles(timings), 'errors': self.errors.get(endpoint, 0)}
+                     for endpoint, timings in sorted(self.timings.items())}
+        endpoints['all'] = {**percentiles([ms for timings in self.timings.values() for ms in timings]),
+                            'errors': sum(self.errors.values())}
+        return endpoints
+
+def drive_client(db_path, books, members, operations, warmup):
+    """Run the workload in-process through the Flask test client."""
+    use_database(db_path)
+    from app import create_app
+
+    client = create_app('production').test_client()
+
+    def send(method, path, payload):
+        response = client.open(path, method=method, json=payload)
+        return response.status_code, response.get_json(silent=True)
+
+    rng = random.Random(42)
+    for _ in range(warmup):
+        run_operation(send, rng, books, members, lambda *args: None)
+    recorder = Recorder()
+    start = time.perf_counter()
+    for _ in range(operations):
+        run_operation(send, rng, books, members, recorder)
+    return recorder.summary(time.perf_counter() - start)
+
+def drive_server(db_path, books, members, clients, duration):
+    """Run the workload over HTTP against a WSGI server from concurrent clients."""
+    server = 'gunicorn' if shutil.which('gunicorn') else 'dev-tuned'
+    env = {**os.environ, 'DATABASE_URL': 'sqlite:///' + db_path, 'FLASK_ENV': 'production'}
+    port = free_port()
+    process = start_server(server, port, env)
+    base = f'http://127.0.0.1:{port}'
+
+    def send(method, path, payload):
+        return request(base, method, path, payload)
+
+    recorder = Recorder()
+    stop = threading.Event()
+
+    def client(seed_value):
+        rng = random.Random(seed_value)
+        while not stop.is_set():
+            run_operation(send, rng, books, members, recorder)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    try:
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    finally:
+        process.terminate()
+        process.wait()
+    return server, recorder.summary(duration)
+
+def median_of_runs(runs):
+    """Combine the results of repeated runs, taking the median of each measurement."""
+    return {endpoint: {key: (sum if key in ('count', 'errors') else statistics.median)(
+                           [run[endpoint][key] for run in runs if endpoint in run])
+                       for key in runs[0][endpoint]}
+            for endpoint in runs[0]}
+
+def compare(results, baseline, threshold):
+    """List the gated measurements that regressed by more than threshold."""
+    regressions = []
+    for endpoint, current in results['endpoints'].items():
+        previous = baseline['endpoints'].get(endpoint)
+        if not previous:
+            continue
+        for measurement, higher_is_worse in GATES:
+            if not previous[measurement]:
+                continue
+            change = current[measurement] / previous[measurement] - 1
+            if (change if higher_is_worse else -change) > threshold:
+                regressions.append((endpoint, measurement, previous[measurement], current[measurement], change))
+    return regressions
+
+def main():
+    args = parse_args()
+    books = SIZES[args.size]
+    members = members_for(books)
+
+    # Seed once per size and copy, as the workload changes the data
+    os.makedirs(args.data_dir, exist_ok=True)
+    template = os.path.join(args.data_dir, f'suite-{args.size}.db')
+    if args.reseed or not os.path.exists(template):
+        print(f'Seeding {books} books...', file=sys.stderr)
+        partial = template + '.partial'
+        if os.path.exists(partial):
+            os.remove(partial)
+        seed(partial, books)
+        os.replace(partial, template)
+    runs = []
+    for _ in range(args.runs):
+        db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        shutil.copy(template, db_path)
+        if args.driver == 'client':
+            driver = 'client'
+            runs.append(drive_client(db_path, books, members, args.requests, args.warmup))
+        else:
+            server, endpoints = drive_server(db_path, books, members, args.clients, args.duration)
+            driver = f'server:{server}'
+            runs.append(endpoints)
+    endpoints = median_of_runs(runs)
+
+    results = {
+        'size': args.size,
+        'driver': driver,
+        'runs': args.runs,
+        'python': platform.python_version(),
+        'recorded_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'endpoints': endpoints
+    }
+
+    print(f"{'endpoint':<26} {'count':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for endpoint, result in endpoints.items():
+        print(f"{endpoint:<26} {result['count']:>7} {result['rps']:>9.1f} {result['p50']:>8.2f} "
+              f"{result['p95']:>8.2f} {result['p99']:>8.2f} {result['errors']:>7}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f'Saved baseline to {args.save}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline['size'], baseline['driver']) != (results['size'], results['driver']):
+            sys.exit(f"Baseline is for {baseline['size']} with {baseline['driver']}, not {args.size} with {driver}")
+        regressions = compare(results, baseline, args.threshold)
+        for endpoint, measurement, previous, current, change in regressions:
+            print(f'REGRESSION {endpoint} {measurement}: {previous} -> {current} ({change:+.0%})')
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions over {args.threshold:.0%} against {args.baseline}')
+
+    if endpoints['all']['errors']:
+        sys.exit(f"{endpoints['all']['errors']} requests failed")
+
+if __name__ == '__main__':
+    main()
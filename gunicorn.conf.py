@@ -0,0 +1,33 @@
+"""Gunicorn settings for serving wsgi:app in production.
+
+Every setting can be overridden from the environment. Requests are
+mostly short database round trips, so each worker process runs a pool
+of threads (gthread) that overlap the time spent waiting on the
+database, and one process per CPU keeps Python code running in
+parallel. SQLite allows a single writer at a time whatever the worker
+count; WAL mode (see SQLITE_PRAGMAS) lets reads proceed alongside it.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# One process per CPU, plus one to cover a worker blocked on I/O
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Give every thread its own pooled connection; the workers inherit this
+# environment and read it when they create the app
+os.environ.setdefault('DB_POOL_SIZE', str(threads))
+
+# Hold idle keep-alive connections briefly behind a load balancer, and
+# recycle workers now and then to bound memory growth
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = 1000
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
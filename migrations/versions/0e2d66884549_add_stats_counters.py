@@ -0,0 +1,28 @@
+"""add stats counters
+
+Revision ID: 0e2d66884549
+Revises: 7d6df544f827
+Create Date: 2026-10-18 13:05:44.019362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0e2d66884549'
+down_revision = '7d6df544f827'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stats_counters',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('stats_counters')
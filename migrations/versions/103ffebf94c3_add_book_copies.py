@@ -0,0 +1,134 @@
+"""add book copies
+
+Revision ID: 103ffebf94c3
+Revises: ad072dad1c0a
+Create Date: 2026-10-18 16:48:03.217945
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '103ffebf94c3'
+down_revision = 'ad072dad1c0a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('copies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('barcode', sa.String(length=50), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('barcode')
+    )
+    with op.batch_alter_table('copies', schema=None) as batch_op:
+        batch_op.create_index('ix_copies_book_id_status', ['book_id', 'status'], unique=False)
+        batch_op.create_index(batch_op.f('ix_copies_updated_at'), ['updated_at'], unique=False)
+
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('available_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('copy_count', sa.Integer(), nullable=False, server_default='0'))
+
+    with op.batch_alter_table('holds', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('copy_id', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('copy_id', sa.Integer(), nullable=True))
+
+    # Every existing book becomes a single copy, on loan if the book has an
+    # open loan, set aside if it has a ready hold and on the shelf otherwise
+    op.execute("""
+        INSERT INTO copies (book_id, status, created_at, updated_at)
+        SELECT id,
+               CASE
+                   WHEN EXISTS (SELECT 1 FROM loans WHERE loans.book_id = books.id
+                                AND loans.status != 'returned') THEN 'on_loan'
+                   WHEN EXISTS (SELECT 1 FROM holds WHERE holds.book_id = books.id
+                                AND holds.status = 'ready') THEN 'held'
+                   ELSE 'available'
+               END,
+               created_at, updated_at
+        FROM books
+    """)
+    op.execute("UPDATE loans SET copy_id = (SELECT copies.id FROM copies WHERE copies.book_id = loans.book_id)")
+    op.execute("UPDATE holds SET copy_id = (SELECT copies.id FROM copies WHERE copies.book_id = holds.book_id) "
+               "WHERE status = 'ready'")
+    op.execute("UPDATE books SET copy_count = 1, available_count = (SELECT COUNT(*) FROM copies "
+               "WHERE copies.book_id = books.id AND copies.status = 'available')")
+    op.execute("UPDATE books SET available = (available_count > 0)")
+
+    # The statistics count copies instead of books
+    op.execute("DELETE FROM stats_counters WHERE name = 'available_books'")
+    op.execute("INSERT INTO stats_counters (name, value) SELECT 'total_copies', COUNT(*) FROM copies "
+               "WHERE EXISTS (SELECT 1 FROM stats_counters WHERE name = 'total_books')")
+    op.execute("INSERT INTO stats_counters (name, value) SELECT 'available_copies', COUNT(*) FROM copies "
+               "WHERE status = 'available' AND EXISTS (SELECT 1 FROM stats_counters WHERE name = 'total_books')")
+
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.alter_column('available_count', existing_type=sa.Integer(), server_default=None)
+        batch_op.alter_column('copy_count', existing_type=sa.Integer(), server_default=None)
+
+    with op.batch_alter_table('holds', schema=None) as batch_op:
+        batch_op.drop_index('uq_holds_ready_book_id',
+                            sqlite_where=sa.text("status = 'ready'"),
+                            postgresql_where=sa.text("status = 'ready'"))
+        batch_op.create_index('uq_holds_ready_copy_id', ['copy_id'], unique=True,
+                              sqlite_where=sa.text("status = 'ready'"),
+                              postgresql_where=sa.text("status = 'ready'"))
+        batch_op.create_foreign_key('fk_holds_copy_id_copies', 'copies', ['copy_id'], ['id'])
+
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.alter_column('copy_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_index('uq_loans_active_book_id',
+                            sqlite_where=sa.text("status != 'returned'"),
+                            postgresql_where=sa.text("status != 'returned'"))
+        batch_op.create_index(batch_op.f('ix_loans_copy_id'), ['copy_id'], unique=False)
+        batch_op.create_index('uq_loans_open_copy_id', ['copy_id'], unique=True,
+                              sqlite_where=sa.text("status != 'returned'"),
+                              postgresql_where=sa.text("status != 'returned'"))
+        batch_op.create_foreign_key('fk_loans_copy_id_copies', 'copies', ['copy_id'], ['id'])
+
+
+def downgrade():
+    # Books go back to one item each, available if any copy was on the shelf
+    op.execute("DELETE FROM stats_counters WHERE name IN ('total_copies', 'available_copies')")
+    op.execute("INSERT INTO stats_counters (name, value) SELECT 'available_books', COUNT(*) FROM books "
+               "WHERE available AND EXISTS (SELECT 1 FROM stats_counters WHERE name = 'total_books')")
+
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_loans_copy_id_copies', type_='foreignkey')
+        batch_op.drop_index('uq_loans_open_copy_id',
+                            sqlite_where=sa.text("status != 'returned'"),
+                            postgresql_where=sa.text("status != 'returned'"))
+        batch_op.drop_index(batch_op.f('ix_loans_copy_id'))
+        batch_op.create_index('uq_loans_active_book_id', ['book_id'], unique=True,
+                              sqlite_where=sa.text("status != 'returned'"),
+                              postgresql_where=sa.text("status != 'returned'"))
+        batch_op.drop_column('copy_id')
+
+    with op.batch_alter_table('holds', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_holds_copy_id_copies', type_='foreignkey')
+        batch_op.drop_index('uq_holds_ready_copy_id',
+                            sqlite_where=sa.text("status = 'ready'"),
+                            postgresql_where=sa.text("status = 'ready'"))
+        batch_op.create_index('uq_holds_ready_book_id', ['book_id'], unique=True,
+                              sqlite_where=sa.text("status = 'ready'"),
+                              postgresql_where=sa.text("status = 'ready'"))
+        batch_op.drop_column('copy_id')
+
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.drop_column('copy_count')
+        batch_op.drop_column('available_count')
+
+    with op.batch_alter_table('copies', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_copies_updated_at'))
+        batch_op.drop_index('ix_copies_book_id_status')
+
+    op.drop_table('copies')
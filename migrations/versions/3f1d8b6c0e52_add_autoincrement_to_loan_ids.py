@@ -0,0 +1,47 @@
+"""add autoincrement to loan ids
+
+Revision ID: 3f1d8b6c0e52
+Revises: 9c2f5e8a1d47
+Create Date: 2026-10-19 14:03:26.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1d8b6c0e52'
+down_revision = '9c2f5e8a1d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite reuses the highest IDs once their rows are deleted, which
+    # archiving does; other databases draw IDs from a sequence
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    with op.batch_alter_table('loans', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        batch_op.drop_index('uq_loans_open_copy_id',
+                            sqlite_where=sa.text("status != 'returned'"))
+        batch_op.create_index('uq_loans_open_copy_id', ['copy_id'], unique=True,
+                              sqlite_where=sa.text("status != 'returned'"))
+
+    # New loans are numbered after every loan so far, archived or not
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'loans'")
+    op.execute("INSERT INTO sqlite_sequence (name, seq) SELECT 'loans', "
+               "MAX(COALESCE((SELECT MAX(id) FROM loans), 0), COALESCE((SELECT MAX(id) FROM loan_history), 0))")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    with op.batch_alter_table('loans', schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}) as batch_op:
+        batch_op.drop_index('uq_loans_open_copy_id',
+                            sqlite_where=sa.text("status != 'returned'"))
+        batch_op.create_index('uq_loans_open_copy_id', ['copy_id'], unique=True,
+                              sqlite_where=sa.text("status != 'returned'"))
@@ -0,0 +1,25 @@
+"""add member loan history index
+
+Revision ID: 5b9e0c3f2a71
+Revises: 103ffebf94c3
+Create Date: 2026-10-18 21:05:37.402816
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5b9e0c3f2a71'
+down_revision = '103ffebf94c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.create_index('ix_loans_member_id_id', ['member_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.drop_index('ix_loans_member_id_id')
@@ -0,0 +1,54 @@
+"""add loan updated_at and lookup indexes
+
+Revision ID: 726a4f9a779a
+Revises: f8cfe7c9f396
+Create Date: 2026-10-18 09:14:02.118530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '726a4f9a779a'
+down_revision = 'f8cfe7c9f396'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # Backfill from the latest event recorded on each loan
+    op.execute('UPDATE loans SET updated_at = COALESCE(returned_at, borrowed_at)')
+
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index('ix_loans_book_id_status', ['book_id', 'status'], unique=False)
+        batch_op.create_index('ix_loans_member_id_status', ['member_id', 'status'], unique=False)
+        batch_op.create_index(batch_op.f('ix_loans_updated_at'), ['updated_at'], unique=False)
+
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_books_author'), ['author'], unique=False)
+        batch_op.create_index(batch_op.f('ix_books_available'), ['available'], unique=False)
+        batch_op.create_index(batch_op.f('ix_books_updated_at'), ['updated_at'], unique=False)
+
+    with op.batch_alter_table('members', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_members_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('members', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_members_updated_at'))
+
+    with op.batch_alter_table('books', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_books_updated_at'))
+        batch_op.drop_index(batch_op.f('ix_books_available'))
+        batch_op.drop_index(batch_op.f('ix_books_author'))
+
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_loans_updated_at'))
+        batch_op.drop_index('ix_loans_member_id_status')
+        batch_op.drop_index('ix_loans_book_id_status')
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,30 @@
+"""add partial unique index on active loans
+
+Revision ID: 7d6df544f827
+Revises: 726a4f9a779a
+Create Date: 2026-10-18 11:40:27.553904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d6df544f827'
+down_revision = '726a4f9a779a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.create_index('uq_loans_active_book_id', ['book_id'], unique=True,
+                              sqlite_where=sa.text("status = 'active'"),
+                              postgresql_where=sa.text("status = 'active'"))
+
+
+def downgrade():
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.drop_index('uq_loans_active_book_id',
+                            sqlite_where=sa.text("status = 'active'"),
+                            postgresql_where=sa.text("status = 'active'"))
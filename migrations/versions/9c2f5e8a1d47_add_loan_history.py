@@ -0,0 +1,54 @@
+"""add loan history
+
+Revision ID: 9c2f5e8a1d47
+Revises: e7a4c19d6b02
+Create Date: 2026-10-19 10:12:48.930157
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c2f5e8a1d47'
+down_revision = 'e7a4c19d6b02'
+branch_labels = None
+depends_on = None
+
+LOAN_COLUMNS = ('id, book_id, copy_id, member_id, borrowed_at, due_at, returned_at, status, policy, '
+                'fine_cents, updated_at')
+
+
+def upgrade():
+    op.create_table('loan_history',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('copy_id', sa.Integer(), nullable=False),
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.Column('borrowed_at', sa.DateTime(), nullable=False),
+    sa.Column('due_at', sa.DateTime(), nullable=False),
+    sa.Column('returned_at', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('policy', sa.String(length=20), nullable=False),
+    sa.Column('fine_cents', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ),
+    sa.ForeignKeyConstraint(['copy_id'], ['copies.id'], ),
+    sa.ForeignKeyConstraint(['member_id'], ['members.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('loan_history', schema=None) as batch_op:
+        batch_op.create_index('ix_loan_history_book_id_id', ['book_id', 'id'], unique=False)
+        batch_op.create_index('ix_loan_history_member_id_id', ['member_id', 'id'], unique=False)
+
+
+def downgrade():
+    # Archived loans go back to the loans table
+    op.execute(f'INSERT INTO loans ({LOAN_COLUMNS}) SELECT {LOAN_COLUMNS} FROM loan_history')
+
+    with op.batch_alter_table('loan_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_loan_history_member_id_id')
+        batch_op.drop_index('ix_loan_history_book_id_id')
+
+    op.drop_table('loan_history')
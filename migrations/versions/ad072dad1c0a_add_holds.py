@@ -0,0 +1,57 @@
+"""add holds
+
+Revision ID: ad072dad1c0a
+Revises: bb13aa74ab90
+Create Date: 2026-10-18 15:31:47.050716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ad072dad1c0a'
+down_revision = 'bb13aa74ab90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('holds',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('member_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('ready_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ),
+    sa.ForeignKeyConstraint(['member_id'], ['members.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('holds', schema=None) as batch_op:
+        batch_op.create_index('ix_holds_book_id_status_id', ['book_id', 'status', 'id'], unique=False)
+        batch_op.create_index('ix_holds_status_expires_at', ['status', 'expires_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_holds_updated_at'), ['updated_at'], unique=False)
+        batch_op.create_index('uq_holds_open_book_member', ['book_id', 'member_id'], unique=True,
+                              sqlite_where=sa.text("status IN ('waiting', 'ready')"),
+                              postgresql_where=sa.text("status IN ('waiting', 'ready')"))
+        batch_op.create_index('uq_holds_ready_book_id', ['book_id'], unique=True,
+                              sqlite_where=sa.text("status = 'ready'"),
+                              postgresql_where=sa.text("status = 'ready'"))
+
+
+def downgrade():
+    with op.batch_alter_table('holds', schema=None) as batch_op:
+        batch_op.drop_index('uq_holds_ready_book_id',
+                            sqlite_where=sa.text("status = 'ready'"),
+                            postgresql_where=sa.text("status = 'ready'"))
+        batch_op.drop_index('uq_holds_open_book_member',
+                            sqlite_where=sa.text("status IN ('waiting', 'ready')"),
+                            postgresql_where=sa.text("status IN ('waiting', 'ready')"))
+        batch_op.drop_index(batch_op.f('ix_holds_updated_at'))
+        batch_op.drop_index('ix_holds_status_expires_at')
+        batch_op.drop_index('ix_holds_book_id_status_id')
+
+    op.drop_table('holds')
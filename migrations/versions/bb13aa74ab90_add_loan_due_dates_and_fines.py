@@ -0,0 +1,62 @@
+"""add loan due dates and fines
+
+Revision ID: bb13aa74ab90
+Revises: 0e2d66884549
+Create Date: 2026-10-18 14:22:10.514562
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bb13aa74ab90'
+down_revision = '0e2d66884549'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('due_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('policy', sa.String(length=20), nullable=False,
+                                      server_default='standard'))
+        batch_op.add_column(sa.Column('fine_cents', sa.Integer(), nullable=False,
+                                      server_default='0'))
+
+    # Existing loans were made under the standard 14-day period; the
+    # overdue sweep marks and fines the ones already past due
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("UPDATE loans SET due_at = datetime(borrowed_at, '+14 days')")
+    else:
+        op.execute("UPDATE loans SET due_at = borrowed_at + INTERVAL '14 days'")
+
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.alter_column('due_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.alter_column('policy', existing_type=sa.String(length=20), server_default=None)
+        batch_op.alter_column('fine_cents', existing_type=sa.Integer(), server_default=None)
+        batch_op.create_index('ix_loans_status_due_at', ['status', 'due_at'], unique=False)
+
+        # Overdue loans still hold their book
+        batch_op.drop_index('uq_loans_active_book_id',
+                            sqlite_where=sa.text("status = 'active'"),
+                            postgresql_where=sa.text("status = 'active'"))
+        batch_op.create_index('uq_loans_active_book_id', ['book_id'], unique=True,
+                              sqlite_where=sa.text("status != 'returned'"),
+                              postgresql_where=sa.text("status != 'returned'"))
+
+
+def downgrade():
+    op.execute("UPDATE loans SET status = 'active' WHERE status = 'overdue'")
+
+    with op.batch_alter_table('loans', schema=None) as batch_op:
+        batch_op.drop_index('uq_loans_active_book_id',
+                            sqlite_where=sa.text("status != 'returned'"),
+                            postgresql_where=sa.text("status != 'returned'"))
+        batch_op.create_index('uq_loans_active_book_id', ['book_id'], unique=True,
+                              sqlite_where=sa.text("status = 'active'"),
+                              postgresql_where=sa.text("status = 'active'"))
+        batch_op.drop_index('ix_loans_status_due_at')
+        batch_op.drop_column('fine_cents')
+        batch_op.drop_column('policy')
+        batch_op.drop_column('due_at')
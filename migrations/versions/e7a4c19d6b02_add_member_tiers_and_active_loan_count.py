@@ -0,0 +1,35 @@
+"""add member tiers and active loan count
+
+Revision ID: e7a4c19d6b02
+Revises: 5b9e0c3f2a71
+Create Date: 2026-10-18 22:40:11.586203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a4c19d6b02'
+down_revision = '5b9e0c3f2a71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('members', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tier', sa.String(length=20), nullable=False, server_default='standard'))
+        batch_op.add_column(sa.Column('active_loan_count', sa.Integer(), nullable=False, server_default='0'))
+
+    op.execute("UPDATE members SET active_loan_count = (SELECT COUNT(*) FROM loans "
+               "WHERE loans.member_id = members.id AND loans.status != 'returned')")
+
+    with op.batch_alter_table('members', schema=None) as batch_op:
+        batch_op.alter_column('tier', existing_type=sa.String(length=20), server_default=None)
+        batch_op.alter_column('active_loan_count', existing_type=sa.Integer(), server_default=None)
+
+
+def downgrade():
+    with op.batch_alter_table('members', schema=None) as batch_op:
+        batch_op.drop_column('active_loan_count')
+        batch_op.drop_column('tier')
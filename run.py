@@ -8,5 +8,6 @@ if __name__ == '__main__':
     # Create instance directory if it doesn't exist
     os.makedirs('instance', exist_ok=True)
     
-    # Run the application
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Run the development server (debug mode follows the configuration);
+    # serve production traffic with gunicorn instead, see wsgi.py
+    app.run(debug=app.config['DEBUG'], host='0.0.0.0', port=5000)
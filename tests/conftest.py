@@ -0,0 +1,43 @@
+import pytest
+from app import create_app, db
+from app.models import Book, Member
+
+@pytest.fixture
+def app():
+    """Create application for testing."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client."""
+    return app.test_client()
+
+@pytest.fixture
+def book_id(app):
+    """Create a book with one copy on the shelf."""
+    book = Book(title='Test Book', author='Test Author')
+    book.add_copies()
+    db.session.add(book)
+    db.session.commit()
+    return book.id
+
+@pytest.fixture
+def member_id(app):
+    """Create a member."""
+    member = Member(name='Test Member', email='member@example.com')
+    db.session.add(member)
+    db.session.commit()
+    return member.id
+
+@pytest.fixture
+def member_ids(app):
+    """Create four members."""
+    members = [Member(name=f'Member {i}', email=f'member{i}@example.com') for i in range(4)]
+    db.session.add_all(members)
+    db.session.commit()
+    return [member.id for member in members]
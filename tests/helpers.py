@@ -0,0 +1,6 @@
+import json
+
+def post(client, url, payload):
+    """POST a JSON payload, returning the status code and the decoded response."""
+    response = client.post(url, data=json.dumps(payload), content_type='application/json')
+    return response.status_code, json.loads(response.data)
@@ -0,0 +1,108 @@
+import pytest
+import asyncio
+import json
+from app.config import TestingConfig
+
+pytest.importorskip('greenlet')
+pytest.importorskip('aiosqlite')
+
+from app import db
+from app.asgi import create_asgi_app
+from app.services.book_service import BookService
+from app.services.loan_service import LoanService
+from app.services.member_service import MemberService
+
+@pytest.fixture
+def asgi_app(tmp_path, monkeypatch):
+    """Create the async API and the Flask app over a shared database file."""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', 'sqlite:///' + str(tmp_path / 'async.db'))
+    asgi_app = create_asgi_app('testing')
+    yield asgi_app
+    asyncio.run(asgi_app.engine.dispose())
+
+@pytest.fixture
+def flask_client(asgi_app):
+    """Create a Flask test client on the same database, with a few rows."""
+    from app import create_app
+    app = create_app('testing')
+    with app.app_context():
+        BookService.create_books([{'title': f'Book {i}', 'author': 'Author', 'copies': 2} for i in range(5)])
+        member, _ = MemberService.create_member({'name': 'Jane', 'email': 'jane@example.com'})
+        LoanService.borrow_book({'book_id': 1, 'member_id': member.id})
+        yield app.test_client()
+        db.drop_all()
+
+def call(asgi_app, path, query='', headers=()):
+    """Send a GET request through the ASGI app, returning status, headers and body."""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'method': 'GET', 'path': path,
+             'query_string': query.encode(), 'headers': list(headers)}
+    asyncio.run(asgi_app(scope, receive, send))
+    start, body = messages
+    return start['status'], dict(start['headers']), body['body']
+
+class TestAsyncReadAPI:
+    """Test cases for the async read path."""
+
+    @pytest.mark.parametrize('path,query', [
+        ('/api/v1/books', 'limit=2'),
+        ('/api/v1/books', 'available=true&fields=id,title,available_count'),
+        ('/api/v1/books/1', ''),
+        ('/api/v1/members', ''),
+        ('/api/v1/members/1', ''),
+        ('/api/v1/loans', 'status=active&expand=book,member'),
+        ('/api/v1/books/999', '')
+    ])
+    def test_same_json_as_sync_api(self, asgi_app, flask_client, path, query):
+        """Test that both paths return the same status and JSON."""
+        expected = flask_client.get(f'{path}?{query}')
+        status, _, body = call(asgi_app, path, query)
+        assert status == expected.status_code
+        assert json.loads(body) == json.loads(expected.data)
+
+    def test_validation_and_conditional_get(self, asgi_app, flask_client):
+        """Test rejected parameters and 304 responses for current copies."""
+        status, _, body = call(asgi_app, '/api/v1/loans', 'expand=fines')
+        assert status == 400
+        assert json.loads(body)['message'] == 'Validation error'
+
+        _, headers, _ = call(asgi_app, '/api/v1/books/1')
+        assert headers[b'etag'] == flask_client.get('/api/v1/books/1').headers['ETag'].encode()
+        status, _, body = call(asgi_app, '/api/v1/books/1', headers=[(b'if-none-match', headers[b'etag'])])
+        assert (status, body) == (304, b'')
+
+    def test_conditional_lists_and_dates(self, asgi_app, flask_client):
+        """Test list ETags, Last-Modified and the forms If-None-Match takes."""
+        for path, query in [('/api/v1/books', 'limit=2&available=true'), ('/api/v1/members', '')]:
+            _, headers, _ = call(asgi_app, path, query)
+            assert headers[b'etag'] == flask_client.get(f'{path}?{query}').headers['ETag'].encode()
+            status, _, body = call(asgi_app, path, query, headers=[(b'if-none-match', headers[b'etag'])])
+            assert (status, body) == (304, b'')
+
+        _, headers, _ = call(asgi_app, '/api/v1/books/1')
+        assert headers[b'last-modified'] == flask_client.get('/api/v1/books/1').headers['Last-Modified'].encode()
+        for if_none_match in [b'W/' + headers[b'etag'], b'*', b'"other",' + headers[b'etag']]:
+            status, _, _ = call(asgi_app, '/api/v1/books/1', headers=[(b'if-none-match', if_none_match)])
+            assert status == 304
+        status, _, _ = call(asgi_app, '/api/v1/books/1', headers=[(b'if-modified-since', headers[b'last-modified'])])
+        assert status == 304
+
+    def test_websocket_refused(self, asgi_app):
+        """Test that WebSocket connections are closed rather than crashing the app."""
+        messages = []
+
+        async def receive():
+            return {'type': 'websocket.connect'}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(asgi_app({'type': 'websocket', 'path': '/api/v1/books'}, receive, send))
+        assert messages == [{'type': 'websocket.close', 'code': 1003}]
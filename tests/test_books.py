@@ -1,23 +1,7 @@
 import pytest
 import json
-from app import create_app, db
 from app.models import Book, Member, Loan
 
-@pytest.fixture
-def app():
-    """Create application for testing."""
-    app = create_app('testing')
-    
-    with app.app_context():
-        db.create_all()
-        yield app
-        db.drop_all()
-
-@pytest.fixture
-def client(app):
-    """Create test client."""
-    return app.test_client()
-
 @pytest.fixture
 def sample_book_data():
     """Sample book data for testing."""
@@ -32,7 +16,7 @@ class TestBookAPI:
     
     def test_create_book(self, client, sample_book_data):
         """Test creating a new book."""
-        response = client.post('/books', 
+        response = client.post('/api/v1/books', 
                              data=json.dumps(sample_book_data),
                              content_type='application/json')
         
@@ -45,24 +29,24 @@ class TestBookAPI:
     def test_get_all_books(self, client, sample_book_data):
         """Test getting all books."""
         # Create a book first
-        client.post('/books', 
+        client.post('/api/v1/books', 
                    data=json.dumps(sample_book_data),
                    content_type='application/json')
         
-        response = client.get('/books')
+        response = client.get('/api/v1/books')
         assert response.status_code == 200
         data = json.loads(response.data)
-        assert len(data) >= 1
+        assert len(data['books']) >= 1
     
     def test_get_book_by_id(self, client, sample_book_data):
         """Test getting a book by ID."""
         # Create a book first
-        create_response = client.post('/books', 
+        create_response = client.post('/api/v1/books', 
                                     data=json.dumps(sample_book_data),
                                     content_type='application/json')
         book_id = json.loads(create_response.data)['id']
         
-        response = client.get(f'/books/{book_id}')
+        response = client.get(f'/api/v1/books/{book_id}')
         assert response.status_code == 200
         data = json.loads(response.data)
         assert data['id'] == book_id
@@ -70,13 +54,13 @@ class TestBookAPI:
     def test_update_book(self, client, sample_book_data):
         """Test updating a book."""
         # Create a book first
-        create_response = client.post('/books', 
+        create_response = client.post('/api/v1/books', 
                                     data=json.dumps(sample_book_data),
                                     content_type='application/json')
         book_id = json.loads(create_response.data)['id']
         
         update_data = {'title': 'Updated Title'}
-        response = client.put(f'/books/{book_id}',
+        response = client.put(f'/api/v1/books/{book_id}',
                             data=json.dumps(update_data),
                             content_type='application/json')
         
@@ -87,23 +71,207 @@ class TestBookAPI:
     def test_delete_book(self, client, sample_book_data):
         """Test deleting a book."""
         # Create a book first
-        create_response = client.post('/books', 
+        create_response = client.post('/api/v1/books', 
                                     data=json.dumps(sample_book_data),
                                     content_type='application/json')
         book_id = json.loads(create_response.data)['id']
         
-        response = client.delete(f'/books/{book_id}')
+        response = client.delete(f'/api/v1/books/{book_id}')
         assert response.status_code == 200
         
         # Verify book is deleted
-        get_response = client.get(f'/books/{book_id}')
+        get_response = client.get(f'/api/v1/books/{book_id}')
         assert get_response.status_code == 404
     
     def test_create_book_validation_error(self, client):
         """Test creating a book with validation errors."""
         invalid_data = {'title': ''}  # Missing required fields
-        response = client.post('/books', 
+        response = client.post('/api/v1/books', 
                              data=json.dumps(invalid_data),
                              content_type='application/json')
         
         assert response.status_code == 400
+
+class TestBookListAPI:
+    """Test cases for the paginated book listing."""
+    
+    def _create_books(self, client, count, author='Test Author'):
+        for i in range(count):
+            client.post('/api/v1/books',
+                        data=json.dumps({'title': f'Book {i}', 'author': author}),
+                        content_type='application/json')
+    
+    def test_list_books_keyset_pagination(self, client):
+        """Test walking the book list page by page with the cursor."""
+        self._create_books(client, 5)
+        
+        response = client.get('/api/v1/books?limit=2')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [book['title'] for book in data['books']] == ['Book 0', 'Book 1']
+        assert data['limit'] == 2
+        
+        seen = [book['id'] for book in data['books']]
+        while data['next_cursor'] is not None:
+            response = client.get(f"/api/v1/books?limit=2&cursor={data['next_cursor']}")
+            data = json.loads(response.data)
+            seen.extend(book['id'] for book in data['books'])
+        
+        assert len(seen) == 5
+        assert seen == sorted(seen)
+    
+    def test_list_books_filters(self, client):
+        """Test filtering the book list by author and title prefix."""
+        self._create_books(client, 3, author='Alice')
+        self._create_books(client, 2, author='Bob')
+        client.post('/api/v1/books',
+                    data=json.dumps({'title': 'Other_Title', 'author': 'Bob'}),
+                    content_type='application/json')
+        
+        data = json.loads(client.get('/api/v1/books?author=Bob').data)
+        assert len(data['books']) == 3
+        assert data['next_cursor'] is None
+        
+        data = json.loads(client.get('/api/v1/books?title=Book&author=Alice').data)
+        assert len(data['books']) == 3
+        
+        data = json.loads(client.get('/api/v1/books?title=Other_').data)
+        assert [book['title'] for book in data['books']] == ['Other_Title']
+        
+        data = json.loads(client.get('/api/v1/books?available=false').data)
+        assert data['books'] == []
+    
+    def test_list_books_fields(self, client):
+        """Test returning only the requested fields, paginating without the id."""
+        self._create_books(client, 3)
+        
+        data = json.loads(client.get('/api/v1/books?fields=title,available&limit=2').data)
+        assert data['books'] == [{'title': 'Book 0', 'available': True},
+                                 {'title': 'Book 1', 'available': True}]
+        assert data['next_cursor'] is not None
+        
+        response = client.get('/api/v1/books?fields=title,secret')
+        assert response.status_code == 400
+    
+    def test_list_books_invalid_limit(self, client):
+        """Test that an invalid limit is rejected."""
+        response = client.get('/api/v1/books?limit=0')
+        assert response.status_code == 400
+
+class TestBookSearchAPI:
+    """Test cases for full-text book search."""
+    
+    @pytest.fixture
+    def books(self, client):
+        for book_data in [
+            {'title': 'The Great Gatsby', 'author': 'F. Scott Fitzgerald', 'isbn': '978-0-7432-7356-5'},
+            {'title': 'Great Expectations', 'author': 'Charles Dickens'},
+            {'title': 'Tender Is the Night', 'author': 'F. Scott Fitzgerald'},
+        ]:
+            client.post('/api/v1/books',
+                        data=json.dumps(book_data),
+                        content_type='application/json')
+    
+    def _titles(self, client, query):
+        response = client.get(f'/api/v1/books/search?{query}')
+        assert response.status_code == 200
+        return [book['title'] for book in json.loads(response.data)['books']]
+    
+    def test_search_prefix_matching(self, app, client, books):
+        """Test that search terms match as prefixes across columns."""
+        assert app.config['BOOK_SEARCH_FTS']
+        assert sorted(self._titles(client, 'q=great')) == ['Great Expectations', 'The Great Gatsby']
+        assert self._titles(client, 'q=fitz+gats') == ['The Great Gatsby']
+        assert self._titles(client, 'q=978-0-7432') == ['The Great Gatsby']
+    
+    def test_search_index_follows_updates(self, client, books):
+        """Test that the index is kept in sync on update and delete."""
+        data = json.loads(client.get('/api/v1/books/search?q=tender').data)
+        book_id = data['books'][0]['id']
+        
+        client.put(f'/api/v1/books/{book_id}',
+                   data=json.dumps({'title': 'The Last Tycoon'}),
+                   content_type='application/json')
+        assert self._titles(client, 'q=tender') == []
+        assert self._titles(client, 'q=tycoon') == ['The Last Tycoon']
+        
+        client.delete(f'/api/v1/books/{book_id}')
+        assert self._titles(client, 'q=tycoon') == []
+    
+    def test_search_pagination(self, client, books):
+        """Test paging through ranked results with the offset."""
+        data = json.loads(client.get('/api/v1/books/search?q=great&limit=1').data)
+        assert len(data['books']) == 1
+        assert data['next_offset'] == 1
+        
+        data = json.loads(client.get('/api/v1/books/search?q=great&limit=1&offset=1').data)
+        assert len(data['books']) == 1
+        assert data['next_offset'] is None
+    
+    def test_search_like_fallback(self, app, client, books):
+        """Test the LIKE fallback used without FTS5."""
+        app.config['BOOK_SEARCH_FTS'] = False
+        assert self._titles(client, 'q=great') == ['The Great Gatsby', 'Great Expectations']
+        assert self._titles(client, 'q=dickens') == ['Great Expectations']
+    
+    def test_search_requires_query(self, client):
+        """Test that a search without terms is rejected."""
+        response = client.get('/api/v1/books/search')
+        assert response.status_code == 400
+
+class TestBookBulkAPI:
+    """Test cases for bulk book import."""
+    
+    def _import(self, client, body, content_type, query=''):
+        response = client.post(f'/api/v1/books/bulk{query}', data=body, content_type=content_type)
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.data.decode().splitlines()]
+        return lines[:-1], lines[-1]['summary']
+    
+    def test_bulk_import_json_array(self, client, sample_book_data):
+        """Test importing a JSON array with ISBN conflicts and invalid rows."""
+        client.post('/api/v1/books', data=json.dumps(sample_book_data),
+                    content_type='application/json')
+        rows = [
+            {'title': 'First', 'author': 'A', 'isbn': '111'},
+            {'title': 'Existing ISBN', 'author': 'B', 'isbn': sample_book_data['isbn']},
+            {'title': '', 'author': 'C'},
+            {'title': 'Duplicate in file', 'author': 'D', 'isbn': '111'},
+            {'title': 'Last', 'author': 'E'},
+        ]
+        results, summary = self._import(client, json.dumps(rows), 'application/json', '?chunk_size=2')
+        
+        assert [r['status'] for r in results] == ['created', 'error', 'error', 'error', 'created']
+        assert [r['row'] for r in results] == [1, 2, 3, 4, 5]
+        assert results[1]['message'] == 'ISBN already exists'
+        assert 'title' in results[2]['errors']
+        assert results[3]['message'] == 'ISBN already exists'
+        assert summary == {'created': 2, 'failed': 3}
+        
+        data = json.loads(client.get('/api/v1/books').data)
+        assert [book['title'] for book in data['books']] == ['Test Book', 'First', 'Last']
+        assert all(book['available'] for book in data['books'])
+    
+    def test_bulk_import_ndjson(self, client):
+        """Test importing NDJSON with a malformed line."""
+        body = '{"title": "One", "author": "A"}\n{not json\n\n{"title": "Two", "author": "B"}\n'
+        results, summary = self._import(client, body, 'application/x-ndjson')
+        
+        assert [(r['row'], r['status']) for r in results] == [(1, 'created'), (2, 'error'), (3, 'created')]
+        assert summary == {'created': 2, 'failed': 1}
+    
+    def test_bulk_import_csv(self, client):
+        """Test importing CSV with an optional ISBN column."""
+        body = 'title,author,isbn\n"Title, with comma",Author One,222\nNo ISBN,Author Two,\n'
+        results, summary = self._import(client, body, 'text/csv')
+        
+        assert summary == {'created': 2, 'failed': 0}
+        data = json.loads(client.get('/api/v1/books').data)
+        assert [(book['title'], book['isbn']) for book in data['books']] == [
+            ('Title, with comma', '222'), ('No ISBN', None)
+        ]
+    
+    def test_bulk_import_unsupported_content_type(self, client):
+        """Test that unknown body formats are rejected."""
+        response = client.post('/api/v1/books/bulk', data='x', content_type='text/plain')
+        assert response.status_code == 415
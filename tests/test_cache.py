@@ -0,0 +1,123 @@
+import pytest
+import json
+from app import create_app, db, cache
+from app.utils.cache import LRUCache, RedisCache
+
+class FakeRedis:
+    """In-memory stand-in for the subset of the redis client the cache uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode('utf-8')
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in self.data if key.startswith(match.rstrip('*'))]
+
+    def info(self, section):
+        return {'evicted_keys': 0}
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture(params=['lru', 'redis'])
+def app(request):
+    """Create application for testing with each cache backend."""
+    app = create_app('testing')
+    if request.param == 'redis':
+        cache.init_app(app, backend=RedisCache(FakeRedis()))
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client."""
+    return app.test_client()
+
+class TestLRUCache:
+    """Test cases for the in-process LRU backend."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the size bound evicts the least recently used key."""
+        lru = LRUCache(max_size=2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        assert lru.get('a') == 1
+        lru.set('c', 3)
+
+        assert lru.get('b') is None
+        assert lru.get('a') == 1 and lru.get('c') == 3
+        assert lru.stats() == {'backend': 'lru', 'hits': 3, 'misses': 1, 'evictions': 1, 'size': 2}
+
+    def test_entries_expire(self):
+        """Test that entries expire after the TTL."""
+        clock = FakeClock()
+        lru = LRUCache(ttl=10, clock=clock)
+        lru.set('a', 1)
+        clock.now = 9
+        assert lru.get('a') == 1
+        clock.now = 10
+        assert lru.get('a') is None
+        assert lru.stats()['size'] == 0
+
+class TestCachedLookups:
+    """Test cases for cached book and member lookups."""
+
+    def test_repeated_gets_hit_cache(self, client, book_id, member_id):
+        """Test that repeated lookups are served from the cache."""
+        for _ in range(3):
+            assert client.get(f'/api/v1/books/{book_id}').status_code == 200
+            assert client.get(f'/api/v1/members/{member_id}').status_code == 200
+        assert client.get(f'/api/v1/books/{book_id + 1}').status_code == 404
+
+        stats = json.loads(client.get('/api/v1/stats/cache').data)
+        assert stats['hits'] == 4
+        assert stats['misses'] == 3
+
+    def test_writes_invalidate(self, client, book_id, member_id):
+        """Test that updates, borrows and returns invalidate cached entries."""
+        def get_book():
+            return json.loads(client.get(f'/api/v1/books/{book_id}').data)
+
+        def post(url, payload):
+            return json.loads(client.post(url, data=json.dumps(payload),
+                                          content_type='application/json').data)
+
+        assert get_book()['available'] is True
+        client.put(f'/api/v1/books/{book_id}', data=json.dumps({'title': 'New Title'}),
+                   content_type='application/json')
+        assert get_book()['title'] == 'New Title'
+
+        loan = post('/api/v1/loans', {'book_id': book_id, 'member_id': member_id})
+        assert get_book()['available'] is False
+        post('/api/v1/returns', {'loan_id': loan['loan_id']})
+        assert get_book()['available'] is True
+
+        post('/api/v1/loans/batch', {'member_id': member_id, 'book_ids': [book_id]})
+        assert get_book()['available'] is False
+
+        client.get(f'/api/v1/members/{member_id}')
+        client.put(f'/api/v1/members/{member_id}', data=json.dumps({'name': 'Janet'}),
+                   content_type='application/json')
+        assert json.loads(client.get(f'/api/v1/members/{member_id}').data)['name'] == 'Janet'
+
+    def test_delete_invalidates(self, client, book_id):
+        """Test that a deleted book is no longer served from the cache."""
+        assert client.get(f'/api/v1/books/{book_id}').status_code == 200
+        assert client.delete(f'/api/v1/books/{book_id}').status_code == 200
+        assert client.get(f'/api/v1/books/{book_id}').status_code == 404
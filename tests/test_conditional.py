@@ -0,0 +1,81 @@
+import json
+from tests.helpers import post
+
+class TestConditionalRequests:
+    """Test cases for ETag and Last-Modified support."""
+
+    def test_book_detail(self, client):
+        """Test that an unchanged book is answered with 304 until it changes."""
+        _, book = post(client, '/api/v1/books', {'title': 'Book', 'author': 'Author'})
+        book_id = book['id']
+        url = f'/api/v1/books/{book_id}'
+
+        response = client.get(url)
+        etag = response.headers['ETag']
+        last_modified = response.headers['Last-Modified']
+
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+
+        response = client.get(url, headers={'If-Modified-Since': last_modified})
+        assert response.status_code == 304
+
+        client.put(url, data=json.dumps({'title': 'New Title'}), content_type='application/json')
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert json.loads(response.data)['title'] == 'New Title'
+
+    def test_if_none_match_forms(self, client):
+        """Test that weak tags, * and lists without spaces match."""
+        _, book = post(client, '/api/v1/books', {'title': 'Book', 'author': 'Author'})
+        url = f"/api/v1/books/{book['id']}"
+        etag = client.get(url).headers['ETag']
+
+        for if_none_match in ['W/' + etag, '*', '"other",' + etag]:
+            assert client.get(url, headers={'If-None-Match': if_none_match}).status_code == 304
+        assert client.get(url, headers={'If-None-Match': '"other"'}).status_code == 200
+
+    def test_member_detail(self, client):
+        """Test conditional requests on a member."""
+        _, member = post(client, '/api/v1/members', {'name': 'Jane', 'email': 'jane@example.com'})
+        member_id = member['id']
+        url = f'/api/v1/members/{member_id}'
+
+        etag = client.get(url).headers['ETag']
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+        assert client.get(url, headers={'If-None-Match': '"other"'}).status_code == 200
+
+    def test_book_list(self, client):
+        """Test that the list ETag changes on inserts, updates and deletes."""
+        book_ids = [post(client, '/api/v1/books', {'title': f'Book {i}', 'author': 'Author'})[1]['id']
+                    for i in range(2)]
+
+        def get(etag):
+            return client.get('/api/v1/books?limit=1', headers={'If-None-Match': etag})
+
+        etag = client.get('/api/v1/books?limit=1').headers['ETag']
+        assert get(etag).status_code == 304
+        assert 'Last-Modified' not in get(etag).headers
+        assert client.get('/api/v1/books?limit=2', headers={'If-None-Match': etag}).status_code == 200
+
+        client.delete(f'/api/v1/books/{book_ids[1]}')
+        response = get(etag)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+
+        post(client, '/api/v1/books', {'title': 'Book 3', 'author': 'Author'})
+        response = get(etag)
+        assert response.status_code == 200
+        assert get(response.headers['ETag']).status_code == 304
+
+    def test_member_list(self, client):
+        """Test conditional requests on the member list."""
+        post(client, '/api/v1/members', {'name': 'Jane', 'email': 'jane@example.com'})
+        etag = client.get('/api/v1/members').headers['ETag']
+        assert client.get('/api/v1/members', headers={'If-None-Match': etag}).status_code == 304
+
+        post(client, '/api/v1/members', {'name': 'John', 'email': 'john@example.com'})
+        assert client.get('/api/v1/members', headers={'If-None-Match': etag}).status_code == 200
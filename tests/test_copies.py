@@ -0,0 +1,103 @@
+import pytest
+import json
+from app import db
+from app.models import Copy, Hold, StatsCounter
+from app.services.stats_service import StatsService
+from tests.helpers import post
+
+def get_book(client, book_id):
+    return json.loads(client.get(f'/api/v1/books/{book_id}').data)
+
+@pytest.fixture
+def book_id(client):
+    """Create a book with two copies."""
+    _, book = post(client, '/api/v1/books', {'title': 'Popular Book', 'author': 'Author', 'copies': 2})
+    return book['id']
+
+class TestCopies:
+    """Test cases for lending the copies of a book and keeping its counts."""
+
+    def test_lends_each_copy_once(self, client, book_id, member_ids):
+        """Test that a book is lent until its copies run out, one loan per copy."""
+        book = get_book(client, book_id)
+        assert (book['available'], book['available_count'], book['copy_count']) == (True, 2, 2)
+
+        loans = [post(client, '/api/v1/loans', {'book_id': book_id, 'member_id': member_id})
+                 for member_id in member_ids[:3]]
+        assert [status for status, _ in loans] == [201, 201, 409]
+        assert len({loan['copy_id'] for _, loan in loans[:2]}) == 2
+        book = get_book(client, book_id)
+        assert (book['available'], book['available_count']) == (False, 0)
+
+        post(client, '/api/v1/returns', {'loan_id': loans[0][1]['loan_id']})
+        book = get_book(client, book_id)
+        assert (book['available'], book['available_count']) == (True, 1)
+        assert db.session.get(Copy, loans[0][1]['copy_id']).status == 'available'
+
+    def test_listing_filters_on_counts(self, client, book_id, member_ids):
+        """Test that the availability filter follows the last copy on the shelf."""
+        post(client, '/api/v1/loans/batch', {'member_id': member_ids[0], 'book_ids': [book_id]})
+        page = json.loads(client.get('/api/v1/books?available=true').data)
+        assert [book['available_count'] for book in page['books']] == [1]
+
+        post(client, '/api/v1/loans', {'book_id': book_id, 'member_id': member_ids[1]})
+        page = json.loads(client.get('/api/v1/books?available=true').data)
+        assert page['books'] == []
+
+    def test_returned_copy_goes_to_hold(self, client, book_id, member_ids):
+        """Test that holds wait for every copy and get the copy returned first."""
+        loans = [post(client, '/api/v1/loans', {'book_id': book_id, 'member_id': member_id})[1]
+                 for member_id in member_ids[:2]]
+        status, _ = post(client, f'/api/v1/books/{book_id}/holds', {'member_id': member_ids[2]})
+        assert status == 201
+
+        post(client, '/api/v1/returns', {'loan_id': loans[1]['loan_id']})
+        hold = Hold.query.filter_by(status='ready').one()
+        assert hold.copy_id == loans[1]['copy_id']
+        assert db.session.get(Copy, hold.copy_id).status == 'held'
+        assert get_book(client, book_id)['available_count'] == 0
+
+        status, loan = post(client, '/api/v1/loans', {'book_id': book_id, 'member_id': member_ids[2]})
+        assert (status, loan['copy_id']) == (201, hold.copy_id)
+
+    def test_add_and_withdraw(self, client, book_id, member_ids):
+        """Test adding copies and withdrawing only those on the shelf."""
+        status, data = post(client, f'/api/v1/books/{book_id}/copies', {'count': 2})
+        assert (status, len(data['copies'])) == (201, 2)
+        _, loan = post(client, '/api/v1/loans', {'book_id': book_id, 'member_id': member_ids[0]})
+
+        response = client.delete(f"/api/v1/books/{book_id}/copies/{loan['copy_id']}")
+        assert response.status_code == 409
+        response = client.delete(f"/api/v1/books/{book_id}/copies/{data['copies'][0]['id']}")
+        assert response.status_code == 200
+        assert client.delete(f"/api/v1/books/{book_id}/copies/{data['copies'][0]['id']}").status_code == 404
+
+        copies = json.loads(client.get(f'/api/v1/books/{book_id}/copies').data)['copies']
+        assert len(copies) == 3
+        book = get_book(client, book_id)
+        assert (book['available_count'], book['copy_count']) == (2, 3)
+
+        counters = {name: db.session.get(StatsCounter, name).value for name in ('total_copies', 'available_copies')}
+        StatsService.reconcile()
+        assert counters == {name: db.session.get(StatsCounter, name).value for name in counters}
+
+    def test_added_copy_goes_to_hold(self, client, book_id, member_ids):
+        """Test that new copies go to the hold queue before the shelf."""
+        for member_id in member_ids[:2]:
+            post(client, '/api/v1/loans', {'book_id': book_id, 'member_id': member_id})
+        post(client, f'/api/v1/books/{book_id}/holds', {'member_id': member_ids[2]})
+
+        status, data = post(client, f'/api/v1/books/{book_id}/copies', {'count': 2})
+        assert status == 201
+        assert [copy['status'] for copy in data['copies']] == ['held', 'available']
+        hold = Hold.query.filter_by(status='ready').one()
+        assert hold.copy_id == data['copies'][0]['id']
+        book = get_book(client, book_id)
+        assert (book['available_count'], book['copy_count']) == (1, 4)
+
+        status, loan = post(client, '/api/v1/loans', {'book_id': book_id, 'member_id': member_ids[2]})
+        assert (status, loan['copy_id']) == (201, hold.copy_id)
+
+        counters = {name: db.session.get(StatsCounter, name).value for name in ('total_copies', 'available_copies')}
+        StatsService.reconcile()
+        assert counters == {name: db.session.get(StatsCounter, name).value for name in counters}
@@ -0,0 +1,96 @@
+import pytest
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+from app import db
+from app.models import Book, Member, Loan
+from app.services.loan_service import LoanService
+
+@pytest.fixture
+def library(app):
+    """Create a few books, a member and a loan."""
+    books = [Book(title=f'Book {i}', author='Author', isbn=str(i)) for i in range(3)]
+    member = Member(name='Jane Doe', email='jane@example.com')
+    for book in books:
+        book.add_copies()
+    db.session.add_all(books + [member])
+    db.session.flush()
+    db.session.add(Loan(book_id=books[0].id, copy_id=books[0].copies[0].id, member_id=member.id))
+    db.session.commit()
+
+class TestExportAPI:
+    """Test cases for streaming exports."""
+    
+    def test_export_books_ndjson(self, client, library):
+        """Test exporting books as NDJSON."""
+        response = client.get('/api/v1/books/export')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        
+        rows = [json.loads(line) for line in response.data.decode().splitlines()]
+        assert [row['title'] for row in rows] == ['Book 0', 'Book 1', 'Book 2']
+        assert set(rows[0]) == {'id', 'title', 'author', 'isbn', 'available', 'available_count',
+                                'copy_count', 'created_at', 'updated_at'}
+    
+    def test_export_members_csv(self, client, library):
+        """Test exporting members as CSV."""
+        response = client.get('/api/v1/members/export?format=csv')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        
+        rows = list(csv.DictReader(io.StringIO(response.data.decode())))
+        assert len(rows) == 1
+        assert rows[0]['email'] == 'jane@example.com'
+    
+    def test_export_loans_gzip(self, client, library):
+        """Test that exports are gzip-compressed when the client accepts it."""
+        response = client.get('/api/v1/loans/export', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        
+        rows = [json.loads(line) for line in gzip.decompress(response.data).decode().splitlines()]
+        assert len(rows) == 1
+        assert rows[0]['status'] == 'active'
+    
+    def test_export_loans_include_archived(self, app, client, library):
+        """Test that loans moved to the loan history are still exported, in ID order."""
+        long_ago = datetime.utcnow() - timedelta(days=400)
+        book = Book.query.filter_by(title='Book 1').first()
+        loan = Loan(book_id=book.id, copy_id=book.copies[0].id, member_id=Member.query.first().id,
+                    borrowed_at=long_ago, due_at=long_ago, returned_at=long_ago,
+                    status='returned', updated_at=long_ago)
+        db.session.add(loan)
+        db.session.commit()
+        loan_id = loan.id
+        assert LoanService.archive_returned()[0] == {'archived': 1}
+        
+        response = client.get('/api/v1/loans/export?format=csv')
+        rows = list(csv.DictReader(io.StringIO(response.data.decode())))
+        assert [(int(row['id']), row['status']) for row in rows] == [(loan_id - 1, 'active'), (loan_id, 'returned')]
+        
+        since = (long_ago + timedelta(days=1)).isoformat()
+        rows = [json.loads(line) for line in client.get(f'/api/v1/loans/export?since={since}').data.decode().splitlines()]
+        assert [row['status'] for row in rows] == ['active']
+    
+    def test_export_since(self, client, library):
+        """Test incremental exports filtered by updated_at."""
+        book = Book.query.filter_by(title='Book 1').first()
+        book.title = 'Book 1 revised'
+        db.session.commit()
+        since = (book.updated_at - timedelta(microseconds=1)).isoformat()
+        
+        Book.query.filter(Book.id != book.id).update(
+            {'updated_at': datetime.utcnow() - timedelta(days=1)}
+        )
+        db.session.commit()
+        
+        response = client.get(f'/api/v1/books/export?since={since}')
+        rows = [json.loads(line) for line in response.data.decode().splitlines()]
+        assert [row['title'] for row in rows] == ['Book 1 revised']
+    
+    def test_export_invalid_format(self, client):
+        """Test that unknown export formats are rejected."""
+        response = client.get('/api/v1/books/export?format=xml')
+        assert response.status_code == 400
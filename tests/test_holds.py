@@ -0,0 +1,161 @@
+import pytest
+import json
+from datetime import datetime, timedelta
+from app import db
+from app.models import Book, Copy, Member, Hold, StatsCounter
+from app.services.book_service import BookService
+from app.services.hold_service import HoldService
+from sqlalchemy import event
+from tests.helpers import post
+
+@pytest.fixture
+def book_id(app):
+    """Create an available book, counted in the statistics."""
+    book, _ = BookService.create_book({'title': 'Popular Book', 'author': 'Author'})
+    return book.id
+
+def book_available(book_id):
+    db.session.expire_all()
+    return db.session.get(Book, book_id).available
+
+class TestHoldQueue:
+    """Test cases for placing holds and passing returned books down the queue."""
+
+    @pytest.fixture
+    def loan_id(self, client, book_id, member_ids):
+        """Lend the book to the first member and queue the others."""
+        _, loan = post(client, '/api/v1/loans', {'book_id': book_id, 'member_id': member_ids[0]})
+        for member_id in member_ids[1:]:
+            post(client, f'/api/v1/books/{book_id}/holds', {'member_id': member_id})
+        return loan['loan_id']
+
+    def test_place_hold(self, client, book_id, member_ids):
+        """Test that holds are only placed on books on loan, once per member."""
+        url = f'/api/v1/books/{book_id}/holds'
+        status, data = post(client, url, {'member_id': member_ids[1]})
+        assert (status, data['message']) == (409, 'Book is available for borrowing')
+
+        post(client, '/api/v1/loans', {'book_id': book_id, 'member_id': member_ids[0]})
+        status, data = post(client, url, {'member_id': member_ids[1]})
+        assert status == 201
+        assert (data['status'], data['position']) == ('waiting', 1)
+
+        assert post(client, url, {'member_id': member_ids[1]})[0] == 409
+        assert post(client, url, {'member_id': member_ids[0]})[0] == 409
+        assert post(client, url, {'member_id': 9999})[0] == 404
+        assert post(client, '/api/v1/books/9999/holds', {'member_id': member_ids[1]})[0] == 404
+
+    def test_list_queue(self, client, book_id, member_ids, loan_id):
+        """Test that the queue is listed in order with positions across pages."""
+        page = json.loads(client.get(f'/api/v1/books/{book_id}/holds?limit=2').data)
+        assert [hold['member_id'] for hold in page['holds']] == member_ids[1:3]
+        assert [hold['position'] for hold in page['holds']] == [1, 2]
+
+        page = json.loads(client.get(f"/api/v1/books/{book_id}/holds?cursor={page['next_cursor']}").data)
+        assert [(hold['member_id'], hold['position']) for hold in page['holds']] == [(member_ids[3], 3)]
+        assert page['next_cursor'] is None
+        assert client.get('/api/v1/books/9999/holds').status_code == 404
+
+    def test_return_sets_book_aside(self, client, book_id, member_ids, loan_id):
+        """Test that a returned book goes to the head of the queue only."""
+        post(client, '/api/v1/returns', {'loan_id': loan_id})
+        assert book_available(book_id) is False
+        hold = Hold.query.filter_by(book_id=book_id, status='ready').one()
+        assert hold.member_id == member_ids[1]
+        assert hold.expires_at == hold.ready_at + timedelta(days=3)
+
+        status, data = post(client, '/api/v1/loans', {'book_id': book_id, 'member_id': member_ids[2]})
+        assert (status, data['message']) == (409, 'Book is reserved for another member')
+
+        status, _ = post(client, '/api/v1/loans', {'book_id': book_id, 'member_id': member_ids[1]})
+        assert status == 201
+        db.session.expire_all()
+        assert db.session.get(Hold, hold.id).status == 'fulfilled'
+
+        # Two left in the queue, and the book was never on the shelf
+        page = json.loads(client.get(f'/api/v1/books/{book_id}/holds').data)
+        assert [hold['member_id'] for hold in page['holds']] == member_ids[2:]
+        assert db.session.get(StatsCounter, 'available_copies').value == 0
+
+    def test_batch_return_and_borrow(self, client, book_id, member_ids, loan_id):
+        """Test that batch returns and borrows go through the queue as well."""
+        post(client, '/api/v1/returns/batch', {'loan_ids': [loan_id]})
+        assert Hold.query.filter_by(status='ready').one().member_id == member_ids[1]
+
+        status, data = post(client, '/api/v1/loans/batch', {'member_id': member_ids[1], 'book_ids': [book_id]})
+        assert status == 201
+        assert Hold.query.filter_by(status='ready').count() == 0
+
+    def test_cancel_ready_hold(self, client, book_id, member_ids, loan_id):
+        """Test that cancelling a ready hold passes the book to the next in line."""
+        post(client, '/api/v1/returns', {'loan_id': loan_id})
+        hold_id = Hold.query.filter_by(status='ready').one().id
+
+        response = client.delete(f'/api/v1/books/{book_id}/holds/{hold_id}')
+        assert json.loads(response.data)['status'] == 'cancelled'
+        assert Hold.query.filter_by(status='ready').one().member_id == member_ids[2]
+        assert client.delete(f'/api/v1/books/{book_id}/holds/{hold_id}').status_code == 409
+
+    def test_expiry(self, app, client, book_id, member_ids, loan_id):
+        """Test that uncollected holds expire down the queue until the book is released."""
+        post(client, '/api/v1/returns', {'loan_id': loan_id})
+        later = datetime.utcnow() + timedelta(days=4)
+
+        for member_id in member_ids[2:]:
+            assert HoldService.expire_holds(now=later) == ({'expired': 1, 'released': 0}, None)
+            assert Hold.query.filter_by(status='ready').one().member_id == member_id
+            later += timedelta(days=4)
+
+        result = app.test_cli_runner().invoke(args=['holds', 'expire'])
+        assert 'Expired 0 holds' in result.output
+        assert HoldService.expire_holds(now=later) == ({'expired': 1, 'released': 1}, None)
+        assert book_available(book_id) is True
+        assert db.session.get(StatsCounter, 'available_copies').value == 1
+
+    def test_promotion_cost_independent_of_queue_length(self, client, book_id, member_ids):
+        """Test that returning a book issues the same statements for any queue length."""
+        def statements_for_return(queue_length):
+            members = [Member(name='Patron', email=f'patron{queue_length}-{i}@example.com')
+                       for i in range(queue_length)]
+            db.session.add_all(members)
+            db.session.commit()
+            _, loan = post(client, '/api/v1/loans', {'book_id': book_id, 'member_id': member_ids[0]})
+            for member in members:
+                HoldService.place_hold(book_id, member.id)
+
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                post(client, '/api/v1/returns', {'loan_id': loan['loan_id']})
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+
+            # Clear the queue for the next round
+            Hold.query.filter_by(book_id=book_id).update({'status': 'cancelled'})
+            Copy.query.filter_by(book_id=book_id).update({'status': 'available'})
+            Book.query.filter_by(id=book_id).update({'available_count': 1, 'available': True})
+            db.session.commit()
+            return statements
+
+        assert len(statements_for_return(1)) == len(statements_for_return(200))
+
+    def test_batch_return_cost_without_queues(self, client, member_ids):
+        """Test that returning copies nobody waits for issues the same statements for any number."""
+        def statements_for_return(count):
+            book_ids = [BookService.create_book({'title': f'Book {i}', 'author': 'Author'})[0].id
+                        for i in range(count)]
+            loan_ids = [post(client, '/api/v1/loans', {'book_id': book_id, 'member_id': member_ids[count]})[1]['loan_id']
+                        for book_id in book_ids]
+
+            statements = []
+            listener = lambda *args: statements.append(args[2])
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                status, _ = post(client, '/api/v1/returns/batch', {'loan_ids': loan_ids})
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+            assert status == 200
+            return statements
+
+        assert len(statements_for_return(1)) == len(statements_for_return(3))
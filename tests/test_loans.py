@@ -0,0 +1,571 @@
+import pytest
+import json
+import threading
+from datetime import datetime, timedelta
+from app import create_app, db
+from app.config import TestingConfig
+from app.models import Book, Copy, Member, Loan, LoanHistory, StatsCounter
+from app.services.loan_service import LoanService
+from sqlalchemy import event
+from tests.helpers import post
+
+def borrow(client, book_id, member_id):
+    return client.post('/api/v1/loans',
+                       data=json.dumps({'book_id': book_id, 'member_id': member_id}),
+                       content_type='application/json')
+
+class TestLoanAPI:
+    """Test cases for borrowing and returning books."""
+    
+    def test_borrow_and_return(self, client, book_id, member_id):
+        """Test borrowing a book and returning it."""
+        response = borrow(client, book_id, member_id)
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        assert data['status'] == 'active'
+        assert db.session.get(Book, book_id).available is False
+        
+        response = client.post('/api/v1/returns',
+                               data=json.dumps({'loan_id': data['loan_id']}),
+                               content_type='application/json')
+        assert response.status_code == 200
+        assert json.loads(response.data)['status'] == 'returned'
+        assert db.session.get(Book, book_id).available is True
+    
+    def test_borrow_unavailable_book(self, client, book_id, member_id):
+        """Test that a borrowed book cannot be borrowed again."""
+        assert borrow(client, book_id, member_id).status_code == 201
+        
+        response = borrow(client, book_id, member_id)
+        assert response.status_code == 409
+        assert Loan.query.count() == 1
+    
+    def test_borrow_not_found(self, client, book_id, member_id):
+        """Test borrowing with an unknown book or member."""
+        assert borrow(client, book_id + 1, member_id).status_code == 404
+        assert borrow(client, book_id, member_id + 1).status_code == 404
+        
+        # A failed borrow must not leave the book claimed
+        assert db.session.get(Book, book_id).available is True
+    
+    def test_open_loan_unique_per_copy(self, app, book_id, member_id):
+        """Test that the database rejects a second open loan for a copy."""
+        copy_id = Copy.query.filter_by(book_id=book_id).one().id
+        db.session.add(Loan(book_id=book_id, copy_id=copy_id, member_id=member_id, status='active'))
+        db.session.commit()
+        
+        # Copy status out of sync with the loans table
+        _, error = LoanService.borrow_book({'book_id': book_id, 'member_id': member_id})
+        assert error == "Book is already borrowed"
+    
+    def test_borrow_statements(self, app, book_id, member_id):
+        """Test that a borrow without holds skips the hold lookup and counts in one upsert."""
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            _, error = LoanService.borrow_book({'book_id': book_id, 'member_id': member_id})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        
+        assert error is None
+        assert not any(statement.lstrip().startswith('SELECT') and 'holds' in statement for statement in statements)
+        assert sum('stats_counters' in statement for statement in statements) == 1
+        assert len(statements) == 6
+        assert db.session.get(StatsCounter, 'active_loans').value == 1
+
+class TestLoanBatchAPI:
+    """Test cases for batch borrows and returns."""
+    
+    @pytest.fixture
+    def book_ids(self, app):
+        books = [Book(title=f'Book {i}', author='Author') for i in range(3)]
+        for book in books:
+            book.add_copies()
+        db.session.add_all(books)
+        db.session.commit()
+        return [book.id for book in books]
+    
+    def _post(self, client, url, payload):
+        status, data = post(client, url, payload)
+        return status, data['results']
+    
+    def test_batch_borrow_and_return(self, client, book_ids, member_id):
+        """Test borrowing and returning several books at once."""
+        status, results = self._post(client, '/api/v1/loans/batch',
+                                     {'member_id': member_id, 'book_ids': book_ids})
+        assert status == 201
+        assert [result['book_id'] for result in results] == book_ids
+        assert all(result['status_code'] == 201 for result in results)
+        assert Book.query.filter_by(available=True).count() == 0
+        
+        loan_ids = [result['loan_id'] for result in results]
+        status, results = self._post(client, '/api/v1/returns/batch', {'loan_ids': loan_ids})
+        assert status == 200
+        assert [result['status'] for result in results] == ['returned'] * 3
+        assert Book.query.filter_by(available=True).count() == 3
+    
+    def test_batch_borrow_all_or_nothing(self, client, book_ids, member_id):
+        """Test that one failing item stops the whole batch by default."""
+        borrow(client, book_ids[1], member_id)
+        
+        status, results = self._post(client, '/api/v1/loans/batch',
+                                     {'member_id': member_id, 'book_ids': book_ids + [9999]})
+        assert status == 207
+        assert [result['status_code'] for result in results] == [424, 409, 424, 404]
+        assert Loan.query.count() == 1
+        assert db.session.get(Book, book_ids[0]).available is True
+    
+    def test_batch_borrow_best_effort(self, client, book_ids, member_id):
+        """Test that best-effort batches apply every item that succeeds."""
+        borrow(client, book_ids[1], member_id)
+        
+        status, results = self._post(client, '/api/v1/loans/batch', {
+            'member_id': member_id,
+            'book_ids': [book_ids[0], book_ids[1], book_ids[0]],
+            'mode': 'best_effort'
+        })
+        assert status == 207
+        assert [result['status_code'] for result in results] == [201, 409, 409]
+        assert Loan.query.count() == 2
+    
+    def test_batch_borrow_unknown_member(self, client, book_ids, member_id):
+        """Test that every item fails for an unknown member."""
+        status, results = self._post(client, '/api/v1/loans/batch',
+                                     {'member_id': member_id + 1, 'book_ids': book_ids})
+        assert status == 207
+        assert {result['message'] for result in results} == {'Member not found'}
+    
+    def test_batch_return_best_effort(self, client, book_ids, member_id):
+        """Test returning a mix of active, returned and unknown loans."""
+        loan_id = json.loads(borrow(client, book_ids[0], member_id).data)['loan_id']
+        returned_id = json.loads(borrow(client, book_ids[1], member_id).data)['loan_id']
+        self._post(client, '/api/v1/returns/batch', {'loan_ids': [returned_id]})
+        
+        status, results = self._post(client, '/api/v1/returns/batch', {
+            'loan_ids': [loan_id, returned_id, 9999],
+            'mode': 'best_effort'
+        })
+        assert status == 207
+        assert [result['status_code'] for result in results] == [200, 409, 404]
+        assert Book.query.filter_by(available=True).count() == 3
+
+class TestLoanListAPI:
+    """Test cases for listing loans."""
+    
+    @pytest.fixture
+    def loans(self, app):
+        """Create five members with two loans each, one of them returned."""
+        for i in range(5):
+            member = Member(name=f'Member {i}', email=f'member{i}@example.com')
+            books = [Book(title=f'Book {i}-{j}', author='Author') for j in range(2)]
+            for book in books:
+                book.add_copies()
+            db.session.add_all([member] + books)
+            db.session.flush()
+            db.session.add(Loan(book=books[0], copy=books[0].copies[0], member=member))
+            db.session.add(Loan(book=books[1], copy=books[1].copies[0], member=member, status='returned'))
+        db.session.commit()
+    
+    def _get(self, client, query):
+        response = client.get(f'/api/v1/loans?{query}')
+        assert response.status_code == 200
+        return json.loads(response.data)
+    
+    def test_filters_and_pagination(self, client, loans):
+        """Test status and member filters and cursor pagination."""
+        page = self._get(client, 'status=active&limit=3')
+        assert len(page['loans']) == 3
+        assert all(loan['status'] == 'active' for loan in page['loans'])
+        assert 'book' not in page['loans'][0]
+        
+        page = self._get(client, f"status=active&cursor={page['next_cursor']}")
+        assert len(page['loans']) == 2
+        assert page['next_cursor'] is None
+        
+        member_id = page['loans'][0]['member_id']
+        page = self._get(client, f'member_id={member_id}')
+        assert {loan['status'] for loan in page['loans']} == {'active', 'returned'}
+    
+    def test_expand_uses_fixed_query_count(self, app, client, loans):
+        """Test that expanded loans are fetched without a query per loan."""
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            page = self._get(client, 'status=active&expand=book,member')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        
+        assert len(page['loans']) == 5
+        assert all(loan['book']['id'] == loan['book_id'] for loan in page['loans'])
+        assert all(loan['member']['id'] == loan['member_id'] for loan in page['loans'])
+        assert len(statements) == 1
+    
+    def test_fields_with_expand(self, client, loans):
+        """Test projecting loan fields alongside expanded members."""
+        page = self._get(client, 'status=active&fields=id,status&expand=member&limit=2')
+        assert [sorted(loan) for loan in page['loans']] == [['id', 'member', 'status']] * 2
+        assert page['loans'][0]['member']['name'] == 'Member 0'
+        assert page['next_cursor'] == page['loans'][-1]['id']
+    
+    def test_invalid_expand(self, client, loans):
+        """Test that unknown expansions are rejected."""
+        assert client.get('/api/v1/loans?expand=fines').status_code == 400
+
+class TestOverdueLoans:
+    """Test cases for due dates, the overdue sweep and fines."""
+    
+    @pytest.fixture
+    def loans(self, app, member_id):
+        """Create loans due at various times, returning their IDs by name."""
+        now = datetime.utcnow()
+        due = {
+            'not_due': ('standard', now + timedelta(days=1)),
+            'two_days': ('standard', now - timedelta(days=2, hours=1)),
+            'capped': ('standard', now - timedelta(days=200)),
+            'short': ('short', now - timedelta(days=3, hours=1))
+        }
+        loans = {}
+        for name, (policy, due_at) in due.items():
+            book = Book(title=name, author='Author', copy_count=1)
+            book.copies.append(Copy(status='on_loan'))
+            db.session.add(book)
+            db.session.flush()
+            loans[name] = Loan(book_id=book.id, copy_id=book.copies[0].id, member_id=member_id, borrowed_at=now - timedelta(days=30),
+                               due_at=due_at, policy=policy)
+        db.session.add_all(loans.values())
+        db.session.commit()
+        return {name: loan.id for name, loan in loans.items()}
+    
+    def _loan(self, loan_id):
+        db.session.expire_all()
+        return db.session.get(Loan, loan_id)
+    
+    def test_borrow_sets_due_date(self, client, book_id, member_id):
+        """Test that the loan policy sets the due date."""
+        response = client.post('/api/v1/loans', data=json.dumps(
+            {'book_id': book_id, 'member_id': member_id, 'policy': 'short'}
+        ), content_type='application/json')
+        assert response.status_code == 201
+        data = json.loads(response.data)
+        due_at = datetime.fromisoformat(data['due_at']) - datetime.fromisoformat(data['borrowed_at'])
+        assert (data['policy'], due_at) == ('short', timedelta(days=7))
+        
+        response = client.post('/api/v1/loans/batch', data=json.dumps(
+            {'member_id': member_id, 'book_ids': [book_id], 'policy': 'forever'}
+        ), content_type='application/json')
+        assert json.loads(response.data)['results'][0]['message'] == 'Unknown loan policy'
+    
+    def test_sweep_marks_overdue_and_accrues_fines(self, app, loans):
+        """Test that the sweep marks loans past due and fines them per policy."""
+        result = app.test_cli_runner().invoke(args=['loans', 'sweep-overdue', '--batch-size', '2'])
+        assert result.exit_code == 0
+        assert 'Marked 3 loans overdue, updated 3 fines' in result.output
+        
+        assert self._loan(loans['not_due']).status == 'active'
+        fines = {name: self._loan(loan_id).fine_cents for name, loan_id in loans.items()}
+        assert fines == {'not_due': 0, 'two_days': 50, 'capped': 2000, 'short': 150}
+        assert db.session.get(StatsCounter, 'overdue_loans').value == 3
+        
+        # Nothing changes until more time passes
+        assert LoanService.sweep_overdue() == ({'marked': 0, 'fined': 0}, None)
+        result, _ = LoanService.sweep_overdue(now=datetime.utcnow() + timedelta(days=1))
+        assert result == {'marked': 1, 'fined': 2}
+        assert self._loan(loans['two_days']).fine_cents == 75
+        assert self._loan(loans['not_due']).fine_cents == 0
+    
+    def test_list_overdue(self, client, loans):
+        """Test that loans past due are listed before and after the sweep."""
+        def overdue_ids(query=''):
+            response = client.get(f'/api/v1/loans/overdue?{query}')
+            assert response.status_code == 200
+            return [loan['id'] for loan in json.loads(response.data)['loans']]
+        
+        expected = [loans['two_days'], loans['capped'], loans['short']]
+        assert overdue_ids() == expected
+        LoanService.sweep_overdue()
+        assert overdue_ids() == expected
+        assert overdue_ids('limit=2&fields=id') == expected[:2]
+        
+        client.post('/api/v1/returns', data=json.dumps({'loan_id': loans['capped']}),
+                    content_type='application/json')
+        assert overdue_ids() == [loans['two_days'], loans['short']]
+        
+        response = client.get('/api/v1/loans?status=active,overdue')
+        assert len(json.loads(response.data)['loans']) == 3
+        assert client.get('/api/v1/loans?status=late').status_code == 400
+    
+    def test_returns_settle_fines(self, client, loans):
+        """Test that returns settle fines and release the overdue count."""
+        LoanService.sweep_overdue()
+        response = client.post('/api/v1/returns', data=json.dumps({'loan_id': loans['short']}),
+                               content_type='application/json')
+        assert json.loads(response.data)['fine_cents'] == 150
+        
+        response = client.post('/api/v1/returns/batch', data=json.dumps(
+            {'loan_ids': [loans['two_days'], loans['not_due']]}
+        ), content_type='application/json')
+        results = json.loads(response.data)['results']
+        assert [result['fine_cents'] for result in results] == [50, 0]
+        assert self._loan(loans['two_days']).fine_cents == 50
+        assert db.session.get(StatsCounter, 'overdue_loans').value == 1
+    
+    def test_fine_expression_matches_calculation(self, app, loans):
+        """Test that the SQL and Python fine calculations agree."""
+        now = datetime.utcnow() + timedelta(days=5)
+        in_sql = dict(db.session.query(Loan.id, LoanService.fine_expression(now)))
+        assert in_sql == {loan.id: LoanService.calculate_fine(loan, now) for loan in Loan.query}
+
+class TestBorrowContention:
+    """Test concurrent borrows of the same book."""
+    
+    @pytest.fixture
+    def app(self, tmp_path, monkeypatch):
+        """Create application backed by a file so threads use separate connections."""
+        monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI',
+                            'sqlite:///' + str(tmp_path / 'contention.db'))
+        app = create_app('testing')
+        yield app
+        with app.app_context():
+            db.drop_all()
+    
+    def test_concurrent_borrows(self, app):
+        """Test that exactly one of many concurrent borrows succeeds."""
+        threads_count = 16
+        with app.app_context():
+            book = Book(title='Popular Book', author='Author')
+            book.add_copies()
+            members = [Member(name=f'Member {i}', email=f'member{i}@example.com')
+                       for i in range(threads_count)]
+            db.session.add_all([book] + members)
+            db.session.commit()
+            book_id = book.id
+            member_ids = [member.id for member in members]
+        
+        barrier = threading.Barrier(threads_count)
+        results = []
+        
+        def worker(member_id):
+            with app.app_context():
+                barrier.wait()
+                _, error = LoanService.borrow_book({'book_id': book_id, 'member_id': member_id})
+                results.append(error)
+                db.session.remove()
+        
+        threads = [threading.Thread(target=worker, args=(member_id,)) for member_id in member_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert results.count(None) == 1
+        assert all(error in (None, "Book is not available for borrowing") for error in results)
+        with app.app_context():
+            assert Loan.query.filter_by(book_id=book_id, status='active').count() == 1
+    
+    def test_concurrent_returns(self, app):
+        """Test that of many concurrent returns of a loan only one is counted."""
+        threads_count = 8
+        with app.app_context():
+            book = Book(title='Popular Book', author='Author')
+            book.add_copies()
+            member = Member(name='Member', email='member@example.com')
+            db.session.add_all([book, member])
+            db.session.commit()
+            book_id = book.id
+            loan, _ = LoanService.borrow_book({'book_id': book_id, 'member_id': member.id})
+            member_id = member.id
+        
+        barrier = threading.Barrier(threads_count)
+        results = []
+        
+        def worker():
+            with app.app_context():
+                barrier.wait()
+                _, error = LoanService.return_book(loan.id)
+                results.append(error)
+                db.session.remove()
+        
+        threads = [threading.Thread(target=worker) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert results.count(None) == 1
+        assert all(error in (None, "Book has already been returned") for error in results)
+        with app.app_context():
+            assert db.session.get(Book, book_id).available_count == 1
+            assert db.session.get(Member, member_id).active_loan_count == 0
+            assert db.session.get(StatsCounter, 'active_loans').value == 0
+
+class TestBorrowingLimits:
+    """Test cases for per-member borrowing limits."""
+    
+    @pytest.fixture
+    def book_ids(self, app):
+        books = [Book(title=f'Book {i}', author='Author') for i in range(7)]
+        for book in books:
+            book.add_copies()
+        db.session.add_all(books)
+        db.session.commit()
+        return [book.id for book in books]
+    
+    def _count(self, member_id):
+        return db.session.get(Member, member_id).active_loan_count
+    
+    def test_limit_enforced_and_released(self, app, client, book_ids, member_id):
+        """Test that a standard member can have five loans out, and a return frees one."""
+        app.config['MEMBER_TIERS'] = {**app.config['MEMBER_TIERS'], 'standard': {'max_loans': 5}}
+        loan_ids = [json.loads(borrow(client, book_id, member_id).data)['loan_id'] for book_id in book_ids[:5]]
+        assert self._count(member_id) == 5
+        
+        response = borrow(client, book_ids[5], member_id)
+        assert response.status_code == 409
+        assert json.loads(response.data)['message'] == LoanService.LIMIT_REACHED
+        assert db.session.get(Book, book_ids[5]).available_count == 1
+        
+        client.post('/api/v1/returns', data=json.dumps({'loan_id': loan_ids[0]}), content_type='application/json')
+        assert self._count(member_id) == 4
+        assert borrow(client, book_ids[5], member_id).status_code == 201
+        assert self._count(member_id) == 5
+    
+    def test_tier_sets_limit(self, app, client, book_ids):
+        """Test that members get their tier's limit, and unknown tiers are refused."""
+        app.config['MEMBER_TIERS'] = {'standard': {'max_loans': 1}, 'premium': {'max_loans': 3}}
+        response = client.post('/api/v1/members', data=json.dumps(
+            {'name': 'Premium', 'email': 'premium@example.com', 'tier': 'premium'}), content_type='application/json')
+        assert response.status_code == 201
+        member_id = json.loads(response.data)['id']
+        assert [borrow(client, book_id, member_id).status_code for book_id in book_ids[:4]] == [201, 201, 201, 409]
+        
+        response = client.post('/api/v1/members', data=json.dumps(
+            {'name': 'Gold', 'email': 'gold@example.com', 'tier': 'gold'}), content_type='application/json')
+        assert response.status_code == 400
+    
+    def test_batch_borrow_respects_limit(self, app, client, book_ids, member_id):
+        """Test that batch borrows stop at the limit and update the count once."""
+        app.config['MEMBER_TIERS'] = {**app.config['MEMBER_TIERS'], 'standard': {'max_loans': 2}}
+        payload = {'member_id': member_id, 'book_ids': book_ids[:3]}
+        response = client.post('/api/v1/loans/batch', data=json.dumps(payload), content_type='application/json')
+        assert response.status_code == 207
+        assert [result['status_code'] for result in json.loads(response.data)['results']] == [424, 424, 409]
+        assert self._count(member_id) == 0
+        
+        payload['mode'] = 'best_effort'
+        response = client.post('/api/v1/loans/batch', data=json.dumps(payload), content_type='application/json')
+        results = json.loads(response.data)['results']
+        assert [result['status_code'] for result in results] == [201, 201, 409]
+        assert self._count(member_id) == 2
+        
+        loan_ids = [result['loan_id'] for result in results[:2]]
+        client.post('/api/v1/returns/batch', data=json.dumps({'loan_ids': loan_ids}), content_type='application/json')
+        assert self._count(member_id) == 0
+    
+    def test_check_loan_counts(self, app, client, book_ids, member_id):
+        """Test that the consistency check finds and fixes drifted counters."""
+        borrow(client, book_ids[0], member_id)
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=['members', 'check-loan-counts'])
+        assert result.exit_code == 0 and 'All member loan counters match' in result.output
+        
+        db.session.get(Member, member_id).active_loan_count = 3
+        db.session.commit()
+        result = runner.invoke(args=['members', 'check-loan-counts'])
+        assert result.exit_code == 1 and f'Member {member_id}: active_loan_count 3, open loans 1' in result.output
+        assert self._count(member_id) == 3
+        
+        result = runner.invoke(args=['members', 'check-loan-counts', '--fix'])
+        assert result.exit_code == 0
+        db.session.expire_all()
+        assert self._count(member_id) == 1
+
+class TestLoanArchive:
+    """Test cases for archiving returned loans to the history table."""
+    
+    NOW = datetime(2024, 6, 1)
+    
+    @pytest.fixture
+    def loans(self, app, member_id):
+        """Create a book with loans returned 200 and 100 days ago, 10 days ago, and one open."""
+        book = Book(title='Archived Book', author='Author')
+        book.add_copies()
+        db.session.add(book)
+        db.session.flush()
+        for days in (200, 190, 100, 10, None):
+            borrowed_at = self.NOW - timedelta(days=(days or 0) + 7)
+            returned_at = self.NOW - timedelta(days=days) if days else None
+            db.session.add(Loan(book_id=book.id, copy_id=book.copies[0].id, member_id=member_id,
+                                borrowed_at=borrowed_at, due_at=borrowed_at + timedelta(days=14),
+                                returned_at=returned_at, status='returned' if days else 'active',
+                                fine_cents=25 if days == 190 else 0, updated_at=returned_at or borrowed_at))
+        db.session.commit()
+        return book.id
+    
+    def test_archive_moves_old_returned_loans(self, app, loans):
+        """Test that only loans returned before the cutoff move, in batches."""
+        before = {row.id: row for row in LoanService.get_book_loan_history(loans)}
+        
+        result, error = LoanService.archive_returned(now=self.NOW, after_days=90, batch_size=2)
+        assert error is None
+        assert result == {'archived': 3}
+        assert Loan.query.count() == 2
+        assert LoanHistory.query.count() == 3
+        assert all(loan.archived_at == self.NOW for loan in LoanHistory.query)
+        
+        # Archived loans read back unchanged, with the hot ones, in ID order
+        after = LoanService.get_book_loan_history(loans)
+        assert [row.id for row in after] == sorted(before)
+        assert all(tuple(row) == tuple(before[row.id]) for row in after)
+        
+        assert LoanService.archive_returned(now=self.NOW, after_days=90) == ({'archived': 0}, None)
+    
+    def test_archive_keeps_reconciled_days(self, app, loans):
+        """Test that loans stay for at least STATS_RECONCILE_DAYS."""
+        app.config['STATS_RECONCILE_DAYS'] = 150
+        assert LoanService.archive_returned(now=self.NOW, after_days=1) == ({'archived': 2}, None)
+    
+    def test_member_history_includes_archived(self, client, loans, member_id):
+        """Test that member history pages and stats span hot and archived loans."""
+        LoanService.archive_returned(now=self.NOW, after_days=90)
+        
+        ids = []
+        cursor = None
+        while True:
+            url = f'/api/v1/members/{member_id}/loans?limit=2&expand=book'
+            data = json.loads(client.get(url + (f'&cursor={cursor}' if cursor else '')).data)
+            ids.extend(loan['id'] for loan in data['loans'])
+            assert all(loan['book']['id'] == loans for loan in data['loans'])
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        assert ids == list(range(1, 6))
+        
+        data = json.loads(client.get(f'/api/v1/members/{member_id}/loans?status=returned&fields=id').data)
+        assert [loan['id'] for loan in data['loans']] == [1, 2, 3, 4]
+        data = json.loads(client.get(f'/api/v1/members/{member_id}/loans?status=active&fields=id').data)
+        assert [loan['id'] for loan in data['loans']] == [5]
+        
+        stats = json.loads(client.get(f'/api/v1/members/{member_id}/loans/stats').data)
+        assert (stats['total_loans'], stats['returned_loans'], stats['open_loans'], stats['fines_cents']) == (5, 4, 1, 25)
+    
+    def test_archived_ids_not_reused(self, app, book_id, member_id):
+        """Test that loans borrowed after an archive get new IDs and archive again."""
+        later = datetime.utcnow() + timedelta(days=365)
+        loan_ids = []
+        for _ in range(2):
+            loan, error = LoanService.borrow_book({'book_id': book_id, 'member_id': member_id})
+            assert error is None
+            loan_ids.append(loan.id)
+            assert LoanService.return_book(loan.id)[1] is None
+            assert LoanService.archive_returned(now=later) == ({'archived': 1}, None)
+        
+        assert loan_ids[1] > loan_ids[0]
+        assert sorted(loan.id for loan in LoanHistory.query) == loan_ids
+    
+    def test_archive_command(self, app, loans):
+        """Test the flask loans archive command."""
+        result = app.test_cli_runner().invoke(args=['loans', 'archive', '--after-days', '1'])
+        assert result.exit_code == 0
+        assert 'Archived 4 loans' in result.output
@@ -0,0 +1,88 @@
+import pytest
+import json
+from datetime import datetime
+from app import db
+from app.models import Book, Member, Loan
+from app.services.member_service import MemberService
+
+@pytest.fixture
+def member_ids(app):
+    """Create two members, the first with five loans of which two are open."""
+    book = Book(title='Test Book', author='Test Author')
+    book.add_copies(5)
+    members = [Member(name='Reader', email='reader@example.com'),
+               Member(name='Other', email='other@example.com')]
+    db.session.add_all([book, *members])
+    db.session.flush()
+    for index, copy in enumerate(book.copies):
+        returned = index < 3
+        db.session.add(Loan(
+            book_id=book.id, copy_id=copy.id, member_id=members[0].id,
+            borrowed_at=datetime(2024, 1, 1 + index), due_at=datetime(2024, 1, 15 + index),
+            returned_at=datetime(2024, 1, 10) if returned else None,
+            status='returned' if returned else ('overdue' if index == 4 else 'active'),
+            fine_cents=50 * index
+        ))
+    db.session.commit()
+    return members[0].id, members[1].id
+
+class TestMemberLoansAPI:
+    """Test cases for a member's loan history and statistics."""
+
+    def test_pages_through_loans(self, client, member_ids):
+        """Test that pages follow on by cursor and hold only the member's loans."""
+        ids = []
+        cursor = None
+        while True:
+            url = '/api/v1/members/%d/loans?limit=2' % member_ids[0]
+            response = client.get(url + ('&cursor=%d' % cursor if cursor else ''))
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            ids.extend(loan['id'] for loan in data['loans'])
+            assert all(loan['member_id'] == member_ids[0] for loan in data['loans'])
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        assert ids == sorted(ids) and len(ids) == 5
+
+        data = json.loads(client.get('/api/v1/members/%d/loans' % member_ids[1]).data)
+        assert data['loans'] == [] and data['next_cursor'] is None
+
+    def test_status_filter(self, client, member_ids):
+        """Test filtering a member's loans by status."""
+        response = client.get('/api/v1/members/%d/loans?status=active,overdue&fields=status' % member_ids[0])
+        assert response.status_code == 200
+        assert sorted(loan['status'] for loan in json.loads(response.data)['loans']) == ['active', 'overdue']
+
+    def test_invalid_requests(self, client, member_ids):
+        """Test an unknown member and invalid query parameters."""
+        assert client.get('/api/v1/members/999/loans').status_code == 404
+        assert client.get('/api/v1/members/%d/loans?status=lost' % member_ids[0]).status_code == 400
+        assert client.get('/api/v1/members/%d/loans?member_id=%d' % member_ids).status_code == 400
+
+    def test_stats(self, client, member_ids):
+        """Test a member's borrowing statistics."""
+        response = client.get('/api/v1/members/%d/loans/stats' % member_ids[0])
+        assert response.status_code == 200
+        assert json.loads(response.data) == {
+            'member_id': member_ids[0],
+            'total_loans': 5,
+            'open_loans': 2,
+            'overdue_loans': 1,
+            'returned_loans': 3,
+            'fines_cents': 500,
+            'accruing_fines_cents': 350,
+            'first_borrowed_at': '2024-01-01T00:00:00',
+            'last_borrowed_at': '2024-01-05T00:00:00'
+        }
+
+        data = json.loads(client.get('/api/v1/members/%d/loans/stats' % member_ids[1]).data)
+        assert (data['total_loans'], data['fines_cents'], data['last_borrowed_at']) == (0, 0, None)
+        assert client.get('/api/v1/members/999/loans/stats').status_code == 404
+
+    def test_active_loan_checks(self, app, member_ids):
+        """Test that active loan checks count in the database."""
+        assert MemberService.has_active_loans(member_ids[0]) is True
+        assert MemberService.has_active_loans(member_ids[1]) is False
+        assert MemberService.count_active_loans(member_ids[0]) == 2
+        assert len(db.session.get(Member, member_ids[0]).get_active_loans()) == 2
@@ -0,0 +1,55 @@
+import json
+import logging
+from tests.helpers import post
+
+def server_timing(response):
+    """Parse a Server-Timing header into {name: (duration, description)}."""
+    timings = {}
+    for metric in response.headers['Server-Timing'].split(', '):
+        name, *params = metric.split(';')
+        params = dict(param.split('=', 1) for param in params)
+        timings[name] = (float(params['dur']), params.get('desc', '').strip('"'))
+    return timings
+
+class TestMetrics:
+    """Test cases for request latency and SQL statement metrics."""
+
+    def test_server_timing_counts_queries(self, client):
+        """Test that responses report their SQL statements and time."""
+        _, book = post(client, '/api/v1/books', {'title': 'Book', 'author': 'Author'})
+        _, member = post(client, '/api/v1/members', {'name': 'Jane', 'email': 'jane@example.com'})
+
+        response = client.post('/api/v1/loans', data=json.dumps({'book_id': book['id'], 'member_id': member['id']}),
+                               content_type='application/json')
+        timings = server_timing(response)
+        assert 0 < int(timings['db'][1].split()[0]) <= 25
+        assert timings['app'][0] >= timings['db'][0]
+
+        assert server_timing(client.get('/health'))['db'][1] == '0 queries'
+
+    def test_metrics_endpoint(self, client):
+        """Test the Prometheus histograms of requests by route."""
+        client.get('/api/v1/books')
+        client.get('/api/v1/books/1')
+        client.get('/api/v1/books/2')
+
+        text = client.get('/metrics').get_data(as_text=True)
+        assert '# TYPE http_request_duration_seconds histogram' in text
+        assert ('http_request_duration_seconds_count'
+                '{method="GET",route="/api/v1/books/<int:book_id>",status="404"} 2') in text
+        assert 'http_request_db_queries_bucket{method="GET",route="/api/v1/books",le="+Inf"} 1' in text
+        assert 'http_request_db_duration_seconds_sum{method="GET",route="/api/v1/books"}' in text
+
+    def test_query_threshold_logged(self, app, client, caplog):
+        """Test that requests over the statement threshold are logged and counted."""
+        app.config['N_PLUS_ONE_QUERY_THRESHOLD'] = 2
+
+        with caplog.at_level(logging.WARNING, logger='app.utils.metrics'):
+            client.get('/api/v1/books')
+            post(client, '/api/v1/books', {'title': 'Book', 'author': 'Author'})
+        assert 'GET /api/v1/books executed' not in caplog.text
+        assert 'POST /api/v1/books executed' in caplog.text
+        assert 'most repeated' in caplog.text
+
+        text = client.get('/metrics').get_data(as_text=True)
+        assert 'http_request_db_query_threshold_exceeded_total{method="POST",route="/api/v1/books"} 1' in text
@@ -0,0 +1,62 @@
+import pytest
+import json
+import logging
+from app import create_app, db
+from app.config import TestingConfig
+
+@pytest.fixture
+def app(monkeypatch):
+    """Create application for testing, logging every statement as slow and with the profiler."""
+    monkeypatch.setattr(TestingConfig, 'SLOW_QUERY_THRESHOLD_MS', 0.0001)
+    monkeypatch.setattr(TestingConfig, 'PROFILER_ENABLED', True)
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    """Create test client."""
+    client = app.test_client()
+    client.post('/api/v1/books', data=json.dumps({'title': 'Book', 'author': 'Author'}),
+                content_type='application/json')
+    return client
+
+class TestProfiling:
+    """Test cases for the slow-query log and the request profiler."""
+
+    def test_slow_query_logged_with_plan(self, client, caplog):
+        """Test that slow statements are logged with their route, parameters and plan."""
+        with caplog.at_level(logging.WARNING, logger='app.utils.profiling'):
+            client.get('/api/v1/books?author=Author')
+
+        entry = next(record.getMessage() for record in caplog.records
+                     if 'FROM books' in record.getMessage())
+        assert 'in GET /api/v1/books:' in entry
+        assert "Parameters: ('Author'" in entry
+        assert 'Query plan:\n' in entry
+        assert 'USING INDEX ix_books_author' in entry
+
+    def test_profile_request(self, client):
+        """Test that ?__profile=1 answers with the request's profile."""
+        response = client.get('/api/v1/books?limit=5&__profile=1')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        text = response.get_data(as_text=True)
+        assert text.startswith('GET /api/v1/books -> 200 OK in ')
+        assert 'cumulative' in text
+        assert 'get_books_page' in text
+
+        response = client.get('/api/v1/books?limit=5')
+        assert json.loads(response.data)['limit'] == 5
+
+    def test_profiler_disabled(self):
+        """Test that the flag is ignored, and rejected as a parameter, without the profiler."""
+        app = create_app('testing')
+        with app.app_context():
+            db.create_all()
+            response = app.test_client().get('/api/v1/books?__profile=1')
+            assert response.mimetype == 'application/json'
+            db.drop_all()
@@ -0,0 +1,87 @@
+from datetime import datetime
+from app import db
+from app.models import Book, Copy, Loan, Member, StatsCounter
+from app.services.member_service import MemberService
+from app.services.seed_service import SeedService, _isbn13
+from app.services.stats_service import StatsService
+from sqlalchemy import func, select, text
+
+NOW = datetime(2024, 6, 1)
+
+def seed(seed_value=1):
+    return SeedService.seed(300, 50, 3000, seed=seed_value, now=NOW, days=120, chunk_size=700)
+
+def loan_rows():
+    return db.session.execute(select(*Loan.__table__.columns).order_by(Loan.id)).all()
+
+class TestSeed:
+    """Test cases for the synthetic data generator."""
+
+    def test_rows_are_consistent(self, app):
+        """Test that copies, counts, loans and counters agree."""
+        result, error = seed()
+        assert error is None
+        assert (result['books'], result['members'], result['loans']) == (300, 50, 3000)
+        assert db.session.scalar(select(func.count()).select_from(Loan)) == 3000
+        assert db.session.scalar(select(func.count()).select_from(Copy)) == result['copies']
+
+        on_loan = db.session.scalar(select(func.count()).where(Copy.status == 'on_loan'))
+        open_loans = db.session.scalar(select(func.count()).where(Loan.status != 'returned'))
+        assert on_loan == open_loans == result['open_loans'] > 0
+        assert db.session.scalar(select(func.sum(Book.available_count))) == result['copies'] - on_loan
+        assert db.session.scalar(select(func.count()).where(Loan.status == 'overdue')) > 0
+        assert MemberService.check_loan_counts() == ([], None)
+
+        counters = {counter.name: counter.value for counter in StatsCounter.query}
+        StatsService.reconcile()
+        assert counters == {counter.name: counter.value for counter in StatsCounter.query}
+
+    def test_popularity_is_skewed(self, app):
+        """Test that the most borrowed tenth of books has most of the loans."""
+        seed()
+        counts = sorted(db.session.scalars(
+            select(func.count()).select_from(Loan).group_by(Loan.book_id)
+        ), reverse=True)
+        assert sum(counts[:30]) > 3000 / 2
+
+    def test_deterministic(self, app):
+        """Test that the same seed gives the same rows, and another seed different ones."""
+        seed()
+        first = loan_rows()
+        members = [member.email for member in Member.query.order_by(Member.id)]
+        db.drop_all()
+        db.create_all()
+
+        seed()
+        assert loan_rows() == first
+        assert [member.email for member in Member.query.order_by(Member.id)] == members
+        db.drop_all()
+        db.create_all()
+
+        seed(seed_value=2)
+        assert loan_rows() != first
+
+    def test_refuses_non_empty_database(self, app):
+        """Test that seeding needs an empty database."""
+        seed()
+        assert seed() == (None, "Database is not empty")
+
+    def test_failed_load_keeps_indexes(self, app, monkeypatch):
+        """Test that the search and loan indexes are rebuilt when the load fails."""
+        def fail(*args):
+            raise RuntimeError("Disk full")
+        monkeypatch.setattr(SeedService, '_insert_loans', fail)
+        assert seed() == (None, "Disk full")
+
+        names = set(db.session.scalars(text("SELECT name FROM sqlite_master")))
+        assert {index.name for index in Loan.__table__.indexes} <= names
+        assert {'books_fts', 'books_fts_insert', 'books_fts_delete', 'books_fts_update'} <= names
+        assert app.test_client().get('/api/v1/books/search?q=the').status_code == 200
+
+    def test_cli(self, app):
+        """Test the flask seed command."""
+        result = app.test_cli_runner().invoke(args=['seed', '--books', '20', '--members', '5',
+                                                    '--loans', '100', '--seed', '3', '--now', '2024-06-01'])
+        assert result.exit_code == 0, result.output
+        assert 'Seeded 20 books' in result.output
+        assert db.session.get(Book, 7).isbn == _isbn13(7) == '9780000000071'
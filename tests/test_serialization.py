@@ -0,0 +1,59 @@
+import json
+from app import db
+from app.models import Book, Loan, Member
+from app.schemas import book_list_schema
+from app.utils.serialization import dumps
+
+class TestSerialization:
+    """Test cases for the precompiled model serializers."""
+    
+    def test_book_to_dict(self, app):
+        """Test that a book serializes every column, with ISO 8601 timestamps."""
+        book = Book(title='Dune', author='Frank Herbert', isbn='9780441013593')
+        book.add_copies(2)
+        db.session.add(book)
+        db.session.commit()
+        
+        assert book.to_dict() == {
+            'id': book.id,
+            'title': 'Dune',
+            'author': 'Frank Herbert',
+            'isbn': '9780441013593',
+            'available': True,
+            'available_count': 2,
+            'copy_count': 2,
+            'created_at': book.created_at.isoformat(),
+            'updated_at': book.updated_at.isoformat()
+        }
+    
+    def test_book_list_matches_schema(self, client):
+        """Test that the book list is the BookListSchema envelope."""
+        books = [Book(title=f'Book {i}', author='Author') for i in range(3)]
+        for book in books:
+            book.add_copies()
+        db.session.add_all(books)
+        db.session.commit()
+        
+        data = json.loads(client.get('/api/v1/books?limit=2').data)
+        assert data == book_list_schema.dump({'books': books[:2], 'limit': 2, 'next_cursor': books[1].id})
+    
+    def test_row_to_dict_matches_to_dict(self, app):
+        """Test that row and object serializers agree, including NULLs."""
+        book = Book(title='Dune', author='Frank Herbert')
+        book.add_copies()
+        member = Member(name='Jane', email='jane@example.com')
+        db.session.add_all([book, member])
+        db.session.flush()
+        loan = Loan(book_id=book.id, copy_id=book.copies[0].id, member_id=member.id)
+        db.session.add(loan)
+        db.session.commit()
+        
+        for model, obj in [(Book, book), (Member, member), (Loan, loan)]:
+            row = model.query.with_entities(*model.__table__.columns).one()
+            assert model.row_to_dict(row) == obj.to_dict()
+        assert loan.to_dict()['returned_at'] is None
+    
+    def test_dumps(self):
+        """Test that dumps produces compact, standard JSON."""
+        data = {'title': 'Café', 'available': True, 'isbn': None, 'ids': [1, 2]}
+        assert json.loads(dumps(data)) == data
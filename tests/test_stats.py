@@ -0,0 +1,91 @@
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from app import db
+from app.models import Book, Copy, Member, Loan, StatsCounter
+from app.services.stats_service import StatsService
+from app.services.loan_service import LoanService
+from app.utils.scheduler import start_periodic_job
+from tests.helpers import post
+
+def get_stats(client):
+    response = client.get('/api/v1/stats?days=2')
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+class TestStatsAPI:
+    """Test cases for the dashboard statistics."""
+    
+    def test_counters_follow_mutations(self, client):
+        """Test that every mutation keeps the counters up to date."""
+        book_ids = [post(client, '/api/v1/books', {'title': f'Book {i}', 'author': 'A', 'copies': i + 1})[1]['id']
+                    for i in range(3)]
+        _, member = post(client, '/api/v1/members', {'name': 'Jane', 'email': 'jane@example.com'})
+        member_id = member['id']
+        
+        _, loan = post(client, '/api/v1/loans', {'book_id': book_ids[0], 'member_id': member_id})
+        post(client, '/api/v1/loans/batch', {'member_id': member_id, 'book_ids': book_ids[1:]})
+        post(client, '/api/v1/returns', {'loan_id': loan['loan_id']})
+        client.delete(f'/api/v1/books/{book_ids[0]}')
+        
+        stats = get_stats(client)
+        assert stats['total_books'] == 2
+        assert stats['total_copies'] == 5
+        assert stats['available_copies'] == 3
+        assert stats['unavailable_copies'] == 2
+        assert stats['total_members'] == 1
+        assert stats['active_loans'] == 2
+        assert stats['loans_per_day'][-1]['borrowed'] == 3
+        assert stats['loans_per_day'][-1]['returned'] == 1
+    
+    def test_counters_match_reconciliation(self, client):
+        """Test that incremental counters agree with a full recount."""
+        book_ids = [post(client, '/api/v1/books', {'title': f'Book {i}', 'author': 'A'})[1]['id']
+                    for i in range(2)]
+        _, member = post(client, '/api/v1/members', {'name': 'Jane', 'email': 'jane@example.com'})
+        member_id = member['id']
+        post(client, '/api/v1/loans', {'book_id': book_ids[0], 'member_id': member_id})
+        
+        before = get_stats(client)
+        StatsService.reconcile()
+        assert get_stats(client) == before
+    
+    def test_reconcile_fixes_drift_and_overdue(self, client):
+        """Test that reconciliation corrects drift and counts overdue loans."""
+        book = Book(title='Old Loan', author='A', copy_count=1)
+        book.copies.append(Copy(status='on_loan'))
+        member = Member(name='Jane', email='jane@example.com')
+        db.session.add_all([book, member])
+        db.session.flush()
+        db.session.add(Loan(book_id=book.id, copy_id=book.copies[0].id, member_id=member.id,
+                            borrowed_at=datetime.utcnow() - timedelta(days=30)))
+        db.session.commit()
+        
+        # Rows written behind the services' back are not counted
+        assert get_stats(client)['total_books'] == 0
+        
+        LoanService.sweep_overdue()
+        StatsService.reconcile()
+        stats = get_stats(client)
+        assert stats['total_books'] == 1
+        assert stats['unavailable_copies'] == 1
+        assert stats['active_loans'] == 1
+        assert stats['overdue_loans'] == 1
+        assert db.session.get(StatsCounter, 'total_members').value == 1
+    
+    def test_jobs_need_an_interval(self, app):
+        """Test that the job runner refuses to start with every job disabled."""
+        result = app.test_cli_runner().invoke(args=['jobs', 'run'])
+        assert result.exit_code == 1
+        assert 'No jobs to run' in result.output
+    
+    def test_job_errors_logged(self, app, caplog):
+        """Test that a periodic job logs the errors its service returns."""
+        with caplog.at_level(logging.ERROR, logger='app.utils.scheduler'):
+            stop = start_periodic_job(app, 'failing', 0.01, lambda: (None, 'database is locked'))
+            deadline = time.monotonic() + 5
+            while 'Periodic job failing failed' not in caplog.text and time.monotonic() < deadline:
+                time.sleep(0.01)
+            stop.set()
+        assert 'Periodic job failing failed: database is locked' in caplog.text
@@ -0,0 +1,9 @@
+"""Production WSGI entry point.
+
+Serve with gunicorn, which reads its settings from gunicorn.conf.py:
+    gunicorn wsgi:app
+"""
+import os
+from app import create_app
+
+app = create_app(os.getenv('FLASK_ENV', 'production'))